@@ -0,0 +1,69 @@
+# benchmarks/async_stub.py
+"""
+asyncio stub of the fapi endpoints used by AsyncBinanceFuturesClient.
+A fixed per-request delay stands in for exchange round-trip time.
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import time
+from typing import Tuple
+from aiohttp import web
+
+
+def make_app(latency: float = 0.0) -> web.Application:
+    ids = itertools.count(1)
+    orders = {}
+
+    async def delay():
+        if latency:
+            await asyncio.sleep(latency)
+
+    async def server_time(request: web.Request) -> web.Response:
+        return web.json_response({"serverTime": int(time.time() * 1000)})
+
+    async def ticker_price(request: web.Request) -> web.Response:
+        await delay()
+        return web.json_response({"symbol": request.query.get("symbol"), "price": "65000.00"})
+
+    async def new_order(request: web.Request) -> web.Response:
+        await delay()
+        q = request.query
+        if "signature" not in q:
+            return web.json_response({"code": -1102, "msg": "Mandatory parameter 'signature' was not sent."}, status=400)
+        oid = next(ids)
+        orders[oid] = {"orderId": oid, "symbol": q.get("symbol"), "side": q.get("side"), "type": q.get("type"),
+                       "status": "NEW", "price": q.get("price", "0"), "origQty": q.get("quantity"), "executedQty": "0"}
+        return web.json_response(orders[oid])
+
+    async def get_order(request: web.Request) -> web.Response:
+        await delay()
+        order = orders.get(int(request.query.get("orderId", 0)))
+        if order is None:
+            return web.json_response({"code": -2013, "msg": "Order does not exist."}, status=400)
+        return web.json_response(order)
+
+    async def cancel_order(request: web.Request) -> web.Response:
+        await delay()
+        order = orders.pop(int(request.query.get("orderId", 0)), None)
+        if order is None:
+            return web.json_response({"code": -2011, "msg": "Unknown order sent."}, status=400)
+        return web.json_response(dict(order, status="CANCELED"))
+
+    app = web.Application()
+    app.router.add_get("/fapi/v1/time", server_time)
+    app.router.add_get("/fapi/v1/ticker/price", ticker_price)
+    app.router.add_post("/fapi/v1/order", new_order)
+    app.router.add_get("/fapi/v1/order", get_order)
+    app.router.add_delete("/fapi/v1/order", cancel_order)
+    return app
+
+
+async def start_async_stub(latency: float = 0.0, host: str = "127.0.0.1", port: int = 0) -> Tuple[web.AppRunner, str]:
+    """Start the stub on the running loop and return (runner, base_url); await runner.cleanup() to stop."""
+    runner = web.AppRunner(make_app(latency), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound}"
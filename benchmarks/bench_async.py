@@ -0,0 +1,53 @@
+# benchmarks/bench_async.py
+"""
+Sequential vs gather() fan-out with AsyncBinanceFuturesClient against the asyncio stub.
+
+    python -m benchmarks.bench_async --orders 40 --latency 0.05
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import time
+from src.async_client import AsyncBinanceFuturesClient
+from src.rate_limiter import RateGovernor
+from .async_stub import start_async_stub
+
+
+async def run(orders: int, latency: float) -> None:
+    runner, base_url = await start_async_stub(latency=latency)
+    batch = [{"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.001,
+              "price": 60000 + i, "time_in_force": "GTC"} for i in range(orders)]
+    try:
+        async with AsyncBinanceFuturesClient(api_key="bench", api_secret="bench", base_url=base_url,
+                                             governor=RateGovernor(weight_limit=10**9, order_limit_10s=10**9,
+                                                                   order_limit_1m=10**9)) as client:
+            t0 = time.perf_counter()
+            for o in batch:
+                await client.place_order(**o)
+            sequential = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            results = await client.place_orders(batch)
+            fanned = time.perf_counter() - t0
+            errors = [r for r in results if isinstance(r, BaseException)]
+    finally:
+        await runner.cleanup()
+
+    print(f"Orders: {orders}, simulated RTT: {latency * 1000:.0f}ms")
+    print(f"Sequential: {sequential * 1000:8.1f}ms")
+    print(f"gather():   {fanned * 1000:8.1f}ms  errors={len(errors)}")
+    print(f"Speed-up:   {sequential / fanned:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async fan-out benchmark")
+    parser.add_argument("--orders", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated RTT in seconds")
+    args = parser.parse_args()
+    logging.getLogger("src.async_client").setLevel(logging.WARNING)
+    asyncio.run(run(args.orders, args.latency))
+
+
+if __name__ == "__main__":
+    main()
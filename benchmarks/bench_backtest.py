@@ -0,0 +1,51 @@
+# benchmarks/bench_backtest.py
+"""
+Vectorized backtests on a synthetic year of 1-minute bars (525,600 bars).
+
+    python -m benchmarks.bench_backtest --levels 100
+"""
+from __future__ import annotations
+import argparse
+import time
+from typing import Dict
+import numpy as np
+from src.backtest import backtest_grid, backtest_oco, backtest_twap
+
+
+def synthetic_bars(n: int, price: float = 60000.0, vol: float = 0.0008, seed: int = 7) -> Dict[str, np.ndarray]:
+    """Geometric random walk with wicks, shaped like history.load_klines output."""
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.concatenate(([price], close[:-1]))
+    wick = np.abs(rng.normal(0, vol / 2, (2, n)))
+    return {"open_time": 1_704_067_200_000 + np.arange(n, dtype=np.int64) * 60_000, "open": open_,
+            "high": np.maximum(open_, close) * (1 + wick[0]), "low": np.minimum(open_, close) * (1 - wick[1]),
+            "close": close, "volume": rng.uniform(5, 50, n)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest benchmark")
+    parser.add_argument("--bars", type=int, default=525_600)
+    parser.add_argument("--levels", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    bars = synthetic_bars(args.bars)
+    lower, upper = float(bars["low"].min()), float(bars["high"].max())
+    p0 = float(bars["open"][0])
+    for name, fn in (("grid", lambda: backtest_grid(bars, lower, upper, args.levels, 0.01)),
+                     ("twap", lambda: backtest_twap(bars, "BUY", 1.0, 60, 3600)[0]),
+                     ("oco", lambda: backtest_oco(bars, "BUY", 0.1, p0 * 1.05, p0 * 0.95, p0 * 0.949)[0])):
+        times = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - t0)
+        s = result.summary()
+        print(f"{name + ':':<6} {min(times) * 1000:8.1f}ms best of {args.runs}, "
+              f"{s['fills']} fills, PnL {s['pnl']:.2f}, max DD {s['max_drawdown']:.2f}")
+    print(f"Bars: {args.bars}, Grid levels: {args.levels}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_dispatch.py
+"""
+Menu action cost: the old bot.py path (a fresh `python -m src.<cmd>` per action) versus the
+in-process dispatcher on one long-lived client, both against the local stub server.
+
+    python -m benchmarks.bench_dispatch --runs 10
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+from src.client import BinanceFuturesClient, create_session
+from src.commands import run_command
+from .stub_server import start_stub_server
+
+
+def _subprocess_runs(module: str, argv: List[str], env: dict, runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-m", module, *argv], env=env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def _inprocess_runs(name: str, argv: List[str], client: BinanceFuturesClient, runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_command(name, argv, client)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subprocess vs in-process command dispatch")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for name in ("src.client", "src.price", "src.clock", "src.exchange_info", "src.commands"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    server, base_url = start_stub_server()
+    env = dict(os.environ, BINANCE_BASE_URL=base_url, BINANCE_API_KEY="bench", BINANCE_API_SECRET="bench")
+
+    old = _subprocess_runs("src.price", ["BTCUSDT"], env, args.runs)
+    client = BinanceFuturesClient(api_key="bench", api_secret="bench", base_url=base_url, session=create_session())
+    new = _inprocess_runs("price", ["BTCUSDT"], client, args.runs)
+    server.shutdown()
+
+    print(f"View Price x{args.runs}")
+    print(f"subprocess per action: mean={statistics.mean(old):8.2f}ms  p50={statistics.median(old):8.2f}ms")
+    print(f"in-process dispatch:   mean={statistics.mean(new):8.2f}ms  p50={statistics.median(new):8.2f}ms")
+    print(f"Speed-up: {statistics.mean(old) / statistics.mean(new):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_market_data.py
+"""
+REST ticker/price per read vs the WebSocket price cache, against the local stubs.
+
+    python -m benchmarks.bench_market_data --reads 500 --frames 30000
+"""
+from __future__ import annotations
+import argparse
+import logging
+import os
+import time
+from src.client import BinanceFuturesClient
+from src.market_data import MarketDataStream
+from src.rate_limiter import RateGovernor
+from .stub_server import start_stub_server
+from .ws_replay import start_ws_replay, synthetic_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market data cache benchmark")
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--frames", type=int, default=30000)
+    args = parser.parse_args()
+    for name in ("src.client", "src.clock", "src.market_data"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    os.environ.pop("BINANCE_WS_URL", None)
+
+    server, base_url = start_stub_server()
+    replay, ws_url, stop_ws = start_ws_replay(synthetic_frames("BTCUSDT", args.frames))
+    client = BinanceFuturesClient(api_key="bench", api_secret="bench", base_url=base_url,
+                                  governor=RateGovernor(weight_limit=10**9))
+    try:
+        t0 = time.perf_counter()
+        for _ in range(args.reads):
+            float(client.get_symbol_price("BTCUSDT")["price"])
+        rest = (time.perf_counter() - t0) / args.reads
+
+        stream = MarketDataStream(ws_url)
+        t0 = time.perf_counter()
+        stream.start(["BTCUSDT"])
+        while stream.frames < args.frames:
+            time.sleep(0.001)
+        ingest = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(args.reads * 100):
+            stream.price("BTCUSDT", max_age=5.0)
+        cached = (time.perf_counter() - t0) / (args.reads * 100)
+        stream.stop()
+    finally:
+        stop_ws()
+        server.shutdown()
+        client.close()
+
+    print(f"REST ticker/price:  {rest * 1e6:9.1f}us/read (1 weight each)")
+    print(f"Stream cache read:  {cached * 1e6:9.3f}us/read (0 weight)")
+    print(f"Stream ingest:      {args.frames / ingest:9.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_order_book.py
+"""
+Local order book: diff apply rate and query latency on a 1000-level book.
+
+    python -m benchmarks.bench_order_book --diffs 100000
+"""
+from __future__ import annotations
+import argparse
+import time
+from src.order_book import OrderBook
+from .ws_replay import depth_frames, depth_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order book benchmark")
+    parser.add_argument("--diffs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=100000)
+    args = parser.parse_args()
+
+    book = OrderBook("BTCUSDT")
+    frames = [f["data"] for f in depth_frames("BTCUSDT", args.diffs, first_id=1000)]
+    book.load_snapshot(depth_snapshot(1001))
+    t0 = time.perf_counter()
+    for event in frames:
+        if not book.apply_diff(event):
+            raise SystemExit(f"sequence break at u={event['u']}")
+    apply = (time.perf_counter() - t0) / len(frames)
+
+    results = {}
+    for name, fn in (("best_ask", lambda: book.best_ask()),
+                     ("qty_within(10bps)", lambda: book.qty_within("BUY", 10)),
+                     ("vwap(5)", lambda: book.vwap("BUY", 5.0)),
+                     ("vwap(200)", lambda: book.vwap("BUY", 200.0)),
+                     ("slippage_bps(50)", lambda: book.slippage_bps("SELL", 50.0))):
+        t0 = time.perf_counter()
+        for _ in range(args.queries):
+            fn()
+        results[name] = (time.perf_counter() - t0) / args.queries
+
+    print(f"Levels: {len(book.bids.keys)} bids / {len(book.asks.keys)} asks, synced={book.synced}")
+    print(f"apply_diff:        {apply * 1e6:7.2f}us/diff")
+    for name, secs in results.items():
+        print(f"{name + ':':<18} {secs * 1e6:7.2f}us")
+
+
+if __name__ == "__main__":
+    main()
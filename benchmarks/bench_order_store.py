@@ -0,0 +1,53 @@
+# benchmarks/bench_order_store.py
+"""
+Order store throughput and memory: N orders placed then filled/cancelled, bounded by max_closed.
+
+    python -m benchmarks.bench_order_store --orders 300000 --max-closed 100000
+"""
+from __future__ import annotations
+import argparse
+import time
+import tracemalloc
+from src.order_store import OrderStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order store benchmark")
+    parser.add_argument("--orders", type=int, default=300000)
+    parser.add_argument("--max-closed", type=int, default=100000)
+    args = parser.parse_args()
+
+    store = OrderStore(max_closed=args.max_closed)
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for i in range(args.orders):
+        store.apply_response({"orderId": i, "symbol": symbols[i % 4], "clientOrderId": f"bot-{i}", "side": "BUY",
+                              "type": "LIMIT", "status": "NEW", "price": "65000.0", "origQty": "0.010",
+                              "executedQty": "0", "updateTime": i})
+        if i >= 50:  # keep 50 orders resting, close the rest
+            j = i - 50
+            store.apply_response({"orderId": j, "symbol": symbols[j % 4], "status": "FILLED" if j % 2 else "CANCELED",
+                                  "executedQty": "0.010" if j % 2 else "0", "updateTime": i})
+    ingest = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        store.open_orders("BTCUSDT")
+    open_lookup = (time.perf_counter() - t0) / 1000
+    t0 = time.perf_counter()
+    last = args.orders - 1
+    for k in range(100000):
+        store.is_filled(last - (k % 1000))
+    filled_lookup = (time.perf_counter() - t0) / 100000
+
+    print(f"Orders processed: {args.orders} ({2 * args.orders / ingest:,.0f} updates/s)")
+    print(f"Records kept:     {len(store)} (open {len(store.open_orders())})")
+    print(f"Memory:           {current / 1e6:.1f} MB now, {peak / 1e6:.1f} MB peak")
+    print(f"open_orders(sym): {open_lookup * 1e6:.1f}us   is_filled(): {filled_lookup * 1e9:.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_sim.py
+"""
+Load test: BinanceFuturesClient placing and cancelling orders against the local matching
+engine (src.sim) from several threads, single orders and 5-order batches.
+
+    python -m benchmarks.bench_sim --orders 5000 --threads 8 --latency-ms 2 --error-rate 0.01
+
+Limits are off on both sides so the numbers show client + transport + engine throughput.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.client import BinanceFuturesClient, create_session, is_error
+from src.rate_limiter import RateGovernor
+from src.sim import SimConfig, start_sim_server
+
+
+def _client(base_url: str, threads: int) -> BinanceFuturesClient:
+    return BinanceFuturesClient(api_key="bench", api_secret="bench", base_url=base_url,
+                                session=create_session(pool_maxsize=threads, max_retries=0),
+                                governor=RateGovernor(weight_limit=10**9, order_limit_10s=10**9, order_limit_1m=10**9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated exchange load test")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--url", help="Use a sim already running in another process "
+                                      "(python -m src.sim.server --no-limits --api-key bench --api-secret bench)")
+    args = parser.parse_args()
+
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("src."):
+            logging.getLogger(name).setLevel(logging.WARNING)  # per-request INFO logging dominates otherwise
+    config = SimConfig(api_key="bench", api_secret="bench", latency_ms=args.latency_ms,
+                       error_rate=args.error_rate, enforce_limits=False, seed=1)
+    server = engine = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url, engine = start_sim_server(config=config)
+    client = _client(base_url, args.threads)
+    # resting bids well below the market: every order is accepted and queued in the book
+    prices = [60000 + (i % 500) / 10 for i in range(args.orders)]
+
+    def single(price):
+        try:
+            return client.place_order("BTCUSDT", "BUY", "LIMIT", 0.002, price=price, time_in_force="GTC")
+        except Exception as e:
+            return {"code": None, "msg": str(e)}
+
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        t0 = time.perf_counter()
+        placed = list(pool.map(single, prices))
+        single_secs = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = client.place_orders_batch([{"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.002,
+                                          "price": p, "time_in_force": "GTC"} for p in prices], max_workers=args.threads)
+    batch_secs = time.perf_counter() - t0
+
+    ids = [r["orderId"] for r in placed + batched if not is_error(r)]
+    t0 = time.perf_counter()
+    client.cancel_orders_batch("BTCUSDT", ids, max_workers=args.threads)
+    cancel_secs = time.perf_counter() - t0
+    client.close()
+    if server is not None:
+        server.shutdown()
+
+    errors = sum(1 for r in placed + batched if is_error(r))
+    print(f"Orders: {args.orders} x2, Threads: {args.threads}, Latency: {args.latency_ms}ms, Injected error rate: {args.error_rate}")
+    print(f"place_order:        {args.orders / single_secs:8.0f} orders/s")
+    print(f"place_orders_batch: {args.orders / batch_secs:8.0f} orders/s")
+    print(f"cancel_orders_batch:{len(ids) / cancel_secs:8.0f} orders/s")
+    print(f"Errors: {errors}" + (f", Engine: {engine.stats}" if engine is not None else ""))
+
+
+if __name__ == "__main__":
+    main()
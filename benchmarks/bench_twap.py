@@ -0,0 +1,84 @@
+# benchmarks/bench_twap.py
+"""
+Schedule accuracy: many concurrent TWAPs on one TWAPScheduler against the local matching engine
+with injected latency, versus the old send-then-sleep(interval) loop run one TWAP at a time.
+
+    python -m benchmarks.bench_twap --jobs 30 --slices 10 --duration 2 --latency-ms 20
+
+Lag is each slice's send time minus its planned deadline (start + i * interval).
+"""
+from __future__ import annotations
+import argparse
+import logging
+import time
+from src.advanced.twap import TWAPScheduler
+from src.client import BinanceFuturesClient, create_session
+from src.rate_limiter import RateGovernor
+from src.sim import SimConfig, start_sim_server
+
+SYMBOLS = ("BTCUSDT", "ETHUSDT")
+SLICE_QTY = {"BTCUSDT": 0.002, "ETHUSDT": 0.04}  # just over the 100 USDT min notional
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _sleep_loop(client, symbol, slices, duration):
+    """The old TWAPExecutor loop: every slice waits a full interval after the previous send returned."""
+    interval = duration / slices
+    start = time.monotonic()
+    lags = []
+    for i in range(slices):
+        lags.append((time.monotonic() - start - i * interval) * 1000)
+        client.place_market_order(symbol, "BUY", SLICE_QTY[symbol])
+        time.sleep(interval)
+    return lags
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TWAP scheduler timing benchmark")
+    parser.add_argument("--jobs", type=int, default=30)
+    parser.add_argument("--slices", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    server, base_url, _ = start_sim_server(config=SimConfig(api_key="bench", api_secret="bench",
+                                                            latency_ms=args.latency_ms, enforce_limits=False))
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("src."):
+            logging.getLogger(name).setLevel(logging.WARNING)  # per-request INFO logging dominates otherwise
+    client = BinanceFuturesClient(api_key="bench", api_secret="bench", base_url=base_url,
+                                  session=create_session(pool_maxsize=args.workers, max_retries=0),
+                                  governor=RateGovernor(weight_limit=10**9, order_limit_10s=10**9, order_limit_1m=10**9))
+
+    t0 = time.perf_counter()
+    old = _sleep_loop(client, SYMBOLS[0], args.slices, args.duration)
+    old_secs = time.perf_counter() - t0
+
+    scheduler = TWAPScheduler(client, max_workers=args.workers)
+    t0 = time.perf_counter()
+    jobs = []
+    for i in range(args.jobs):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        jobs.append(scheduler.submit(symbol, "BUY" if i % 4 < 2 else "SELL", SLICE_QTY[symbol] * args.slices,
+                                     args.slices, args.duration, start_delay=0.5))
+    scheduler.join(jobs)
+    secs = time.perf_counter() - t0
+    scheduler.stop()
+    client.close()
+    server.shutdown()
+
+    lags = [s.lag_ms for j in jobs for s in j.slices]
+    errors = sum(j.summary()["errors"] for j in jobs)
+    print(f"Slices: {args.slices} over {args.duration}s, Latency: {args.latency_ms}ms")
+    print(f"sleep loop, 1 TWAP:       {old_secs:6.2f}s wall  lag p50 {_pct(old, 0.5):7.1f}ms  last {old[-1]:7.1f}ms")
+    print(f"scheduler, {args.jobs:3d} TWAPs:    {secs:6.2f}s wall  lag p50 {_pct(lags, 0.5):7.1f}ms  "
+          f"p99 {_pct(lags, 0.99):7.1f}ms  max {max(lags):7.1f}ms  ({len(lags)} slices, {errors} errors)")
+
+
+if __name__ == "__main__":
+    main()
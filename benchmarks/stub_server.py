@@ -0,0 +1,214 @@
+# benchmarks/stub_server.py
+"""
+Tiny threaded stand-in for the fapi endpoints the client touches.
+Speaks HTTP/1.1 so connections stay alive between requests.
+"""
+from __future__ import annotations
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+
+def _symbol_entry(symbol: str, tick: str, step: str, notional: str) -> dict:
+    return {
+        "symbol": symbol, "status": "TRADING", "baseAsset": symbol[:-4], "quoteAsset": "USDT",
+        "pricePrecision": 2, "quantityPrecision": 3,
+        "filters": [
+            {"filterType": "PRICE_FILTER", "minPrice": "0.10", "maxPrice": "1000000", "tickSize": tick},
+            {"filterType": "LOT_SIZE", "minQty": step, "maxQty": "1000", "stepSize": step},
+            {"filterType": "MARKET_LOT_SIZE", "minQty": step, "maxQty": "120", "stepSize": step},
+            {"filterType": "MAX_NUM_ORDERS", "limit": 200},
+            {"filterType": "MIN_NOTIONAL", "notional": notional},
+            {"filterType": "PERCENT_PRICE", "multiplierUp": "1.0500", "multiplierDown": "0.9500", "multiplierDecimal": "4"},
+        ],
+    }
+
+
+EXCHANGE_INFO = {"timezone": "UTC", "symbols": [
+    _symbol_entry("BTCUSDT", "0.10", "0.001", "100"),
+    _symbol_entry("ETHUSDT", "0.01", "0.001", "20"),
+]}
+
+
+TICKER = {"BTCUSDT": "65000.00", "ETHUSDT": "3000.00"}
+HISTORY_START_MS = 1_704_067_200_000  # 2024-01-01; synthetic history begins here
+AGG_TRADE_SPACING_MS = 250  # aggTrade id n happens at HISTORY_START_MS + n * spacing
+
+
+def _walk(symbol: str, t: int) -> float:
+    """Deterministic price for (symbol, time) so repeated downloads see identical history."""
+    base = float(TICKER.get(symbol, "100"))
+    h = int(hashlib.blake2b(f"{symbol}{t // 60000}".encode(), digest_size=4).hexdigest(), 16)
+    return round(base * (1 + ((h % 2001) - 1000) / 100000), 2)
+
+
+def synthetic_klines(symbol: str, interval_ms: int, start: int, end: int, limit: int) -> list:
+    first = max(start, HISTORY_START_MS)
+    first += -first % interval_ms
+    rows = []
+    now = int(time.time() * 1000)
+    for t in range(first, min(end + 1, now), interval_ms):
+        o, c = _walk(symbol, t), _walk(symbol, t + interval_ms - 1)
+        rows.append([t, str(o), str(max(o, c) * 1.001), str(min(o, c) * 0.999), str(c), "12.5",
+                     t + interval_ms - 1, str(12.5 * c), 40, "6.1", str(6.1 * c), "0"])
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def synthetic_agg_trades(symbol: str, params: dict) -> list:
+    limit = int(params.get("limit", 500))
+    now_id = (int(time.time() * 1000) - HISTORY_START_MS) // AGG_TRADE_SPACING_MS
+    if "fromId" in params:
+        first, last = int(params["fromId"]), now_id
+    else:
+        start = int(params.get("startTime", HISTORY_START_MS))
+        first = max(0, -(-(start - HISTORY_START_MS) // AGG_TRADE_SPACING_MS))
+        last = min(now_id, (int(params.get("endTime", start + 3_599_999)) - HISTORY_START_MS) // AGG_TRADE_SPACING_MS)
+    rows = []
+    for a in range(first, min(last + 1, first + limit)):
+        t = HISTORY_START_MS + a * AGG_TRADE_SPACING_MS
+        rows.append({"a": a, "p": str(_walk(symbol, t)), "q": "0.010", "f": 3 * a, "l": 3 * a + 2, "T": t, "m": a % 2 == 0})
+    return rows
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    order_id = 0
+    lock = threading.Lock()
+    # when set, signed requests are verified against the raw query string like the exchange does
+    secret: Optional[str] = None
+    # GET /fapi/v1/depth payload (see ws_replay.depth_snapshot)
+    depth: Optional[dict] = None
+
+    def log_message(self, *args) -> None:  # keep benchmark output clean
+        pass
+
+    def _reply(self, payload, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _signature_ok(self, raw: str) -> bool:
+        if not self.secret or "&signature=" not in raw:
+            return True
+        payload, _, signature = raw.rpartition("&signature=")
+        expected = hmac.new(self.secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    def _params(self):
+        parts = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params.update({k: v[-1] for k, v in parse_qs(self.rfile.read(length).decode()).items()})
+        return parts.path, params
+
+    def handle_one_request(self) -> None:
+        # verify before dispatching so every verb gets the same check
+        self.raw_requestline = self.rfile.readline(65537)
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if not self.parse_request():
+            return
+        if not self._signature_ok(urlsplit(self.path).query):
+            self._reply({"code": -1022, "msg": "Signature for this request is not valid."}, status=400)
+            return
+        method = getattr(self, "do_" + self.command, None)
+        if method is None:
+            self.send_error(501)
+            return
+        method()
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        path, params = self._params()
+        if path == "/fapi/v1/time":
+            self._reply({"serverTime": int(time.time() * 1000)})
+        elif path == "/fapi/v1/exchangeInfo":
+            self._reply(EXCHANGE_INFO)
+        elif path == "/fapi/v1/ticker/price" and "symbol" not in params:
+            self._reply([{"symbol": s, "price": p, "time": int(time.time() * 1000)} for s, p in TICKER.items()])
+        elif path == "/fapi/v1/ticker/price":
+            self._reply({"symbol": params.get("symbol", "BTCUSDT"), "price": "65000.00", "time": int(time.time() * 1000)})
+        elif path == "/fapi/v1/ticker/24hr":
+            self._reply([{"symbol": s, "lastPrice": p, "priceChangePercent": "1.250", "volume": "1000",
+                          "quoteVolume": str(float(p) * 1000), "highPrice": p, "lowPrice": p} for s, p in TICKER.items()])
+        elif path == "/fapi/v1/premiumIndex":
+            self._reply([{"symbol": s, "markPrice": p, "indexPrice": p, "lastFundingRate": "0.00010000"}
+                         for s, p in TICKER.items()])
+        elif path == "/fapi/v1/depth":
+            self._reply(self.depth if self.depth is not None else {"lastUpdateId": 1, "bids": [], "asks": []})
+        elif path == "/fapi/v1/klines":
+            interval = params.get("interval", "1m")
+            unit = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}[interval[-1]]
+            self._reply(synthetic_klines(params["symbol"], int(interval[:-1]) * unit,
+                                         int(params.get("startTime", HISTORY_START_MS)),
+                                         int(params.get("endTime", time.time() * 1000)), int(params.get("limit", 500))))
+        elif path == "/fapi/v1/aggTrades":
+            self._reply(synthetic_agg_trades(params["symbol"], params))
+        elif path == "/fapi/v1/openOrders":
+            self._reply([])
+        elif path == "/fapi/v1/order":
+            self._reply({"orderId": int(params.get("orderId", 0)), "symbol": params.get("symbol"), "status": "NEW",
+                         "executedQty": "0"})
+        else:
+            self._reply({})
+
+    @classmethod
+    def _new_order(cls, params) -> dict:
+        with cls.lock:
+            cls.order_id += 1
+            oid = cls.order_id
+        return {"orderId": oid, "symbol": params.get("symbol"), "status": "NEW", "side": params.get("side"),
+                "type": params.get("type"), "price": params.get("price", "0"),
+                "origQty": params.get("quantity"), "executedQty": "0"}
+
+    def do_POST(self) -> None:
+        path, params = self._params()
+        if path == "/fapi/v1/batchOrders":
+            self._reply([self._new_order(o) for o in json.loads(params.get("batchOrders", "[]"))])
+        elif path == "/fapi/v1/listenKey":
+            self._reply({"listenKey": "stub-listen-key"})
+        else:
+            self._reply(self._new_order(params))
+
+    def do_PUT(self) -> None:
+        self._params()
+        self._reply({})
+
+    def do_DELETE(self) -> None:
+        path, params = self._params()
+        if path == "/fapi/v1/listenKey":
+            self._reply({})
+        elif path == "/fapi/v1/batchOrders":
+            self._reply([{"orderId": oid, "status": "CANCELED"} for oid in json.loads(params.get("orderIdList", "[]"))])
+        else:
+            self._reply({"orderId": int(params.get("orderId", 0)), "status": "CANCELED"})
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub on a background thread and return (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    srv, url = start_stub_server(port=8900)
+    print(f"Stub fapi listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
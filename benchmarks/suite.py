@@ -0,0 +1,242 @@
+# benchmarks/suite.py
+"""
+Reproducible benchmark suite: hot-path microbenchmarks plus end-to-end executor runs against
+the local matching engine (src.sim), written as JSON so two commits can be compared.
+
+    python -m benchmarks.suite                              # run all, save benchmarks/results/<commit>.json
+    python -m benchmarks.suite --only micro --quick
+    python -m benchmarks.suite --compare benchmarks/results/abc1234.json --threshold 10
+
+Every case reports per-call p50/p99/mean latency and throughput (calls/s; macro cases that send
+several orders per call also report orders/s). --compare exits 1 when any case's p50 got slower
+by more than --threshold percent.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import gc
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from src.advanced.grid_cli import generate_grid_prices, place_grid
+from src.advanced.oco_cli import OCOExecutorCLI
+from src.advanced.triggers import Trigger, TriggerBook
+from src.advanced.twap import TWAPExecutor
+from src.client import BinanceFuturesClient, create_session
+from src.logger import JSONFormatter
+from src.rate_limiter import RateGovernor
+from src.signing import RequestSigner, encode_query
+from src.sim import SimConfig, start_sim_server
+from src.validators import check_order, validate_plan, validate_price, validate_quantity, validate_symbol
+
+SECRET = "bench-secret-0123456789abcdef0123456789abcdef0123456789abcdef0123"
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class Case(NamedTuple):
+    name: str
+    kind: str                          # "micro" or "macro"
+    fn: Callable[[], Any]
+    iterations: int
+    orders_per_call: int = 0
+    reset: Optional[Callable[[], None]] = None  # untimed cleanup after the run
+
+
+def _measure(case: Case, scale: float) -> Dict[str, Any]:
+    n = max(10, int(case.iterations * scale))
+    fn = case.fn
+    for _ in range(min(n // 10, 100)):
+        fn()  # warm caches, pools and lazy imports
+    samples = [0] * n
+    clock = time.perf_counter_ns
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = clock()
+        for i in range(n):
+            t0 = clock()
+            fn()
+            samples[i] = clock() - t0
+        total = (clock() - start) / 1e9
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    if case.reset is not None:
+        case.reset()
+    samples.sort()
+    unit = 1e3 if case.kind == "micro" else 1e6  # us / ms
+    result = {
+        "kind": case.kind, "unit": "us" if case.kind == "micro" else "ms", "n": n,
+        "p50": samples[n // 2] / unit, "p99": samples[min(n - 1, int(n * 0.99))] / unit,
+        "mean": sum(samples) / n / unit, "calls_per_s": n / total,
+    }
+    if case.orders_per_call:
+        result["orders_per_s"] = n * case.orders_per_call / total
+    return result
+
+
+def micro_cases(filters) -> List[Case]:
+    signer = RequestSigner(SECRET)
+    params = {"symbol": "BTCUSDT", "side": "BUY", "type": "LIMIT", "quantity": 0.002, "price": 65000.1,
+              "timeInForce": "GTC", "timestamp": 1763554842316, "recvWindow": 5000}
+    query = encode_query(params)
+    formatter = JSONFormatter()
+    record = logging.LogRecord("src.client", logging.INFO, __file__, 1, "Request %s %s params=%s response=%s",
+                               ("POST", "/fapi/v1/order", params, {"orderId": 1, "status": "NEW"}), None)
+    prices = generate_grid_prices(60000, 64000, 10)
+    grid = [{"side": s, "order_type": "LIMIT", "price": p, "quantity": 0.002, "time_in_force": "GTC"}
+            for p in prices for s in ("BUY", "SELL")]
+    book = TriggerBook()
+    for i in range(5_000):
+        book.add(Trigger(i, "BTCUSDT", "SELL", "STOP", 1, trigger_price=50_000 + 2 * i))
+        book.add(Trigger(5_000 + i, "BTCUSDT", "BUY", "STOP", 1, trigger_price=70_000 + 2 * i))
+    for i in range(1_000):
+        t = Trigger(10_000 + i, "BTCUSDT", "SELL", "TRAILING", 1, callback_rate=(1.0, 2.0, 5.0)[i % 3] + 5)
+        t.active, t.extreme = True, 65_000.0
+        book.add(t)
+    ticks = itertools.cycle([64_000.0 + 10 * (i if i < 100 else 200 - i) for i in range(200)])
+    return [
+        Case("sign", "micro", lambda: signer.sign(query), 100_000),
+        Case("signed_query", "micro", lambda: signer.signed_query(params), 100_000),
+        Case("build_order_request", "micro", lambda: encode_query(BinanceFuturesClient._order_params(
+            "BTCUSDT", "BUY", "LIMIT", 0.002, price=65000.1, time_in_force="GTC")), 100_000),
+        Case("json_formatter", "micro", lambda: formatter.format(record), 50_000),
+        Case("validate_cli_args", "micro", lambda: (validate_symbol("BTCUSDT"), validate_quantity("0.002"),
+                                                    validate_price("65000.1")), 100_000),
+        Case("check_order", "micro", lambda: check_order(filters, "BUY", "LIMIT", "0.0021", price="65000.13",
+                                                          mark_price="65000"), 50_000),
+        Case("validate_plan_grid22", "micro", lambda: validate_plan(filters, grid), 5_000),
+        Case("generate_grid_prices_100", "micro", lambda: generate_grid_prices(60000, 70000, 100), 50_000),
+        Case("trigger_book_update_11k", "micro", lambda: book.update("BTCUSDT", next(ticks)), 100_000),
+    ]
+
+
+def macro_cases(client: BinanceFuturesClient, engine) -> List[Case]:
+    flip = {"side": "BUY"}
+
+    def market():
+        flip["side"] = "SELL" if flip["side"] == "BUY" else "BUY"  # keep the position bounded
+        client.place_market_order("BTCUSDT", flip["side"], 0.002)
+
+    prices = generate_grid_prices(60000, 64000, 10)
+    twap = TWAPExecutor(client)
+    oco = OCOExecutorCLI(client, poll_interval=0.01, timeout=5)
+    quiet = io.StringIO()
+
+    def run_oco():
+        # TP below the market fills on placement, so this times place -> detect fill -> cancel the stop
+        with contextlib.redirect_stdout(quiet):
+            oco.run("BTCUSDT", "BUY", 0.002, 64000, 60000, 59900)
+        quiet.seek(0)
+        quiet.truncate()
+
+    def cancel_all():
+        engine.cancel_all("BTCUSDT")
+
+    return [
+        Case("ticker_price", "macro", lambda: client.get_symbol_price("BTCUSDT"), 2_000),
+        Case("market_order", "macro", market, 2_000, orders_per_call=1),
+        Case("limit_order", "macro", lambda: client.place_limit_order("BTCUSDT", "BUY", 60000, 0.002), 2_000,
+             orders_per_call=1, reset=cancel_all),
+        Case("grid_deploy_11_levels", "macro", lambda: place_grid("BTCUSDT", prices, 0.002, client=client), 100,
+             orders_per_call=2 * len(prices), reset=cancel_all),
+        Case("twap_5_slices", "macro", lambda: twap.run("BTCUSDT", "BUY", 0.01, 5, 0), 200, orders_per_call=5),
+        Case("oco_bracket", "macro", run_oco, 200, orders_per_call=2, reset=cancel_all),
+    ]
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+                             cwd=os.path.dirname(RESULTS_DIR))
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a side-by-side table; returns the names of cases whose p50 regressed past threshold %."""
+    regressed = []
+    print(f"\nVs {baseline['meta'].get('commit')}:")
+    for name, r in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<26} new")
+            continue
+        change = (r["p50"] - base["p50"]) / base["p50"] * 100 if base["p50"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"{name:<26} p50 {base['p50']:10.3f} -> {r['p50']:10.3f}{r['unit']} ({change:+6.1f}%){flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite with JSON results")
+    parser.add_argument("--only", choices=("micro", "macro"), help="Run one group")
+    parser.add_argument("--filter", help="Only cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="10%% of the iterations (smoke run)")
+    parser.add_argument("--out", help="JSON path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p50 regression threshold in %%")
+    args = parser.parse_args()
+
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("src."):
+            # per-request INFO lines would dominate the timings, and the OCO case polls without a
+            # user stream (the sim has none), which warns on every call
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    server, base_url, engine = start_sim_server(config=SimConfig(api_key="bench", api_secret=SECRET,
+                                                                 enforce_limits=False))
+    client = BinanceFuturesClient(api_key="bench", api_secret=SECRET, base_url=base_url, session=create_session(),
+                                  governor=RateGovernor(weight_limit=10**9, order_limit_10s=10**9, order_limit_1m=10**9))
+    cases: List[Case] = []
+    if args.only in (None, "micro"):
+        cases += micro_cases(client.exchange_info.get("BTCUSDT"))
+    if args.only in (None, "macro"):
+        cases += macro_cases(client, engine)
+    if args.filter:
+        cases = [c for c in cases if args.filter in c.name]
+
+    scale = 0.1 if args.quick else 1.0
+    results: Dict[str, Any] = {}
+    try:
+        for case in cases:
+            r = results[case.name] = _measure(case, scale)
+            orders = f"  {r['orders_per_s']:8.0f} orders/s" if "orders_per_s" in r else ""
+            print(f"{case.name:<26} p50 {r['p50']:10.3f}{r['unit']}  p99 {r['p99']:10.3f}{r['unit']}  "
+                  f"{r['calls_per_s']:10.0f}/s{orders}")
+    finally:
+        client.close()
+        server.shutdown()
+
+    commit = git_commit()
+    report = {"meta": {"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                       "python": sys.version.split()[0], "platform": platform.platform(),
+                       "machine": platform.machine(), "cpus": os.cpu_count(), "quick": args.quick},
+              "results": results}
+    path = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results: {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressed = compare(report, json.load(f), args.threshold)
+        if regressed:
+            print(f"{len(regressed)} regression(s) over {args.threshold:g}%: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
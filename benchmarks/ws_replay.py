@@ -0,0 +1,176 @@
+# benchmarks/ws_replay.py
+"""
+Local stand-in for the fapi combined-stream endpoint. Accepts SUBSCRIBE/UNSUBSCRIBE like
+fstream does and replays recorded frames (python -m src.market_data ... --record frames.jsonl)
+for the subscribed streams only.
+
+    python -m benchmarks.ws_replay frames.jsonl --port 8901
+    BINANCE_WS_URL=ws://127.0.0.1:8901 python -m src.market_data BTCUSDT
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def load_frames(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        frames = [json.loads(line) for line in f if line.strip()]
+    return [fr for fr in frames if "stream" in fr]
+
+
+def synthetic_frames(symbol: str = "BTCUSDT", count: int = 1000, start: float = 65000.0,
+                     step: float = 0.5) -> List[Dict[str, Any]]:
+    """Deterministic aggTrade/bookTicker/markPrice sequence for when no recording is at hand."""
+    frames = []
+    lower = symbol.lower()
+    now = int(time.time() * 1000)
+    for i in range(count):
+        price = start + step * ((i % 40) - 20)
+        ts = now + i
+        kind = i % 3
+        if kind == 0:
+            data = {"e": "aggTrade", "E": ts, "s": symbol, "a": i, "p": f"{price:.2f}", "q": "0.010",
+                    "f": i, "l": i, "T": ts, "m": bool(i & 1)}
+            stream = f"{lower}@aggTrade"
+        elif kind == 1:
+            data = {"e": "bookTicker", "u": i, "E": ts, "T": ts, "s": symbol, "b": f"{price - 0.1:.2f}",
+                    "B": "1.500", "a": f"{price + 0.1:.2f}", "A": "2.000"}
+            stream = f"{lower}@bookTicker"
+        else:
+            data = {"e": "markPriceUpdate", "E": ts, "s": symbol, "p": f"{price:.2f}", "i": f"{price - 1:.2f}",
+                    "P": f"{price:.2f}", "r": "0.00010000", "T": ts + 3600000}
+            stream = f"{lower}@markPrice@1s"
+        frames.append({"stream": stream, "data": data})
+    return frames
+
+
+def depth_frames(symbol: str = "BTCUSDT", count: int = 1000, first_id: int = 1000, mid: float = 65000.0,
+                 tick: float = 0.1) -> List[Dict[str, Any]]:
+    """@depth diffs with a continuous U/u/pu chain starting at first_id (pair with depth_snapshot)."""
+    frames = []
+    now = int(time.time() * 1000)
+    prev = first_id - 1
+    for i in range(count):
+        u = first_id + i * 3 + 2
+        level = (i % 20) + 1
+        qty = "0" if i % 7 == 0 else f"{1 + (i % 5) * 0.25:.3f}"
+        data = {"e": "depthUpdate", "E": now + i, "T": now + i, "s": symbol, "U": prev + 1, "u": u, "pu": prev,
+                "b": [[f"{mid - level * tick:.2f}", qty]], "a": [[f"{mid + level * tick:.2f}", qty]]}
+        frames.append({"stream": f"{symbol.lower()}@depth@100ms", "data": data})
+        prev = u
+    return frames
+
+
+def depth_snapshot(last_update_id: int, mid: float = 65000.0, tick: float = 0.1, levels: int = 1000) -> Dict[str, Any]:
+    """GET /fapi/v1/depth shaped book: levels per side, 1 + i/100 qty at level i."""
+    return {"lastUpdateId": last_update_id, "E": int(time.time() * 1000), "T": int(time.time() * 1000),
+            "bids": [[f"{mid - (i + 1) * tick:.2f}", f"{1 + i / 100:.3f}"] for i in range(levels)],
+            "asks": [[f"{mid + (i + 1) * tick:.2f}", f"{1 + i / 100:.3f}"] for i in range(levels)]}
+
+
+class ReplayServer:
+    """
+    interval: seconds between frames (0 = as fast as the socket takes them).
+    drop_after: close each connection after that many frames, to exercise reconnect/resubscribe.
+    """
+
+    def __init__(self, frames: Iterable[Dict[str, Any]], interval: float = 0.0, loop: bool = False,
+                 drop_after: Optional[int] = None):
+        self.frames = list(frames)
+        self.interval = interval
+        self.loop = loop
+        self.drop_after = drop_after
+        self.connections = 0
+        self.subscribes = 0
+
+    async def handler(self, ws) -> None:
+        self.connections += 1
+        subscribed: set = set()
+        ready = asyncio.Event()
+
+        async def control():
+            async for raw in ws:
+                msg = json.loads(raw)
+                names = msg.get("params", [])
+                if msg.get("method") == "SUBSCRIBE":
+                    subscribed.update(names)
+                    self.subscribes += 1
+                    ready.set()
+                elif msg.get("method") == "UNSUBSCRIBE":
+                    subscribed.difference_update(names)
+                await ws.send(json.dumps({"result": None, "id": msg.get("id")}))
+
+        reader = asyncio.ensure_future(control())
+        try:
+            await ready.wait()
+            sent = 0
+            while True:
+                for frame in self.frames:
+                    if frame["stream"] not in subscribed:
+                        continue
+                    await ws.send(json.dumps(frame, separators=(",", ":")))
+                    sent += 1
+                    if self.drop_after is not None and sent >= self.drop_after:
+                        return
+                    if self.interval:
+                        await asyncio.sleep(self.interval)
+                if not self.loop:
+                    break
+            await reader  # keep the connection open until the client leaves
+        except Exception:
+            pass
+        finally:
+            reader.cancel()
+
+
+def start_ws_replay(frames: Iterable[Dict[str, Any]], host: str = "127.0.0.1", port: int = 0,
+                    **kwargs) -> Tuple[ReplayServer, str, Callable[[], None]]:
+    """Run the replay server on a background loop; returns (server, ws_url, stop)."""
+    from websockets.asyncio.server import serve
+
+    replay = ReplayServer(frames, **kwargs)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    holder: Dict[str, Any] = {}
+
+    async def run():
+        server = await serve(replay.handler, host, port, compression=None)
+        holder["server"] = server
+        holder["port"] = server.sockets[0].getsockname()[1]
+        started.set()
+        await server.wait_closed()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop() -> None:
+        loop.call_soon_threadsafe(holder["server"].close)
+        thread.join(5)
+
+    return replay, f"ws://{host}:{holder['port']}", stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded combined-stream frames")
+    parser.add_argument("frames", nargs="?", help="JSONL from src.market_data --record (default: synthetic BTCUSDT)")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--loop", action="store_true", help="repeat the recording forever")
+    args = parser.parse_args()
+    frames = load_frames(args.frames) if args.frames else synthetic_frames()
+    _, url, stop = start_ws_replay(frames, port=args.port, interval=args.interval, loop=args.loop)
+    print(f"Replaying {len(frames)} frames on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,20 @@
 import os
 import sys
-import subprocess
+from typing import List
+from src.commands import run_command
 
 def clear():
     os.system("cls" if os.name == "nt" else "clear")
 
 
-def run(cmd: str):
-    print(f"\n>>> Running: {cmd}\n")
-    subprocess.call(cmd, shell=True)
+def run(name: str, argv: List[str]):
+    """Run a command in-process on the shared client (no interpreter start-up or time sync)."""
+    argv = [a.strip() for a in argv]
+    print(f"\n>>> Running: {name} {' '.join(argv)}\n")
+    try:
+        run_command(name, argv)
+    except Exception as e:
+        print(f"Error: {e}")
     print("\n----------------------------------------\n")
     input("Press Enter to continue...")
 
@@ -50,7 +56,7 @@ def main():
             symbol = input("Symbol (example: BTCUSDT): ")
             side = input("Side (BUY/SELL): ").upper()
             qty = input("Quantity: ")
-            run(f"python -m src.market_orders {symbol} {side} {qty}")
+            run("market_orders", [symbol, side, qty])
 
         elif choice == "2":
             # Limit Order
@@ -58,22 +64,22 @@ def main():
             side = input("Side (BUY/SELL): ").upper()
             qty = input("Quantity: ")
             price = input("Limit Price: ")
-            run(f"python -m src.limit_orders {symbol} {side} {qty} {price}")
+            run("limit_orders", [symbol, side, qty, price])
 
         elif choice == "3":
             # Close Position
             symbol = input("Symbol: ")
-            run(f"python -m src.close_position {symbol}")
+            run("close_position", [symbol])
 
         elif choice == "4":
             # Price
             symbol = input("Symbol: ")
-            run(f"python -m src.price {symbol}")
+            run("price", [symbol])
 
         elif choice == "5":
             # Exchange Info
             symbol = input("Symbol: ")
-            run(f"python -m src.exchange_info {symbol}")
+            run("exchange_info", [symbol])
 
         elif choice == "6":
             # OCO
@@ -83,7 +89,7 @@ def main():
             tp = input("Take-Profit price: ")
             stop_price = input("Stop price: ")
             stop_limit = input("Stop-limit price: ")
-            run(f"python -m src.advanced.oco_cli {symbol} {side} {qty} {tp} {stop_price} {stop_limit}")
+            run("oco", [symbol, side, qty, tp, stop_price, stop_limit])
 
         elif choice == "7":
             # Stop-Limit
@@ -92,7 +98,7 @@ def main():
             trigger = input("Trigger Price: ")
             limit_price = input("Limit Price: ")
             qty = input("Quantity: ")
-            run(f"python -m src.advanced.stop_limit {symbol} {side} {trigger} {limit_price} --qty {qty}")
+            run("stop_limit", [symbol, side, trigger, limit_price, "--qty", qty])
 
         elif choice == "8":
             # TWAP
@@ -101,7 +107,7 @@ def main():
             total_qty = input("Total Quantity: ")
             slices = input("Number of slices: ")
             interval = input("Seconds between slices: ")
-            run(f"python -m src.advanced.twap_cli {symbol} {side} {total_qty} {slices} {interval}")
+            run("twap", [symbol, side, total_qty, slices, interval])
 
         elif choice == "9":
             # Grid
@@ -110,31 +116,31 @@ def main():
             upper = input("Upper Range: ")
             levels = input("Number of levels: ")
             qty = input("Quantity per level: ")
-            run(f"python -m src.advanced.grid_cli {symbol} {lower} {upper} {levels} {qty}")
+            run("grid", [symbol, lower, upper, levels, qty])
 
         elif choice == "10":
             # Cancel Order
             symbol = input("Symbol: ")
             order_id = input("Order ID: ")
-            run(f"python -m src.cancel_order {symbol} {order_id}")
+            run("cancel_order", [symbol, order_id])
 
         elif choice == "11":
             # Cancel ALL Orders
             symbol = input("Symbol: ")
-            run(f"python -m src.cancel_all {symbol}")
+            run("cancel_all", [symbol])
 
         elif choice == "12":
             # Positions
-            run("python -m src.positions")
+            run("positions", [])
 
         elif choice == "13":
             # Balance
-            run("python -m src.balance")
+            run("balance", [])
 
         elif choice == "14":
             # Open orders
             symbol = input("Symbol: ")
-            run(f"python -m src.open_orders {symbol}")
+            run("open_orders", [symbol])
 
         elif choice == "0":
             print("Exiting...")
@@ -0,0 +1,423 @@
+# src/advanced/brackets.py
+from __future__ import annotations
+import argparse
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from ..client import BinanceFuturesClient, is_error
+from ..order_store import FINAL_STATUSES
+from ..validators import (validate_symbol, validate_side, validate_quantity, validate_price, validate_plan,
+                          check_order, to_decimal, FilterRejected)
+from ..logger import get_logger
+from ..ctl import forward_to_daemon
+
+logger = get_logger(__name__)
+
+RESYNC_INTERVAL = 30.0  # openOrders check even while the user stream is healthy
+
+
+class Bracket:
+    """One TP + stop-limit pair closing `quantity` of a position; legs are re-placed smaller on partial fills."""
+    __slots__ = ("bracket_id", "symbol", "exit_side", "quantity", "tp_price", "stop_price", "stop_limit_price",
+                 "tp_id", "stop_id", "tp_filled", "stop_filled", "status", "error")
+
+    def __init__(self, bracket_id: int, symbol: str, side: str, quantity: Decimal, tp_price: Decimal,
+                 stop_price: Decimal, stop_limit_price: Decimal):
+        self.bracket_id = bracket_id
+        self.symbol = symbol
+        self.exit_side = "SELL" if side == "BUY" else "BUY"
+        self.quantity = quantity
+        self.tp_price = tp_price
+        self.stop_price = stop_price
+        self.stop_limit_price = stop_limit_price
+        self.tp_id: Optional[int] = None
+        self.stop_id: Optional[int] = None
+        self.tp_filled = Decimal(0)    # fills of TP orders already replaced
+        self.stop_filled = Decimal(0)  # fills of stop orders already replaced
+        self.status = "OPEN"           # OPEN, TP, STOP, CANCELLED, ERROR
+        self.error = ""
+
+    @property
+    def is_open(self) -> bool:
+        return self.status == "OPEN"
+
+    def leg_order(self, leg: str, quantity: Decimal) -> Dict[str, Any]:
+        if leg == "tp":
+            return {"symbol": self.symbol, "side": self.exit_side, "order_type": "LIMIT", "quantity": quantity,
+                    "price": self.tp_price, "time_in_force": "GTC"}
+        return {"symbol": self.symbol, "side": self.exit_side, "order_type": "STOP", "quantity": quantity,
+                "price": self.stop_limit_price, "stop_price": self.stop_price, "time_in_force": "GTC"}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.bracket_id, "symbol": self.symbol, "side": self.exit_side, "quantity": str(self.quantity),
+                "tp_id": self.tp_id, "stop_id": self.stop_id, "status": self.status,
+                "tp_filled": str(self.tp_filled), "stop_filled": str(self.stop_filled), "error": self.error}
+
+    def __repr__(self) -> str:
+        return (f"Bracket({self.bracket_id} {self.symbol} {self.exit_side} {self.quantity} tp={self.tp_price} "
+                f"stop={self.stop_price} {self.status})")
+
+
+class BracketManager:
+    """
+    Any number of OCO brackets in one process. Leg state comes from the client's order store:
+    user-stream events mark single brackets dirty through an orderId index, and while the
+    stream is down (plus every resync_interval) one openOrders call per symbol refreshes them
+    all. A filled leg cancels its sibling; a partial fill re-places the sibling at the size
+    still open. Cancels go out per symbol in one batch, replacements in one batch.
+    """
+
+    def __init__(self, client: Optional[BinanceFuturesClient] = None, poll_interval: float = 2.0,
+                 resync_interval: float = RESYNC_INTERVAL, on_wake: Optional[Callable[[], None]] = None):
+        self.client = client or BinanceFuturesClient()
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.brackets: Dict[int, Bracket] = {}
+        self._by_order: Dict[int, Tuple[Bracket, str]] = {}  # orderId -> (bracket, "tp" | "stop")
+        self._dirty: Set[int] = set()
+        self._ours: Set[int] = set()  # orderIds we cancelled ourselves
+        self._next_id = 1
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self.on_wake = on_wake
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stream = None
+        self._generation = -1
+        self._last_poll = 0.0
+        self.stats = {"polls": 0, "events": 0, "cancels": 0, "resizes": 0}
+
+    # ----- brackets -----
+
+    def add(self, symbol: str, side: str, quantity: float, tp_price: float, stop_price: float,
+            stop_limit_price: float) -> Bracket:
+        return self.add_many([{"symbol": symbol, "side": side, "quantity": quantity, "tp_price": tp_price,
+                               "stop_price": stop_price, "stop_limit_price": stop_limit_price}])[0]
+
+    def add_many(self, specs: List[Dict[str, Any]]) -> List[Bracket]:
+        """
+        Validate every leg, then place all of them in one batch. specs: dicts with symbol, side,
+        quantity, tp_price, stop_price, stop_limit_price. A bracket with a rejected leg has its
+        other leg cancelled and ends as ERROR.
+        """
+        brackets: List[Bracket] = []
+        orders: List[Dict[str, Any]] = []
+        for spec in specs:
+            b = Bracket(0, spec["symbol"], spec["side"], to_decimal(spec["quantity"]), to_decimal(spec["tp_price"]),
+                        to_decimal(spec["stop_price"]), to_decimal(spec["stop_limit_price"]))
+            legs, errors = validate_plan(self.client.exchange_info.get(b.symbol),
+                                         [b.leg_order("tp", b.quantity), b.leg_order("stop", b.quantity)])
+            if errors:
+                raise FilterRejected(f"{b.symbol} bracket {'TP' if errors[0][0] == 0 else 'stop'} leg rejected: {errors[0][1]}")
+            b.quantity, b.tp_price = legs[0]["quantity"], legs[0]["price"]
+            b.stop_price, b.stop_limit_price = legs[1]["stop_price"], legs[1]["price"]
+            brackets.append(b)
+            orders.extend(legs)
+        results = self.client.place_orders_batch(orders)
+        orphans: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, b in enumerate(brackets):
+                b.bracket_id = self._next_id
+                self._next_id += 1
+                self.brackets[b.bracket_id] = b
+                tp, stop = results[2 * i], results[2 * i + 1]
+                if not is_error(tp):
+                    b.tp_id = int(tp["orderId"])
+                    self._by_order[b.tp_id] = (b, "tp")
+                if not is_error(stop):
+                    b.stop_id = int(stop["orderId"])
+                    self._by_order[b.stop_id] = (b, "stop")
+                failed = [r for r in (tp, stop) if is_error(r)]
+                if failed:
+                    b.status, b.error = "ERROR", str(failed[0])
+                    logger.error("Bracket %s placement failed: %s", b.bracket_id, failed[0])
+                    live = b.tp_id if b.tp_id is not None else b.stop_id
+                    if live is not None:
+                        orphans.setdefault(b.symbol, []).append(live)
+                else:
+                    logger.info("Bracket %s placed: %s tp=%s stop=%s", b.bracket_id, b.symbol, b.tp_id, b.stop_id)
+                    self._dirty.update((b.tp_id, b.stop_id))  # a leg may have filled on arrival
+        self._cancel(orphans)
+        self.wake()
+        return brackets
+
+    def cancel(self, bracket: Bracket) -> None:
+        """Cancel both legs and stop tracking the bracket."""
+        with self._lock:
+            if not bracket.is_open:
+                return
+            bracket.status = "CANCELLED"
+        self._cancel({bracket.symbol: [i for i in (bracket.tp_id, bracket.stop_id) if i is not None]})
+
+    def has_work(self) -> bool:
+        """True while any bracket is still open."""
+        return any(b.is_open for b in list(self.brackets.values()))
+
+    def open_brackets(self, symbol: Optional[str] = None) -> List[Bracket]:
+        return [b for b in self.brackets.values() if b.is_open and (symbol is None or b.symbol == symbol)]
+
+    def wake(self) -> None:
+        """A leg changed: bring the next step forward and tell on_wake."""
+        self._wake.set()
+        if self.on_wake is not None:
+            self.on_wake()
+
+    # ----- events -----
+
+    def _on_stream(self, kind: str, payload: Any) -> None:
+        # runs after the order store's own listener, so the store already holds this event
+        if kind == "ORDER_TRADE_UPDATE" and payload.order_id in self._by_order:
+            with self._lock:
+                self._dirty.add(payload.order_id)
+            self.stats["events"] += 1
+            self.wake()
+
+    def poll(self, symbols: Optional[List[str]] = None) -> None:
+        """One openOrders call per symbol with open brackets; vanished legs are resolved by the order store."""
+        client = self.client
+        for symbol in symbols or sorted({b.symbol for b in self.open_brackets()}):
+            try:
+                open_orders = client._request("GET", "/fapi/v1/openOrders", params={"symbol": symbol}, signed=True)
+                client.order_store.reconcile(client, symbol, open_orders)
+            except Exception as e:
+                logger.warning("Bracket poll failed for %s: %s", symbol, e)
+                continue
+            self.stats["polls"] += 1
+            with self._lock:
+                for b in self.open_brackets(symbol):
+                    self._dirty.update(i for i in (b.tp_id, b.stop_id) if i is not None)
+
+    # ----- evaluation -----
+
+    def _leg_state(self, order_id: Optional[int]) -> Tuple[str, Decimal, Decimal]:
+        """(status, executed, original qty) of one leg order from the order store."""
+        rec = self.client.order_store.get(order_id) if order_id is not None else None
+        if rec is None:
+            return "NEW", Decimal(0), Decimal(0)
+        return rec.status, to_decimal(rec.filled_qty), to_decimal(rec.orig_qty)
+
+    def step(self) -> Dict[str, int]:
+        """Evaluate dirty brackets; cancel finished siblings and resize partially hit ones, batched."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            brackets = {self._by_order[i][0].bracket_id: self._by_order[i][0] for i in dirty if i in self._by_order}
+        cancels: Dict[str, List[int]] = {}
+        resize: List[Tuple[Bracket, str, int]] = []
+        for b in brackets.values():
+            if not b.is_open:
+                continue
+            tp_status, tp_exec, tp_orig = self._leg_state(b.tp_id)
+            st_status, st_exec, st_orig = self._leg_state(b.stop_id)
+            if tp_status == "FILLED" or st_status == "FILLED":
+                b.status = "TP" if tp_status == "FILLED" else "STOP"
+                other = b.stop_id if b.status == "TP" else b.tp_id
+                cancels.setdefault(b.symbol, []).append(other)
+                logger.info("Bracket %s %s filled; cancelling the other leg", b.bracket_id, b.status)
+                continue
+            gone = [leg for leg, status, oid in (("tp", tp_status, b.tp_id), ("stop", st_status, b.stop_id))
+                    if status in FINAL_STATUSES and oid not in self._ours]
+            if gone:
+                # cancelled/expired outside this manager: the bracket is void
+                b.status = "CANCELLED"
+                cancels.setdefault(b.symbol, []).extend(
+                    oid for oid in (b.tp_id, b.stop_id) if self._leg_state(oid)[0] not in FINAL_STATUSES)
+                logger.warning("Bracket %s %s leg ended outside the manager; cancelling the bracket", b.bracket_id, gone[0])
+                continue
+            left = b.quantity - (b.tp_filled + tp_exec + b.stop_filled + st_exec)
+            for leg, oid, executed, orig in (("tp", b.tp_id, tp_exec, tp_orig), ("stop", b.stop_id, st_exec, st_orig)):
+                if orig - executed > left:
+                    cancels.setdefault(b.symbol, []).append(oid)
+                    resize.append((b, leg, oid))
+        retired = self._cancel(cancels)
+        if resize:
+            self._resize(resize, retired)
+        return {"cancelled": sum(len(v) for v in cancels.values()), "resized": len(resize)}
+
+    def _cancel(self, by_symbol: Dict[str, List[int]]) -> Dict[int, Dict[str, Any]]:
+        """Batched cancels per symbol; returns orderId -> cancel response (error dicts included)."""
+        out: Dict[int, Dict[str, Any]] = {}
+        for symbol, ids in by_symbol.items():
+            ids = [i for i in ids if i is not None]
+            if not ids:
+                continue
+            with self._lock:
+                self._ours.update(ids)
+            for oid, r in zip(ids, self.client.cancel_orders_batch(symbol, ids)):
+                out[oid] = r
+                if is_error(r):
+                    # most often "Unknown order": it filled first; the next event/poll settles it
+                    logger.warning("Bracket leg %s cancel failed: %s", oid, r)
+                    with self._lock:
+                        self._dirty.add(oid)
+                else:
+                    self.stats["cancels"] += 1
+        return out
+
+    def _resize(self, resize: List[Tuple[Bracket, str, int]], cancelled: Dict[int, Dict[str, Any]]) -> None:
+        """Replace cancelled legs with the size still open (fills up to the cancel included)."""
+        grouped: Dict[int, Tuple[Bracket, List[str]]] = {}
+        for b, leg, oid in resize:
+            r = cancelled.get(oid)
+            if r is None or is_error(r):
+                continue  # could not cancel (likely filled meanwhile): re-evaluated next step
+            executed = to_decimal(r.get("executedQty") or 0)
+            if leg == "tp":
+                b.tp_filled += executed
+            else:
+                b.stop_filled += executed
+            with self._lock:
+                self._by_order.pop(oid, None)
+            grouped.setdefault(b.bracket_id, (b, []))[1].append(leg)
+        todo: List[Tuple[Bracket, str, Dict[str, Any]]] = []
+        for b, legs in grouped.values():
+            kept = [oid for leg, oid in (("tp", b.tp_id), ("stop", b.stop_id)) if leg not in legs]
+            left = b.quantity - b.tp_filled - b.stop_filled - sum(self._leg_state(oid)[1] for oid in kept)
+            if left <= 0:
+                b.status = "TP" if b.tp_filled >= b.stop_filled else "STOP"
+                continue
+            filters = self.client.exchange_info.get(b.symbol)
+            for leg in legs:
+                try:
+                    qty = check_order(filters, b.exit_side, "LIMIT", left,
+                                      price=b.tp_price if leg == "tp" else b.stop_limit_price).quantity
+                except FilterRejected as e:
+                    logger.warning("Bracket %s: %s left on the %s leg is below the minimum order (%s); leaving it",
+                                   b.bracket_id, left, leg, e)
+                    continue
+                todo.append((b, leg, b.leg_order(leg, qty)))
+        if not todo:
+            return
+        results = self.client.place_orders_batch([o for _, _, o in todo])
+        with self._lock:
+            for (b, leg, order), r in zip(todo, results):
+                if is_error(r):
+                    b.status, b.error = "ERROR", f"{leg} resize failed: {r}"
+                    logger.error("Bracket %s %s resize failed: %s", b.bracket_id, leg, r)
+                    continue
+                oid = int(r["orderId"])
+                if leg == "tp":
+                    b.tp_id = oid
+                else:
+                    b.stop_id = oid
+                self._by_order[oid] = (b, leg)
+                self._dirty.add(oid)
+                self.stats["resizes"] += 1
+                logger.info("Bracket %s %s leg resized to %s (order %s)", b.bracket_id, leg, order["quantity"], oid)
+
+    # ----- lifecycle -----
+
+    def attach(self) -> None:
+        """Take leg updates from the user stream; without one, tick() polls every poll_interval."""
+        try:
+            self._stream = self.client.user_stream.start()
+            self._stream.add_listener(self._on_stream)
+        except Exception as e:
+            logger.warning("User data stream unavailable, polling openOrders: %s", e)
+            self._stream = None
+        self._generation = -1
+
+    def detach(self) -> None:
+        if self._stream is not None:
+            self._stream.remove_listener(self._on_stream)
+            self._stream = None
+
+    def tick(self) -> float:
+        """One pass of the run loop: poll if the stream is down or a resync is due, then step(). Returns seconds to wait."""
+        stream = self._stream
+        live = stream is not None and stream.connected and stream.generation == self._generation
+        if not live or time.monotonic() - self._last_poll >= self.resync_interval:
+            self.poll()
+            self._last_poll = time.monotonic()
+            self._generation = stream.generation if stream is not None else -1
+        try:
+            self.step()
+        except Exception as e:
+            logger.error("Bracket step failed: %s", e)
+        if not live:
+            return self.poll_interval
+        return max(0.0, self.resync_interval - (time.monotonic() - self._last_poll))
+
+    def run(self, timeout: Optional[float] = None, until_done: bool = True) -> None:
+        """Process events/polls until every bracket is closed (or stop()/timeout)."""
+        self.attach()
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            while not self._stop.is_set():
+                wait = self.tick()
+                if until_done and not self.has_work():
+                    break
+                if deadline is not None:
+                    if time.monotonic() >= deadline:
+                        break
+                    wait = min(wait, deadline - time.monotonic())
+                self._wake.wait(max(0.0, wait))
+                self._wake.clear()
+        finally:
+            self.detach()
+
+    def start(self) -> "BracketManager":
+        """Run in a background thread (for long-lived processes that keep adding brackets)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, kwargs={"until_done": False}, name="brackets", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def parse_bracket(text: str) -> Dict[str, Any]:
+    """SYMBOL:SIDE:QTY:TP:STOP:STOP_LIMIT"""
+    parts = text.split(":")
+    if len(parts) != 6:
+        raise ValueError(f"Bracket must be SYMBOL:SIDE:QTY:TP:STOP:STOP_LIMIT, got {text!r}")
+    return {"symbol": validate_symbol(parts[0]), "side": validate_side(parts[1]), "quantity": validate_quantity(parts[2]),
+            "tp_price": validate_price(parts[3]), "stop_price": validate_price(parts[4]),
+            "stop_limit_price": validate_price(parts[5])}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Many OCO brackets in one process")
+    parser.add_argument("brackets", nargs="+", help="SYMBOL:SIDE:QTY:TP:STOP:STOP_LIMIT (side of the position)")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="openOrders poll while the user stream is down")
+    parser.add_argument("--timeout", type=float, default=3600)
+    return parser
+
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
+    specs = [parse_bracket(b) for b in args.brackets]
+
+    client = client or BinanceFuturesClient()
+    client.start_time_resync()
+    manager = BracketManager(client, poll_interval=args.poll_interval)
+    try:
+        manager.add_many(specs)
+        manager.run(timeout=args.timeout)
+    except Exception as e:
+        logger.error("Brackets failed: %s", e)
+        print("Brackets failed.")
+        print(f"Error: {e}")
+        return
+
+    print("Brackets summary.")
+    for b in manager.brackets.values():
+        print(f"{b.bracket_id}: {b.symbol} {b.exit_side} {b.quantity}, TP {b.tp_price} (order {b.tp_id}), "
+              f"Stop {b.stop_price}/{b.stop_limit_price} (order {b.stop_id}), Result: {b.status if not b.is_open else 'NO_FILL'}")
+    print(f"Polls: {manager.stats['polls']}, Events: {manager.stats['events']}, Cancels: {manager.stats['cancels']}, "
+          f"Resizes: {manager.stats['resizes']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("brackets", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
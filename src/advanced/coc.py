@@ -1,69 +1,68 @@
 # src/advanced/oco.py
 from __future__ import annotations
-import time
-from typing import Dict, Any
-from ..client import BinanceFuturesClient
-from ..validators import validate_symbol, validate_side, validate_quantity, validate_price
+from typing import Dict, Any, Optional
+from ..client import BinanceFuturesClient, is_error
+from ..errors import BinanceAPIError
+from ..validators import validate_symbol, validate_side, validate_quantity, validate_price, validate_plan, FilterRejected
+from ..user_stream import wait_for_fill
 from ..logger import get_logger
 
 logger = get_logger(__name__)
 
 class OCOExecutor:
-    def __init__(self, client: BinanceFuturesClient):
-        self.client = client
+    def __init__(self, client: Optional[BinanceFuturesClient] = None):
+        self.client = client or BinanceFuturesClient()
 
     def run(self, symbol: str, side: str, quantity: float, tp_price: float, stop_price: float, stop_limit_price: float, poll_interval: float = 2.0) -> Dict[str, Any]:
         """
-        Place a take-profit limit order and a stop-limit stop-loss. Poll for fills.
+        Place a take-profit limit order and a stop-limit stop-loss, then wait for the first fill.
         tp_price: price for limit take-profit
         stop_price: trigger price for stop
         stop_limit_price: limit price for stop-limit (can equal stop_price or slightly worse)
         """
         logger.info("Placing OCO style pair")
-        # Place take-profit limit
+        # Place take-profit limit and stop-limit (STOP type with stopPrice and price) in one batch
         tp_side = "SELL" if side == "BUY" else "BUY"
-        tp = self.client.place_limit_order(symbol=symbol, side=tp_side, price=tp_price, quantity=quantity)
+        bracket, errors = validate_plan(self.client.exchange_info.get(symbol), [
+            {"symbol": symbol, "side": tp_side, "order_type": "LIMIT", "quantity": quantity,
+             "price": tp_price, "time_in_force": "GTC"},
+            {"symbol": symbol, "side": tp_side, "order_type": "STOP", "quantity": quantity,
+             "price": stop_limit_price, "stop_price": stop_price, "time_in_force": "GTC"},
+        ])
+        if errors:
+            raise FilterRejected(f"OCO {'TP' if errors[0][0] == 0 else 'stop'} leg rejected: {errors[0][1]}")
+        tp, stop = self.client.place_orders_batch(bracket)
         logger.info(f"TP order response: {tp}")
-
-        # Place stop-limit: use STOP type with stopPrice and price
-        stop = self.client.place_order(symbol=symbol, side=tp_side, order_type="STOP", quantity=quantity, price=stop_limit_price, stop_price=stop_price, time_in_force="GTC")
         logger.info(f"Stop-limit order response: {stop}")
+        for resp, other in ((tp, stop), (stop, tp)):
+            if is_error(resp):
+                if not is_error(other):
+                    # the batch is not atomic: don't leave the accepted leg working on its own
+                    try:
+                        self.client.cancel_order(symbol, other.get("orderId"))
+                    except Exception as e:
+                        logger.error("Failed to cancel orphaned leg %s: %s", other.get("orderId"), e)
+                raise BinanceAPIError.from_response(resp)
 
         tp_id = tp.get("orderId")
         stop_id = stop.get("orderId")
 
-        # Poll to see which executes
-        path_status = "/fapi/v2/order"  # fetch order by symbol & orderId (we will reuse client._request directly)
-        start = time.time()
-        timeout = 3600  # 1 hour max by default
+        # Wait for the first fill: user-stream event, REST polling only across stream gaps
         filled = None
-        while time.time() - start < timeout:
-            try:
-                tp_status = self.client._request("GET", "/fapi/v2/order", params={"symbol": symbol, "orderId": tp_id}, signed=False)
-                stop_status = self.client._request("GET", "/fapi/v2/order", params={"symbol": symbol, "orderId": stop_id}, signed=False)
-            except Exception as e:
-                logger.error("Error querying order status: %s", e)
-                time.sleep(poll_interval)
-                continue
-
-            if float(tp_status.get("executedQty", 0)) > 0:
-                filled = ("tp", tp_status)
+        hit = wait_for_fill(self.client, symbol, [tp_id, stop_id], timeout=3600, poll_interval=poll_interval)
+        if hit is not None:
+            filled_id, status = hit
+            if filled_id == tp_id:
+                filled = ("tp", status)
                 logger.info("TP filled, cancelling stop order")
-                try:
-                    self.client._request("DELETE", "/fapi/v1/order", params={"symbol": symbol, "orderId": stop_id}, signed=True)
-                except Exception as e:
-                    logger.error("Failed to cancel stop order: %s", e)
-                break
-
-            if float(stop_status.get("executedQty", 0)) > 0:
-                filled = ("stop", stop_status)
+                cancel_id, leg = stop_id, "stop"
+            else:
+                filled = ("stop", status)
                 logger.info("Stop filled, cancelling tp order")
-                try:
-                    self.client._request("DELETE", "/fapi/v1/order", params={"symbol": symbol, "orderId": tp_id}, signed=True)
-                except Exception as e:
-                    logger.error("Failed to cancel TP order: %s", e)
-                break
-
-            time.sleep(poll_interval)
+                cancel_id, leg = tp_id, "TP"
+            try:
+                self.client.cancel_order(symbol, cancel_id)
+            except Exception as e:
+                logger.error("Failed to cancel %s order: %s", leg, e)
 
         return {"filled": filled}
@@ -1,10 +1,13 @@
 # src/advanced/grid_cli.py
 from __future__ import annotations
 import argparse
-from typing import List
-from ..client import BinanceFuturesClient
-from ..validators import validate_symbol, validate_quantity
+import asyncio
+from typing import List, Optional, Tuple, Any, Dict
+from ..client import BinanceFuturesClient, is_error
+from ..exchange_info import ExchangeInfoStore, SymbolFilters
+from ..validators import validate_symbol, validate_quantity, validate_plan, FilterRejected
 from ..logger import get_logger
+from ..ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
@@ -12,32 +15,88 @@ def generate_grid_prices(lower: float, upper: float, steps: int) -> List[float]:
     step_size = (upper - lower) / steps
     return [round(lower + i * step_size, 8) for i in range(steps + 1)]
 
-def main():
+def _grid_orders(symbol: str, prices: List[float], qty: float) -> List[Dict[str, Any]]:
+    orders = []
+    for p in prices:
+        orders.append({"symbol": symbol, "side": "BUY", "order_type": "LIMIT", "price": p, "quantity": qty, "time_in_force": "GTC"})
+        orders.append({"symbol": symbol, "side": "SELL", "order_type": "LIMIT", "price": p, "quantity": qty, "time_in_force": "GTC"})
+    return orders
+
+def plan_grid(symbol: str, prices: List[float], qty: float, filters: SymbolFilters) -> List[Dict[str, Any]]:
+    """
+    Build and validate every grid order in one pass before anything is sent; prices and
+    quantities are snapped to the symbol's tick/step. Raises FilterRejected if any level can't pass.
+    """
+    orders, errors = validate_plan(filters, _grid_orders(symbol, prices, qty))
+    if errors:
+        for i, reason in errors:
+            logger.error("Grid level %s (%s) rejected: %s", prices[i // 2], "BUY" if i % 2 == 0 else "SELL", reason)
+        raise FilterRejected(f"{len(errors)} of {2 * len(prices)} grid orders rejected; first: {errors[0][1]}")
+    return orders
+
+def _collect_grid(prices: List[float], results: List[Any]) -> List[Tuple[float, Any, Any]]:
+    """Pair the flat BUY/SELL results back up with their grid price."""
+    placed = []
+    for i, p in enumerate(prices):
+        buy, sell = results[2 * i], results[2 * i + 1]
+        failed = [r for r in (buy, sell) if isinstance(r, BaseException) or is_error(r)]
+        for r in failed:
+            logger.error("Grid placement failed at %s: %s", p, r)
+        if not failed:
+            placed.append((p, buy.get("orderId"), sell.get("orderId")))
+            logger.info("Grid placed at %s: buy=%s sell=%s", p, buy, sell)
+    return placed
+
+def place_grid(symbol: str, prices: List[float], qty: float,
+               client: Optional[BinanceFuturesClient] = None) -> List[Tuple[float, Any, Any]]:
+    """
+    Place a BUY and a SELL at every price through batchOrders (5 per request, chunks in parallel).
+    Pass a client to share its connection pool.
+    """
+    client = client or BinanceFuturesClient()
+    orders = plan_grid(symbol, prices, qty, client.exchange_info.get(symbol))
+    results = client.place_orders_batch(orders)
+    return _collect_grid(prices, results)
+
+async def place_grid_async(symbol: str, prices: List[float], qty: float,
+                           filters: Optional[SymbolFilters] = None) -> List[Tuple[float, Any, Any]]:
+    """Same as place_grid but every BUY/SELL goes out concurrently on the async client."""
+    from ..async_client import AsyncBinanceFuturesClient
+
+    orders = plan_grid(symbol, prices, qty, filters or ExchangeInfoStore().get(symbol))
+    async with AsyncBinanceFuturesClient() as client:
+        results = await client.place_orders(orders)
+    return _collect_grid(prices, results)
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Simple Grid CLI")
     parser.add_argument("symbol")
     parser.add_argument("lower", type=float)
     parser.add_argument("upper", type=float)
     parser.add_argument("levels", type=int)
     parser.add_argument("qty_per_order")
-    args = parser.parse_args()
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Place all orders concurrently")
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
     lower = args.lower
     upper = args.upper
     levels = args.levels
     qty = validate_quantity(args.qty_per_order)
 
-    client = BinanceFuturesClient()
     prices = generate_grid_prices(lower, upper, levels)
-    placed = []
-    for p in prices:
-        try:
-            buy = client.place_limit_order(symbol=symbol, side="BUY", price=p, quantity=qty)
-            sell = client.place_limit_order(symbol=symbol, side="SELL", price=p, quantity=qty)
-            placed.append((p, buy.get("orderId"), sell.get("orderId")))
-            logger.info("Grid placed at %s: buy=%s sell=%s", p, buy, sell)
-        except Exception as e:
-            logger.error("Grid placement failed at %s: %s", p, e)
+    client = client or BinanceFuturesClient()
+    try:
+        if args.use_async:
+            placed = asyncio.run(place_grid_async(symbol, prices, qty, filters=client.exchange_info.get(symbol)))
+        else:
+            placed = place_grid(symbol, prices, qty, client=client)
+    except Exception as e:
+        logger.error("Grid failed: %s", e)
+        print("Grid failed.")
+        print(f"Error: {e}")
+        return
 
     print("Grid placement summary.")
     print(f"Symbol: {symbol}")
@@ -46,5 +105,10 @@ def main():
     for p, b, s in placed:
         print(f"Price: {p}, Buy ID: {b}, Sell ID: {s}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("grid", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
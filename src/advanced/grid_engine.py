@@ -0,0 +1,357 @@
+# src/advanced/grid_engine.py
+from __future__ import annotations
+import argparse
+import hashlib
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from ..client import BinanceFuturesClient, is_error
+from ..validators import validate_symbol, validate_quantity, to_decimal
+from ..logger import get_logger
+from ..ctl import forward_to_daemon
+from .grid_cli import generate_grid_prices, plan_grid
+
+logger = get_logger(__name__)
+
+RESYNC_INTERVAL = 30.0  # openOrders diff even while the user stream is healthy
+CLIENT_ID_PREFIX = "grid"
+
+
+class GridOrder(NamedTuple):
+    level: int
+    side: str
+    order_id: int
+    client_order_id: str
+
+
+def grid_tag(symbol: str, prices: List[Any], qty: Any) -> str:
+    """Short stable id for a grid definition; its orders carry it in clientOrderId so a restart finds them."""
+    key = f"{symbol}|{','.join(str(p) for p in prices)}|{qty}"
+    return CLIENT_ID_PREFIX + hashlib.sha1(key.encode()).hexdigest()[:6] + "_"
+
+
+class GridEngine:
+    """
+    Keeps one resting order per grid level: BUYs below the empty level (the hole), SELLs above it.
+    A fill moves the hole to the filled level and puts the opposite order one level away
+    (BUY at i fills -> SELL at i+1). Every change is a diff between that desired grid and the
+    orders live on the exchange, sent as one batched cancel and one batched place. The first
+    diff runs against openOrders, so a restart only touches levels that actually differ.
+    """
+
+    def __init__(self, client: Optional[BinanceFuturesClient], symbol: str, prices: List[float], qty: float,
+                 poll_interval: float = 2.0, resync_interval: float = RESYNC_INTERVAL,
+                 on_wake: Optional[Callable[[], None]] = None):
+        self.client = client or BinanceFuturesClient()
+        self.symbol = symbol
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        # snapped BUY/SELL order per level: template[2 * level] is the BUY, template[2 * level + 1] the SELL
+        self.template = plan_grid(symbol, prices, qty, self.client.exchange_info.get(symbol))
+        self.prices = [o["price"] for o in self.template[::2]]
+        self.tag = grid_tag(symbol, self.prices, self.template[0]["quantity"])
+        self.hole: Optional[int] = None
+        self.live: Dict[int, GridOrder] = {}
+        self.stats = {"fills": 0, "placed": 0, "cancelled": 0, "rejected": 0, "resyncs": 0}
+        self._strays: List[int] = []  # duplicate grid orders found on a level, cancelled on the next apply
+        self._unsure: Dict[int, GridOrder] = {}  # cancel failed (likely filled): settled on the next resync
+        self._fills: deque = deque()  # (time ms, level, side, orderId) from the stream thread or a resync
+        # orderIds applied since the last resync and in the interval before it: a duplicate report
+        # (stream redelivery, or the stream and a resync both seeing one fill) lands within that
+        # window, and rotating on every resync keeps the sets bounded on a long-running grid
+        self._seen_fills: set = set()
+        self._seen_before: set = set()
+        self._seq = int(time.time() * 1000)
+        self._stream = None
+        self._generation = 0
+        self._last_sync: Optional[float] = None
+        self._wake = threading.Event()
+        self.on_wake = on_wake
+        self._stop = threading.Event()
+
+    # ----- grid state -----
+
+    def level_of(self, client_order_id: str) -> Optional[int]:
+        if not client_order_id.startswith(self.tag):
+            return None
+        try:
+            level = int(client_order_id[len(self.tag):].split("_", 1)[0])
+        except ValueError:
+            return None
+        return level if 0 <= level < len(self.prices) else None
+
+    def desired(self, hole: int) -> Dict[int, str]:
+        return {i: "BUY" if i < hole else "SELL" for i in range(len(self.prices)) if i != hole}
+
+    def _fits(self, hole: int, price) -> bool:
+        """BUY below and SELL above the price, i.e. nothing in the desired grid is marketable."""
+        return ((hole == 0 or self.prices[hole - 1] < price)
+                and (hole == len(self.prices) - 1 or self.prices[hole + 1] > price))
+
+    def _delta_size(self, hole: int) -> int:
+        want = self.desired(hole)
+        cancels = sum(1 for lvl, o in self.live.items() if want.get(lvl) != o.side)
+        places = sum(1 for lvl, side in want.items() if lvl not in self.live or self.live[lvl].side != side)
+        return cancels + places
+
+    def choose_hole(self, price) -> int:
+        """
+        The hole that fits the price: the level at/above it or the one below. Of those, the one
+        that keeps the most existing orders, so a restart reuses what is already resting.
+        """
+        price = to_decimal(price)
+        k = bisect_left(self.prices, price)
+        candidates = [h for h in (k - 1, k) if 0 <= h < len(self.prices) and self._fits(h, price)]
+        if not candidates:
+            candidates = [min(max(k, 0), len(self.prices) - 1)]
+        return min(candidates, key=lambda h: (self._delta_size(h), abs(self.prices[h] - price)))
+
+    def wake(self) -> None:
+        """Run the next pass now instead of at its deadline; on_wake is called as well."""
+        self._wake.set()
+        if self.on_wake is not None:
+            self.on_wake()
+
+    # ----- fills -----
+
+    def _on_stream(self, kind: str, payload: Any) -> None:
+        if kind != "ORDER_TRADE_UPDATE" or payload.symbol != self.symbol or payload.status != "FILLED":
+            return
+        level = self.level_of(payload.client_order_id)
+        if level is not None:
+            self._fills.append((payload.trade_ms or payload.event_ms, level, payload.side, payload.order_id))
+            self.wake()
+
+    def _apply_fills(self) -> int:
+        fills = []
+        while self._fills:
+            fills.append(self._fills.popleft())
+        applied = 0
+        for ms, level, side, order_id in sorted(fills):
+            if order_id in self._seen_fills or order_id in self._seen_before:
+                continue
+            self._seen_fills.add(order_id)
+            self.hole = level
+            if level in self.live and self.live[level].order_id == order_id:
+                del self.live[level]
+            self._unsure.pop(order_id, None)
+            self.stats["fills"] += 1
+            applied += 1
+            logger.info("Grid %s %s filled at level %s (%s)", self.symbol, side, level, self.prices[level])
+        return applied
+
+    # ----- exchange sync -----
+
+    def resync(self) -> None:
+        """
+        Rebuild the live map from openOrders. Grid orders that vanished are looked up in the order
+        store (reconciled from the same snapshot) so a fill missed by the stream still moves the hole.
+        """
+        client = self.client
+        open_orders = client._request("GET", "/fapi/v1/openOrders", params={"symbol": self.symbol}, signed=True)
+        client.order_store.reconcile(client, self.symbol, open_orders)
+        live: Dict[int, GridOrder] = {}
+        strays: List[int] = []
+        for o in open_orders:
+            level = self.level_of(o.get("clientOrderId", ""))
+            if level is None:
+                continue
+            order = GridOrder(level, o["side"], int(o["orderId"]), o["clientOrderId"])
+            if level in live:
+                strays.append(order.order_id)
+            else:
+                live[level] = order
+        resting = {o.order_id for o in live.values()} | set(strays)
+        for order in list(self.live.values()) + list(self._unsure.values()):
+            if order.order_id in resting:
+                continue
+            rec = client.order_store.get(order.order_id)
+            if rec is not None and rec.status == "FILLED":
+                self._fills.append((rec.update_ms, order.level, order.side, order.order_id))
+        self.live, self._strays, self._unsure = live, strays, {}
+        self._seen_before, self._seen_fills = self._seen_fills, set()
+        self.stats["resyncs"] += 1
+
+    def _next_id(self, level: int) -> str:
+        self._seq += 1
+        return f"{self.tag}{level}_{self._seq:x}"
+
+    def apply(self) -> Dict[str, int]:
+        """Cancel what the desired grid doesn't want, then place what it is missing; both batched."""
+        want = self.desired(self.hole)
+        stale = [o for lvl, o in self.live.items() if want.get(lvl) != o.side]
+        cancel_ids = self._strays + [o.order_id for o in stale]
+        if cancel_ids:
+            results = self.client.cancel_orders_batch(self.symbol, cancel_ids)
+            for order_id, r in zip(cancel_ids, results):
+                if is_error(r):
+                    logger.warning("Grid cancel %s failed: %s", order_id, r)
+            failed = {oid for oid, r in zip(cancel_ids, results) if is_error(r)}
+            for o in stale:
+                del self.live[o.level]
+                if o.order_id in failed:
+                    self._unsure[o.order_id] = o
+            self.stats["cancelled"] += len(cancel_ids) - len(failed)
+            self._strays = []
+        levels = [lvl for lvl in sorted(want) if lvl not in self.live]
+        if levels:
+            orders = [dict(self.template[2 * lvl + (want[lvl] == "SELL")], client_order_id=self._next_id(lvl))
+                      for lvl in levels]
+            results = self.client.place_orders_batch(orders)
+            for lvl, o, r in zip(levels, orders, results):
+                if is_error(r):
+                    self.stats["rejected"] += 1
+                    logger.error("Grid %s at level %s (%s) rejected: %s", want[lvl], lvl, self.prices[lvl], r)
+                    continue
+                self.live[lvl] = GridOrder(lvl, want[lvl], int(r["orderId"]), o["client_order_id"])
+                self.stats["placed"] += 1
+                if r.get("status") == "FILLED":
+                    self._fills.append((int(r.get("updateTime", 0)), lvl, want[lvl], int(r["orderId"])))
+        if cancel_ids or levels:
+            logger.info("Grid %s sync: hole %s, cancelled %s, placed %s", self.symbol, self.prices[self.hole],
+                        len(cancel_ids), len(levels))
+        return {"cancelled": len(cancel_ids), "placed": len(levels)}
+
+    def step(self, resync: bool = False) -> None:
+        """Fold in fills (and a fresh openOrders snapshot when resync), then push the delta."""
+        if resync:
+            self.resync()
+        self._apply_fills()
+        if resync or self.hole is None:
+            price = self.client.latest_price(self.symbol)
+            if self.hole is None or not self._fits(self.hole, to_decimal(price)):
+                # first start, or fills we could not see moved the market past the hole
+                self.hole = self.choose_hole(price)
+        # a placement can fill on arrival; fold those in before the next wait
+        while True:
+            self.apply()
+            if not self._fills or not self._apply_fills():
+                break
+
+    # ----- lifecycle -----
+
+    def attach(self) -> None:
+        """Take fills from the user stream; without one, tick() resyncs from openOrders every poll_interval."""
+        try:
+            self._stream = self.client.user_stream.start()
+            self._stream.add_listener(self._on_stream)
+        except Exception as e:
+            logger.warning("User data stream unavailable, polling openOrders: %s", e)
+            self._stream = None
+        self._last_sync = None
+
+    def detach(self) -> None:
+        if self._stream is not None:
+            self._stream.remove_listener(self._on_stream)
+            self._stream = None
+
+    def tick(self) -> float:
+        """
+        One pass of the run loop: step(), resyncing on the first pass, while the stream is down or
+        has reconnected, and every resync_interval. Returns seconds until the next pass is due;
+        a fill calls wake() to bring it forward.
+        """
+        stream = self._stream
+        stale = stream is None or not stream.connected or stream.generation != self._generation
+        resync = stale or self._last_sync is None or time.time() - self._last_sync >= self.resync_interval
+        self.step(resync=resync)
+        if resync:
+            self._last_sync = time.time()
+            self._generation = stream.generation if stream is not None else 0
+        if stream is None or not stream.connected or stream.generation != self._generation:
+            return self.poll_interval
+        return max(0.0, self.resync_interval - (time.time() - self._last_sync))
+
+    def run(self, duration: Optional[float] = None) -> Dict[str, int]:
+        """Run until stop() or for duration seconds. Fills arrive on the user stream, else by polling openOrders."""
+        self.attach()
+        deadline = time.time() + duration if duration else None
+        logger.info("Grid engine %s: %s levels %s..%s, tag %s", self.symbol, len(self.prices),
+                    self.prices[0], self.prices[-1], self.tag)
+        try:
+            timeout = self.tick()
+            while not self._stop.is_set():
+                now = time.time()
+                if deadline is not None and now >= deadline:
+                    break
+                if deadline is not None:
+                    timeout = min(timeout, deadline - now)
+                self._wake.wait(timeout)
+                self._wake.clear()
+                try:
+                    timeout = self.tick()
+                except Exception as e:
+                    logger.error("Grid engine step failed: %s", e)
+                    timeout = self.poll_interval
+        finally:
+            self.detach()
+        return self.stats
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def cancel_all(self) -> int:
+        """Cancel every order of this grid (found by clientOrderId, so it works after a restart too)."""
+        self.resync()
+        ids = self._strays + [o.order_id for o in self.live.values()]
+        if ids:
+            self.client.cancel_orders_batch(self.symbol, ids)
+        self.live, self._strays = {}, []
+        return len(ids)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Long-running grid: one order per level, re-placed on fills")
+    parser.add_argument("symbol")
+    parser.add_argument("lower", type=float)
+    parser.add_argument("upper", type=float)
+    parser.add_argument("levels", type=int)
+    parser.add_argument("qty_per_order")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="openOrders poll while the user stream is down")
+    parser.add_argument("--resync", type=float, default=RESYNC_INTERVAL, help="openOrders diff interval (seconds)")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds (0 = until Ctrl-C)")
+    parser.add_argument("--cancel-on-exit", action="store_true", help="Cancel the grid's orders when stopping")
+    return parser
+
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
+    symbol = validate_symbol(args.symbol)
+    qty = validate_quantity(args.qty_per_order)
+    prices = generate_grid_prices(args.lower, args.upper, args.levels)
+
+    client = client or BinanceFuturesClient()
+    client.start_time_resync()
+    try:
+        engine = GridEngine(client, symbol, prices, qty, poll_interval=args.poll_interval,
+                            resync_interval=args.resync)
+        try:
+            engine.run(duration=args.duration or None)
+        except KeyboardInterrupt:
+            pass
+        cancelled = engine.cancel_all() if args.cancel_on_exit else 0
+    except Exception as e:
+        logger.error("Grid engine failed: %s", e)
+        print("Grid engine failed.")
+        print(f"Error: {e}")
+        return
+
+    stats = engine.stats
+    print("Grid engine summary.")
+    print(f"Symbol: {symbol}")
+    print(f"Levels: {len(engine.prices)}")
+    print(f"Fills: {stats['fills']}")
+    print(f"Placed: {stats['placed']}, Cancelled: {stats['cancelled']}, Rejected: {stats['rejected']}")
+    print(f"Open orders: {len(engine.live)}" + (f" (cancelled {cancelled} on exit)" if args.cancel_on_exit else ""))
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("grid_engine", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
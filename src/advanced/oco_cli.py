@@ -1,65 +1,61 @@
 # src/advanced/oco_cli.py
 from __future__ import annotations
 import argparse
-import time
-from ..client import BinanceFuturesClient
-from ..validators import validate_symbol, validate_side, validate_quantity, validate_price
+from typing import Optional, List
+from ..client import BinanceFuturesClient, is_error
+from ..errors import BinanceAPIError
+from ..validators import validate_symbol, validate_side, validate_quantity, validate_price, validate_plan, FilterRejected
+from ..user_stream import wait_for_fill
 from ..logger import get_logger
+from ..ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
 class OCOExecutorCLI:
-    def __init__(self, client: BinanceFuturesClient, poll_interval: float = 2.0, timeout: int = 3600):
-        self.client = client
+    def __init__(self, client: Optional[BinanceFuturesClient] = None, poll_interval: float = 2.0, timeout: int = 3600):
+        self.client = client or BinanceFuturesClient()
         self.poll_interval = poll_interval
         self.timeout = timeout
 
     def run(self, symbol: str, side: str, quantity: float, tp_price: float, stop_price: float, stop_limit_price: float):
         exit_side = "SELL" if side == "BUY" else "BUY"
 
-        logger.info("Placing TP order for OCO")
-        tp_resp = self.client.place_limit_order(symbol=symbol, side=exit_side, price=tp_price, quantity=quantity)
+        logger.info("Placing TP + stop-limit for OCO in one batch")
+        bracket, errors = validate_plan(self.client.exchange_info.get(symbol), [
+            {"symbol": symbol, "side": exit_side, "order_type": "LIMIT", "quantity": quantity,
+             "price": tp_price, "time_in_force": "GTC"},
+            {"symbol": symbol, "side": exit_side, "order_type": "STOP", "quantity": quantity,
+             "price": stop_limit_price, "stop_price": stop_price, "time_in_force": "GTC"},
+        ])
+        if errors:
+            raise FilterRejected(f"OCO {'TP' if errors[0][0] == 0 else 'stop'} leg rejected: {errors[0][1]}")
+        tp_resp, stop_resp = self.client.place_orders_batch(bracket)
+        if is_error(tp_resp) or is_error(stop_resp):
+            failed, leg, live = (tp_resp, "TP", stop_resp) if is_error(tp_resp) else (stop_resp, "Stop", tp_resp)
+            logger.error("%s placement failed: %s", leg, failed)
+            if not is_error(live):
+                # the batch is not atomic: don't leave the accepted leg working on its own
+                try:
+                    self.client.cancel_order(symbol, live.get("orderId"))
+                except Exception as e:
+                    logger.error("Failed cancel orphaned leg %s: %s", live.get("orderId"), e)
+            raise BinanceAPIError.from_response(failed)
         tp_id = tp_resp.get("orderId")
         logger.info("TP resp: %s", tp_resp)
-
-        logger.info("Placing stop-limit for OCO")
-        stop_resp = None
-        try:
-            stop_resp = self.client.place_order(symbol=symbol, side=exit_side, order_type="STOP", quantity=quantity,
-                                               price=stop_limit_price, stop_price=stop_price, time_in_force="GTC")
-        except Exception as e:
-            logger.error("Stop placement failed: %s", e)
-            raise
-
         stop_id = stop_resp.get("orderId")
         logger.info("Stop resp: %s", stop_resp)
 
-        start = time.time()
+        # one user-stream event (or a REST check after a stream gap), then one DELETE
         filled = None
-        while time.time() - start < self.timeout:
-            tp_status = self.client._request("GET", "/fapi/v1/order", params={"symbol": symbol, "orderId": tp_id}, signed=True)
-            stop_status = self.client._request("GET", "/fapi/v1/order", params={"symbol": symbol, "orderId": stop_id}, signed=True)
-
-            tp_executed = float(tp_status.get("executedQty", 0))
-            stop_executed = float(stop_status.get("executedQty", 0))
-
-            if tp_executed > 0:
-                filled = ("TP", tp_status)
-                try:
-                    self.client._request("DELETE", "/fapi/v1/order", params={"symbol": symbol, "orderId": stop_id}, signed=True)
-                except Exception as e:
-                    logger.error("Failed cancel stop: %s", e)
-                break
-
-            if stop_executed > 0:
-                filled = ("STOP", stop_status)
-                try:
-                    self.client._request("DELETE", "/fapi/v1/order", params={"symbol": symbol, "orderId": tp_id}, signed=True)
-                except Exception as e:
-                    logger.error("Failed cancel tp: %s", e)
-                break
-
-            time.sleep(self.poll_interval)
+        hit = wait_for_fill(self.client, symbol, [tp_id, stop_id], timeout=self.timeout, poll_interval=self.poll_interval)
+        if hit is not None:
+            filled_id, status = hit
+            leg, other, other_id = ("TP", "stop", stop_id) if filled_id == tp_id else ("STOP", "tp", tp_id)
+            filled = (leg, status)
+            try:
+                self.client.cancel_order(symbol, other_id)
+            except Exception as e:
+                logger.error("Failed cancel %s: %s", other, e)
 
         # Clean output
         print("OCO result.")
@@ -70,7 +66,7 @@ class OCOExecutorCLI:
             print(f"Filled Order ID: {filled[1].get('orderId')}")
         return {"tp": tp_resp, "stop": stop_resp, "result": filled}
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="OCO CLI")
     parser.add_argument("symbol")
     parser.add_argument("side")
@@ -78,8 +74,9 @@ def main():
     parser.add_argument("tp_price")
     parser.add_argument("stop_price")
     parser.add_argument("stop_limit_price")
-    args = parser.parse_args()
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
     side = validate_side(args.side)
     qty = validate_quantity(args.qty)
@@ -87,7 +84,8 @@ def main():
     stop_price = validate_price(args.stop_price)
     stop_limit_price = validate_price(args.stop_limit_price)
 
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
+    client.start_time_resync()
     oco = OCOExecutorCLI(client)
     try:
         oco.run(symbol, side, qty, tp_price, stop_price, stop_limit_price)
@@ -96,5 +94,10 @@ def main():
         print("OCO failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("oco", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
@@ -1,56 +1,85 @@
 # src/advanced/stop_limit.py
 from __future__ import annotations
 import argparse
+import threading
 import time
+from typing import Optional, List
 from ..client import BinanceFuturesClient
-from ..validators import validate_symbol, validate_side, validate_quantity, validate_price
+from ..validators import validate_symbol, validate_side, validate_quantity, validate_price, check_order
 from ..logger import get_logger
+from ..ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
 class StopLimitTrigger:
-    def __init__(self, client: BinanceFuturesClient):
-        self.client = client
+    def __init__(self, client: Optional[BinanceFuturesClient] = None):
+        self.client = client or BinanceFuturesClient()
 
     def wait_and_place(self, symbol: str, side: str, quantity: float,
                        trigger_price: float, limit_price: float,
                        check_interval: float = 2.0):
 
+        # check the order we'll eventually send now, not after waiting for the trigger
+        checked = check_order(self.client.exchange_info.get(symbol), side, "LIMIT", quantity, price=limit_price)
+        quantity, limit_price = checked.quantity, checked.price
         logger.info("Watching price for stop-limit: %s %s qty=%s trigger=%s limit=%s",
                     symbol, side, quantity, trigger_price, limit_price)
+        # BUY trigger: price goes down to trigger; SELL trigger: price goes up to trigger
+        hit = (lambda p: p <= trigger_price) if side == "BUY" else (lambda p: p >= trigger_price)
+        crossed = threading.Event()
+
+        def on_quote(quote):
+            if quote.symbol == symbol and quote.price is not None and hit(quote.price):
+                crossed.set()
+
+        stream = self._stream(symbol, on_quote)
         print("Watching price...")
-        while True:
-            price_info = self.client.get_symbol_price(symbol)
-            current = float(price_info["price"])
-            print(f"Current: {current}")
-            # BUY trigger: price goes down to trigger
-            if side == "BUY" and current <= trigger_price:
-                resp = self.client.place_limit_order(symbol, "BUY", limit_price, quantity)
-                logger.info("Stop-limit placed: %s", resp)
-                return {"action": "placed", "type": "LIMIT", "price": limit_price, "order": resp}
-            # SELL trigger: price goes up to trigger
-            if side == "SELL" and current >= trigger_price:
-                resp = self.client.place_limit_order(symbol, "SELL", limit_price, quantity)
-                logger.info("Stop-limit placed: %s", resp)
-                return {"action": "placed", "type": "LIMIT", "price": limit_price, "order": resp}
-            time.sleep(check_interval)
+        try:
+            while True:
+                # stream cache when connected; REST fallback keeps working through outages
+                current = self.client.latest_price(symbol, max_age=check_interval * 2)
+                print(f"Current: {current}")
+                if hit(current):
+                    resp = self.client.place_limit_order(symbol, side, limit_price, quantity)
+                    logger.info("Stop-limit placed: %s", resp)
+                    return {"action": "placed", "type": "LIMIT", "price": limit_price, "order": resp}
+                if stream is not None:
+                    crossed.wait(check_interval)
+                    crossed.clear()
+                else:
+                    time.sleep(check_interval)
+        finally:
+            if stream is not None:
+                stream.remove_listener(on_quote)
 
-def main():
+    def _stream(self, symbol: str, listener):
+        """Start (or join) the process market-data stream; None means poll over REST."""
+        try:
+            stream = self.client.market_data.start([symbol])
+        except Exception as e:
+            logger.warning("Market data stream unavailable, polling REST: %s", e)
+            return None
+        stream.add_listener(listener)
+        return stream
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Stop-Limit trigger for Binance Futures")
     parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
     parser.add_argument("side", help="BUY or SELL")
     parser.add_argument("trigger_price", help="Trigger price")
     parser.add_argument("limit_price", help="Limit price for order")
     parser.add_argument("--qty", help="Order quantity", default="0.002")
-    args = parser.parse_args()
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
     side = validate_side(args.side)
     trigger_price = validate_price(args.trigger_price)
     limit_price = validate_price(args.limit_price)
     qty = validate_quantity(args.qty)
 
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
+    client.start_time_resync()
     sl = StopLimitTrigger(client)
     try:
         result = sl.wait_and_place(symbol, side, qty, trigger_price, limit_price)
@@ -65,5 +94,10 @@ def main():
         print("Stop-limit failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("stop_limit", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,639 @@
+# src/advanced/triggers.py
+from __future__ import annotations
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from ..cache import atomic_write
+from ..client import BinanceFuturesClient, is_error, is_retryable, is_unknown
+from ..errors import BinanceAPIError
+from ..order_store import ORDER_NOT_FOUND
+from ..validators import validate_symbol, validate_side, validate_quantity, validate_price, check_order, to_decimal
+from ..logger import get_logger
+from ..ctl import forward_to_daemon
+
+logger = get_logger(__name__)
+
+KINDS = ("STOP", "TAKE_PROFIT", "TRAILING")
+CLIENT_ID_PREFIX = "trig"
+MAX_ATTEMPTS = 5         # sends (and lookups) per fired trigger before it is marked ERROR
+RETRY_MAX_DELAY = 30.0   # cap of the exponential backoff between attempts, seconds
+
+
+class Trigger:
+    """
+    One client-side conditional order. STOP fires when price reaches trigger_price against the
+    side (BUY: rises to it, SELL: falls to it), TAKE_PROFIT when it reaches it in favour of the
+    side, TRAILING when price retraces callback_rate percent from the best price seen since
+    activation_price was reached (or since it was added). Sends LIMIT at limit_price, else MARKET.
+    """
+    __slots__ = ("trigger_id", "symbol", "side", "kind", "quantity", "trigger_price", "limit_price",
+                 "callback_rate", "activation_price", "active", "extreme", "status", "fired_price",
+                 "order_id", "error", "client_order_id", "attempts", "retry_at", "unsure")
+
+    def __init__(self, trigger_id: int, symbol: str, side: str, kind: str, quantity: Decimal,
+                 trigger_price: Optional[float] = None, limit_price: Optional[Decimal] = None,
+                 callback_rate: Optional[float] = None, activation_price: Optional[float] = None):
+        self.trigger_id = trigger_id
+        self.symbol = symbol
+        self.side = side
+        self.kind = kind
+        self.quantity = quantity
+        self.trigger_price = trigger_price
+        self.limit_price = limit_price
+        self.callback_rate = callback_rate
+        self.activation_price = activation_price
+        self.active = False                  # trailing: tracking the extreme (activation reached)
+        self.extreme: Optional[float] = None  # trailing: best price since activation
+        self.status = "PENDING"              # PENDING, FIRED, PLACED, CANCELLED, ERROR
+        self.fired_price: Optional[float] = None
+        self.order_id: Optional[int] = None
+        self.error = ""
+        self.client_order_id = ""           # stable across resends and restarts, so a resend can't double up
+        self.attempts = 0
+        self.retry_at = 0.0                  # time.monotonic() before which a failed send is not retried
+        self.unsure = False                  # last send had an unknown outcome: look it up before resending
+
+    @property
+    def rises(self) -> bool:
+        """True when the level is reached from below (trailing: its activation price)."""
+        return (self.side == "BUY") == (self.kind == "STOP")
+
+    @property
+    def level(self) -> float:
+        return self.activation_price if self.kind == "TRAILING" else self.trigger_price
+
+    def order(self) -> Dict[str, Any]:
+        if self.limit_price is None:
+            return {"symbol": self.symbol, "side": self.side, "order_type": "MARKET", "quantity": self.quantity,
+                    "client_order_id": self.client_order_id}
+        return {"symbol": self.symbol, "side": self.side, "order_type": "LIMIT", "quantity": self.quantity,
+                "price": self.limit_price, "time_in_force": "GTC", "client_order_id": self.client_order_id}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.trigger_id, "symbol": self.symbol, "side": self.side, "kind": self.kind,
+                "quantity": str(self.quantity), "trigger_price": self.trigger_price,
+                "limit_price": None if self.limit_price is None else str(self.limit_price),
+                "callback_rate": self.callback_rate, "activation_price": self.activation_price,
+                "active": self.active, "extreme": self.extreme, "status": self.status,
+                "fired_price": self.fired_price, "order_id": self.order_id, "error": self.error,
+                "client_order_id": self.client_order_id, "unsure": self.unsure}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Trigger":
+        t = cls(int(d["id"]), d["symbol"], d["side"], d["kind"], to_decimal(d["quantity"]), d.get("trigger_price"),
+                None if d.get("limit_price") is None else to_decimal(d["limit_price"]), d.get("callback_rate"),
+                d.get("activation_price"))
+        t.active, t.extreme = bool(d.get("active")), d.get("extreme")
+        t.client_order_id, t.unsure = d.get("client_order_id", ""), bool(d.get("unsure"))
+        return t
+
+    def __repr__(self) -> str:
+        at = f"cb={self.callback_rate}%" if self.kind == "TRAILING" else f"@{self.trigger_price}"
+        return f"Trigger({self.trigger_id} {self.symbol} {self.side} {self.kind} {self.quantity} {at} {self.status})"
+
+
+class _Levels:
+    """Triggers sorted by level; rises=True fire once price >= level (a prefix), else price <= level (a suffix)."""
+    __slots__ = ("rises", "levels", "items")
+
+    def __init__(self, rises: bool):
+        self.rises = rises
+        self.levels: List[float] = []
+        self.items: List[Trigger] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, level: float, t: Trigger) -> None:
+        i = bisect.bisect_right(self.levels, level)  # FIFO within a level
+        self.levels.insert(i, level)
+        self.items.insert(i, t)
+
+    def remove(self, level: float, t: Trigger) -> bool:
+        i = bisect.bisect_left(self.levels, level)
+        while i < len(self.levels) and self.levels[i] == level:
+            if self.items[i] is t:
+                del self.levels[i], self.items[i]
+                return True
+            i += 1
+        return False
+
+    def pop_crossed(self, price: float) -> List[Trigger]:
+        if self.rises:
+            i = bisect.bisect_right(self.levels, price)
+            crossed = self.items[:i]
+            del self.levels[:i], self.items[:i]
+        else:
+            i = bisect.bisect_left(self.levels, price)
+            crossed = self.items[i:]
+            del self.levels[i:], self.items[i:]
+        return crossed
+
+
+class _Trailing:
+    """
+    Active trailing triggers of one symbol, side and callback rate, bucketed by the extreme they
+    track (sign-adjusted so a new extreme is always larger). A new extreme folds every bucket it
+    passes into one (smaller buckets into the largest), and the buckets far enough above the price
+    to fire are a suffix, so updates stay O(log n + k) amortised. Cancelled triggers are skipped
+    when their bucket fires.
+    """
+    __slots__ = ("sign", "factor", "keys", "buckets")
+
+    def __init__(self, side: str, callback_rate: float):
+        self.sign = 1.0 if side == "SELL" else -1.0
+        self.factor = 1 - callback_rate / 100 if side == "SELL" else 1 + callback_rate / 100
+        self.keys: List[float] = []
+        self.buckets: List[List[Trigger]] = []
+
+    def add(self, t: Trigger, extreme: float) -> None:
+        key = self.sign * extreme
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            self.buckets[i].append(t)
+        else:
+            self.keys.insert(i, key)
+            self.buckets.insert(i, [t])
+
+    def update(self, price: float) -> Tuple[List[Trigger], bool]:
+        """(fired triggers, whether any extreme moved)."""
+        x = self.sign * price
+        i = bisect.bisect_left(self.keys, x)
+        if i:
+            group = self.buckets[:i]
+            big = max(group, key=len)
+            for b in group:
+                if b is not big:
+                    big.extend(b)
+            del self.keys[:i], self.buckets[:i]
+            if self.keys and self.keys[0] == x:
+                small, big = sorted((big, self.buckets[0]), key=len)
+                big.extend(small)
+                self.buckets[0] = big
+            else:
+                self.keys.insert(0, x)
+                self.buckets.insert(0, big)
+        # fires when price has come back callback_rate off the extreme: extreme * factor reached
+        j = bisect.bisect_left(self.keys, x / self.factor)
+        fired = []
+        for key, bucket in zip(self.keys[j:], self.buckets[j:]):
+            for t in bucket:
+                if t.status == "PENDING":
+                    t.extreme = self.sign * key
+                    fired.append(t)
+        del self.keys[j:], self.buckets[j:]
+        return fired, i > 0
+
+    def entries(self) -> Iterable[Tuple[float, List[Trigger]]]:
+        return ((self.sign * k, b) for k, b in zip(self.keys, self.buckets))
+
+
+class TriggerBook:
+    """
+    Pending triggers of every symbol, no I/O: update(symbol, price) takes out and returns exactly
+    the triggers that price crosses. Fixed levels (and trailing activation prices) sit in two
+    bisect arrays per symbol, one per direction, so an update is O(log n + k); active trailing
+    triggers are grouped per side and callback rate.
+    """
+
+    def __init__(self):
+        self._levels: Dict[Tuple[str, bool], _Levels] = {}
+        self._trailing: Dict[str, Dict[Tuple[str, float], _Trailing]] = {}
+        self.moved = False  # a trailing extreme changed since the flag was last cleared
+
+    def add(self, t: Trigger) -> None:
+        if t.kind == "TRAILING" and t.active:
+            groups = self._trailing.setdefault(t.symbol, {})
+            group = groups.get((t.side, t.callback_rate))
+            if group is None:
+                group = groups[(t.side, t.callback_rate)] = _Trailing(t.side, t.callback_rate)
+            group.add(t, t.extreme)
+        else:
+            key = (t.symbol, t.rises)
+            book = self._levels.get(key)
+            if book is None:
+                book = self._levels[key] = _Levels(t.rises)
+            book.add(t.level, t)
+
+    def remove(self, t: Trigger) -> None:
+        """Take out a trigger (active trailing ones are skipped later; the caller marks them not PENDING)."""
+        if not (t.kind == "TRAILING" and t.active):
+            book = self._levels.get((t.symbol, t.rises))
+            if book is not None:
+                book.remove(t.level, t)
+
+    def update(self, symbol: str, price: float) -> List[Trigger]:
+        fired: List[Trigger] = []
+        for rises in (True, False):
+            book = self._levels.get((symbol, rises))
+            if not book:
+                continue
+            for t in book.pop_crossed(price):
+                if t.kind == "TRAILING":  # activation reached: trail from here
+                    t.active, t.extreme = True, price
+                    self.add(t)
+                    self.moved = True
+                else:
+                    fired.append(t)
+        for group in self._trailing.get(symbol, {}).values():
+            crossed, moved = group.update(price)
+            fired.extend(crossed)
+            self.moved = self.moved or moved
+        return fired
+
+    def sync_extremes(self) -> None:
+        """Copy each bucket's extreme onto its triggers (they are only kept per bucket while trailing)."""
+        for groups in self._trailing.values():
+            for group in groups.values():
+                for extreme, bucket in group.entries():
+                    for t in bucket:
+                        t.extreme = extreme
+
+
+class TriggerEngine:
+    """
+    Any number of client-side triggers across symbols in one process. Prices come from the shared
+    market-data stream, or from one ticker/price poll for all symbols while it is down. Each update
+    takes only the crossed triggers out of the TriggerBook, and whatever fired in one pass goes out
+    as one batchOrders call. With persist_path the pending set is rewritten after changes and load()
+    restores it.
+    """
+
+    def __init__(self, client: Optional[BinanceFuturesClient] = None, persist_path: Optional[str] = None,
+                 check_interval: float = 2.0, on_wake: Optional[Callable[[], None]] = None):
+        self.client = client or BinanceFuturesClient()
+        self.persist_path = persist_path
+        self.check_interval = check_interval
+        self.book = TriggerBook()
+        self.triggers: Dict[int, Trigger] = {}
+        self._fired: List[Trigger] = []
+        self._next_id = 1
+        self._session = int(time.time() * 1000)  # keeps clientOrderIds unique across runs
+        self._changed = False
+        self._stream = None
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.on_wake = on_wake
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"updates": 0, "polls": 0, "fired": 0, "placed": 0, "retries": 0, "errors": 0}
+
+    # ----- triggers -----
+
+    def add(self, symbol: str, side: str, kind: str, quantity: float, trigger_price: Optional[float] = None,
+            limit_price: Optional[float] = None, callback_rate: Optional[float] = None,
+            activation_price: Optional[float] = None) -> Trigger:
+        return self.add_many([{"symbol": symbol, "side": side, "kind": kind, "quantity": quantity,
+                               "trigger_price": trigger_price, "limit_price": limit_price,
+                               "callback_rate": callback_rate, "activation_price": activation_price}])[0]
+
+    def add_many(self, specs: List[Dict[str, Any]]) -> List[Trigger]:
+        """
+        Validate the order each trigger will send, then book all of them. specs: dicts with symbol,
+        side, kind, quantity and trigger_price (STOP / TAKE_PROFIT) or callback_rate in percent plus
+        optional activation_price (TRAILING); limit_price makes the order LIMIT (not for TRAILING).
+        """
+        prices: Dict[str, float] = {}
+        new: List[Trigger] = []
+        for spec in specs:
+            symbol, side, kind = spec["symbol"], spec["side"], spec["kind"].upper()
+            limit = spec.get("limit_price")
+            if kind not in KINDS:
+                raise ValueError(f"Trigger kind must be one of {', '.join(KINDS)}")
+            if kind == "TRAILING":
+                if limit is not None:
+                    raise ValueError("Trailing triggers send MARKET orders")
+                if not 0 < float(spec.get("callback_rate") or 0) < 100:
+                    raise ValueError("callback_rate must be between 0 and 100 (percent)")
+            elif spec.get("trigger_price") is None:
+                raise ValueError(f"{kind} trigger needs a trigger_price")
+            if symbol not in prices:
+                prices[symbol] = self.client.latest_price(symbol)
+            filters = self.client.exchange_info.get(symbol)
+            if limit is None:
+                checked = check_order(filters, side, "MARKET", spec["quantity"], mark_price=prices[symbol])
+            else:
+                checked = check_order(filters, side, "LIMIT", spec["quantity"], price=limit)
+            optional = lambda k: None if spec.get(k) is None else float(spec[k])
+            t = Trigger(0, symbol, side, kind, checked.quantity, optional("trigger_price"), checked.price,
+                        optional("callback_rate"), optional("activation_price"))
+            if kind == "TRAILING" and t.activation_price is None:
+                t.active, t.extreme = True, prices[symbol]
+            new.append(t)
+        with self._lock:
+            for t in new:
+                t.trigger_id = self._next_id
+                self._next_id += 1
+                t.client_order_id = self._client_id(t)
+                self.triggers[t.trigger_id] = t
+                self.book.add(t)
+            self._changed = True
+        logger.info("Booked %s triggers (%s pending)", len(new), len(self.pending()))
+        self._watch({t.symbol for t in new})
+        self.wake()
+        return new
+
+    def _client_id(self, t: Trigger) -> str:
+        return f"{CLIENT_ID_PREFIX}{self._session:x}_{t.trigger_id}"
+
+    def cancel(self, trigger: Trigger) -> bool:
+        with self._lock:
+            if trigger.status != "PENDING":
+                return False
+            self.book.remove(trigger)
+            trigger.status = "CANCELLED"
+            self._changed = True
+        return True
+
+    def has_work(self) -> bool:
+        """True while any trigger is pending or fired but not yet placed."""
+        return bool(self._fired) or any(t.status == "PENDING" for t in list(self.triggers.values()))
+
+    def pending(self, symbol: Optional[str] = None) -> List[Trigger]:
+        return [t for t in list(self.triggers.values())
+                if t.status == "PENDING" and (symbol is None or t.symbol == symbol)]
+
+    def wake(self) -> None:
+        """Fire what just crossed without waiting out check_interval; on_wake is called too."""
+        self._wake.set()
+        if self.on_wake is not None:
+            self.on_wake()
+
+    # ----- prices -----
+
+    def on_price(self, symbol: str, price: float) -> int:
+        """Feed one price; crossed triggers are queued for the next fire_pending(). Returns how many."""
+        with self._lock:
+            fired = self.book.update(symbol, price)
+            self.stats["updates"] += 1
+            self.stats["fired"] += len(fired)
+            for t in fired:
+                t.status, t.fired_price = "FIRED", price
+            self._fired.extend(fired)
+        if fired:
+            logger.info("%s at %s crossed %s triggers", symbol, price, len(fired))
+            self.wake()
+        return len(fired)
+
+    def _on_quote(self, quote) -> None:
+        if quote.price is not None:
+            self.on_price(quote.symbol, quote.price)
+
+    def _watch(self, symbols: Iterable[str]) -> None:
+        if self._stream is not None:
+            self._stream.subscribe(symbols)
+            return
+        try:
+            stream = self.client.market_data.start(symbols)
+        except Exception as e:
+            logger.warning("Market data stream unavailable, polling REST: %s", e)
+            return
+        stream.add_listener(self._on_quote)
+        self._stream = stream
+
+    def poll(self) -> None:
+        """One REST price round: a single ticker/price call covers every symbol with pending triggers."""
+        symbols = {t.symbol for t in self.pending()}
+        if not symbols:
+            return
+        if len(symbols) == 1:
+            rows = [self.client.get_symbol_price(next(iter(symbols)))]
+        else:
+            rows = self.client._request("GET", "/fapi/v1/ticker/price")
+        self.stats["polls"] += 1
+        for row in rows:
+            if row["symbol"] in symbols:
+                self.on_price(row["symbol"], float(row["price"]))
+
+    # ----- firing -----
+
+    def fire_pending(self) -> List[Trigger]:
+        """
+        Send every queued trigger's order in one batch. A trigger whose last send had an unknown
+        outcome is first looked up by its clientOrderId, so a resend can never place it twice.
+        """
+        now = time.monotonic()
+        with self._lock:
+            batch = [t for t in self._fired if t.retry_at <= now]
+            if not batch:
+                return []
+            self._fired = [t for t in self._fired if t.retry_at > now]
+        send = [t for t in batch if not (t.unsure and self._settle(t))]
+        results = self.client.place_orders_batch([t.order() for t in send]) if send else []
+        with self._lock:
+            for t, r in zip(send, results):
+                if not is_error(r):
+                    self._placed(t, r)
+                elif is_retryable(r):
+                    self._retry(t, str(r.get("msg")))
+                elif is_unknown(r):
+                    t.unsure = True
+                    self._retry(t, str(r.get("msg")))
+                else:
+                    t.status, t.error = "ERROR", str(r.get("msg"))
+                    self.stats["errors"] += 1
+                    logger.error("Trigger %s fired at %s but its order failed: %s", t.trigger_id, t.fired_price, r)
+            self._changed = True
+        return batch
+
+    def _settle(self, t: Trigger) -> bool:
+        """Look up an order whose send had an unknown outcome. True when it must not be sent now."""
+        try:
+            resp = self.client.get_order(t.symbol, client_order_id=t.client_order_id)
+        except BinanceAPIError as e:
+            if e.code != ORDER_NOT_FOUND:
+                with self._lock:
+                    self._retry(t, f"order lookup failed: {e}")
+                return True
+            t.unsure = False  # never reached the book: safe to send
+            return False
+        except Exception as e:
+            with self._lock:
+                self._retry(t, f"order lookup failed: {e}")
+            return True
+        with self._lock:
+            t.unsure = False
+            self._placed(t, resp)
+        return True
+
+    def _placed(self, t: Trigger, resp: Dict[str, Any]) -> None:
+        t.status, t.order_id = "PLACED", resp.get("orderId")
+        self.stats["placed"] += 1
+        logger.info("Trigger %s fired at %s: %s order %s", t.trigger_id, t.fired_price,
+                    t.order()["order_type"], t.order_id)
+
+    def _retry(self, t: Trigger, reason: str) -> None:
+        """Queue a failed send again with exponential backoff, or give up after MAX_ATTEMPTS."""
+        t.attempts += 1
+        if t.attempts >= MAX_ATTEMPTS:
+            t.status, t.error = "ERROR", reason
+            self.stats["errors"] += 1
+            logger.error("Trigger %s fired at %s; giving up after %s attempts%s: %s", t.trigger_id, t.fired_price,
+                         t.attempts, " (order may be live)" if t.unsure else "", reason)
+            return
+        t.retry_at = time.monotonic() + min(RETRY_MAX_DELAY, self.check_interval * 2 ** (t.attempts - 1))
+        self._fired.append(t)
+        self.stats["retries"] += 1
+        logger.warning("Trigger %s fired at %s; order not placed, retry %s: %s", t.trigger_id, t.fired_price,
+                       t.attempts, reason)
+
+    # ----- persistence -----
+
+    def save(self) -> None:
+        if not self.persist_path:
+            return
+        with self._lock:
+            self.book.sync_extremes()
+            self.book.moved = self._changed = False
+            # fired-but-unsent triggers are kept as pending: better sent late than lost
+            rows = [t.as_dict() for t in self.triggers.values() if t.status in ("PENDING", "FIRED")]
+        for row in rows:
+            row["status"] = "PENDING"
+        try:
+            atomic_write(self.persist_path, json.dumps({"next_id": self._next_id, "triggers": rows}).encode())
+        except OSError as e:
+            logger.warning("Could not persist triggers: %s", e)
+
+    def load(self) -> List[Trigger]:
+        """Re-book the pending set saved at persist_path (nothing if the file does not exist)."""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return []
+        with open(self.persist_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        loaded = [Trigger.from_dict(d) for d in state.get("triggers", [])]
+        with self._lock:
+            for t in loaded:
+                if t.trigger_id in self.triggers:
+                    continue
+                t.client_order_id = t.client_order_id or self._client_id(t)
+                self.triggers[t.trigger_id] = t
+                self.book.add(t)
+            self._next_id = max([self._next_id, int(state.get("next_id", 1))] + [t.trigger_id + 1 for t in loaded])
+        logger.info("Loaded %s pending triggers from %s", len(loaded), self.persist_path)
+        if loaded:
+            self._watch({t.symbol for t in loaded})
+        return loaded
+
+    # ----- lifecycle -----
+
+    def tick(self) -> float:
+        """One pass of the run loop: REST poll if the stream is down, fire, persist. Returns seconds to wait."""
+        stream = self._stream
+        if (stream is None or not stream.connected) and time.monotonic() - self._last_poll >= self.check_interval:
+            self._last_poll = time.monotonic()
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning("Trigger price poll failed: %s", e)
+        self.fire_pending()
+        if self._changed or self.book.moved:
+            self.save()
+        return self.check_interval
+
+    def detach(self) -> None:
+        """Send anything already fired, persist, and stop listening to the stream."""
+        self.fire_pending()
+        self.save()
+        if self._stream is not None:
+            self._stream.remove_listener(self._on_quote)
+            self._stream = None
+
+    def run(self, timeout: Optional[float] = None, until_done: bool = True) -> None:
+        """Poll while the stream is down, fire and persist until nothing is pending (or stop()/timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while not self._stop.is_set():
+                wait = self.tick()
+                if until_done and not self.has_work():
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                self._wake.wait(wait)
+                self._wake.clear()
+        finally:
+            self.detach()
+
+    def start(self) -> "TriggerEngine":
+        """Run in a background thread (for long-lived processes that keep adding triggers)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, kwargs={"until_done": False}, name="triggers", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def parse_trigger(text: str) -> Dict[str, Any]:
+    """SYMBOL:SIDE:stop|tp:QTY:TRIGGER[:LIMIT] or SYMBOL:SIDE:trail:QTY:CALLBACK_PCT[:ACTIVATION]"""
+    parts = text.split(":")
+    kinds = {"stop": "STOP", "tp": "TAKE_PROFIT", "trail": "TRAILING"}
+    if len(parts) not in (5, 6) or parts[2].lower() not in kinds:
+        raise ValueError(f"Trigger must be SYMBOL:SIDE:stop|tp|trail:QTY:PRICE[:PRICE], got {text!r}")
+    spec = {"symbol": validate_symbol(parts[0]), "side": validate_side(parts[1]), "kind": kinds[parts[2].lower()],
+            "quantity": validate_quantity(parts[3])}
+    extra = validate_price(parts[5]) if len(parts) == 6 else None
+    if spec["kind"] == "TRAILING":
+        spec.update(callback_rate=validate_price(parts[4]), activation_price=extra)
+    else:
+        spec.update(trigger_price=validate_price(parts[4]), limit_price=extra)
+    return spec
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Client-side stop / take-profit / trailing triggers")
+    parser.add_argument("triggers", nargs="*",
+                        help="SYMBOL:SIDE:stop|tp:QTY:TRIGGER[:LIMIT] or SYMBOL:SIDE:trail:QTY:CALLBACK_PCT[:ACTIVATION]")
+    parser.add_argument("--state", help="JSON file the pending set is saved to and resumed from")
+    parser.add_argument("--check-interval", type=float, default=2.0, help="REST poll interval while the stream is down")
+    parser.add_argument("--timeout", type=float, default=None, help="give up after this many seconds")
+    return parser
+
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
+    specs = [parse_trigger(t) for t in args.triggers]
+
+    client = client or BinanceFuturesClient()
+    client.start_time_resync()
+    engine = TriggerEngine(client, persist_path=args.state, check_interval=args.check_interval)
+    try:
+        engine.load()
+        if specs:
+            engine.add_many(specs)
+        if not engine.pending():
+            raise ValueError("No triggers given and none saved in --state")
+        print(f"Watching {len(engine.pending())} triggers...")
+        engine.run(timeout=args.timeout)
+    except Exception as e:
+        logger.error("Triggers failed: %s", e)
+        print("Triggers failed.")
+        print(f"Error: {e}")
+        return
+
+    print("Triggers summary.")
+    for t in engine.triggers.values():
+        print(f"{t.trigger_id}: {t.symbol} {t.side} {t.kind} {t.quantity}, Status: {t.status}, "
+              f"Fired at: {t.fired_price}, Order ID: {t.order_id}")
+    print(f"Fired: {engine.stats['fired']}, Placed: {engine.stats['placed']}, Retries: {engine.stats['retries']}, "
+          f"Errors: {engine.stats['errors']}, Pending: {len(engine.pending())}")
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("triggers", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,247 @@
 # src/advanced/twap.py
 from __future__ import annotations
+import heapq
+import itertools
+import threading
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Dict, Any, Optional, List, NamedTuple, Tuple
 from ..client import BinanceFuturesClient
+from ..validators import snap_quantity, to_decimal, validate_plan, check_order, FilterRejected
+from ..order_book import get_order_book
 from ..logger import get_logger
 
 logger = get_logger(__name__)
 
-class TWAPExecutor:
-    def __init__(self, client: BinanceFuturesClient):
-        self.client = client
-
-    def run(self, symbol: str, side: str, total_quantity: float, slices: int, duration_seconds: int) -> Dict[str, Any]:
-        if slices <= 0:
-            raise ValueError("slices must be > 0")
-        slice_qty = float(total_quantity) / slices
-        interval = duration_seconds / slices
-        results = []
-        logger.info(f"Running TWAP: {slices} slices every {interval:.2f}s of {slice_qty} each.")
-        for i in range(slices):
+def plan_slices(filters, total_quantity: float, slices: int) -> List[Decimal]:
+    """Equal slices snapped down to the market lot step; the remainder rides on the last slice."""
+    total = to_decimal(total_quantity)
+    base = snap_quantity(filters, total / slices, market=True)
+    last = snap_quantity(filters, total - base * (slices - 1), market=True)
+    return [base] * (slices - 1) + [last]
+
+class SliceFill(NamedTuple):
+    """What is kept of one slice: timing against its deadline and the fill, not the raw response."""
+    index: int
+    lag_ms: float       # send time minus the slice's planned deadline
+    latency_ms: float   # request round trip
+    qty: float          # sent (0 when the book had no room and the slice was deferred)
+    executed_qty: float
+    avg_price: float
+    order_id: Optional[int]
+    status: str
+    error: str = ""
+
+def send_slice(client: BinanceFuturesClient, symbol: str, side: str, index: int, qty: Decimal, due: float,
+               clock=time.monotonic) -> SliceFill:
+    """Send one market child and keep only its SliceFill; due is its deadline on clock."""
+    sent = clock()
+    lag_ms = (sent - due) * 1000
+    if qty <= 0:
+        return SliceFill(index, lag_ms, 0.0, 0.0, 0.0, 0.0, None, "DEFERRED")
+    try:
+        r = client.place_market_order(symbol=symbol, side=side, quantity=qty)
+    except Exception as e:
+        logger.error(f"Failed to place {symbol} slice {index+1}: {e}")
+        return SliceFill(index, lag_ms, (clock() - sent) * 1000, float(qty), 0.0, 0.0, None, "ERROR", str(e))
+    return SliceFill(index, lag_ms, (clock() - sent) * 1000, float(qty), float(r.get("executedQty") or 0),
+                     float(r.get("avgPrice") or 0), r.get("orderId"), r.get("status", ""))
+
+def summarize_slices(symbol: str, side: str, slices: List[SliceFill]) -> Dict[str, Any]:
+    ok = [s for s in slices if not s.error and s.qty > 0]
+    filled = sum(s.executed_qty for s in ok)
+    notional = sum(s.executed_qty * s.avg_price for s in ok)
+    lags = [s.lag_ms for s in slices]
+    return {"symbol": symbol, "side": side, "slices": slices, "executed": len(ok),
+            "errors": sum(1 for s in slices if s.error), "sent_qty": sum(s.qty for s in ok), "filled_qty": filled,
+            "avg_price": notional / filled if filled else 0.0,
+            "lag_ms_mean": sum(lags) / len(lags) if lags else 0.0, "lag_ms_max": max(lags, default=0.0)}
+
+class TWAPJob:
+    """One TWAP schedule (see build_job): slice i is due at start + i * interval on the monotonic clock."""
+
+    def __init__(self, job_id: int, symbol: str, side: str, quantities: List[Decimal], interval: float,
+                 start: float, filters, mark, book=None, max_slippage_bps: Optional[float] = None):
+        self.job_id = job_id
+        self.symbol = symbol
+        self.side = side
+        self.quantities = quantities
+        self.interval = interval
+        self.start = start
+        self.filters = filters
+        self.mark = mark
+        self.book = book
+        self.max_slippage_bps = max_slippage_bps
+        self.slices: List[SliceFill] = []
+        self.carry = Decimal(0)
+        self.cancelled = False
+        self.done = threading.Event()
+        self._lock = threading.Lock()  # slices of one job go out in order even if a send overruns the interval
+
+    def due(self, index: int) -> float:
+        return self.start + index * self.interval
+
+    def summary(self) -> Dict[str, Any]:
+        return summarize_slices(self.symbol, self.side, self.slices)
+
+    def send(self, client: BinanceFuturesClient, index: int, clock=time.monotonic) -> SliceFill:
+        """Send slice index plus whatever earlier slices deferred; the book cap never applies to the last."""
+        qty = self.quantities[index] + self.carry
+        self.carry = Decimal(0)
+        if self.book is not None and self.book.synced and index < len(self.quantities) - 1:
+            qty, self.carry = TWAPExecutor._fit_to_book(self.book, self.filters, self.side, qty,
+                                                        self.max_slippage_bps, self.mark)
+        fill = send_slice(client, self.symbol, self.side, index, qty, self.due(index), clock)
+        if fill.order_id is not None:
+            logger.info(f"TWAP {self.job_id} slice {index+1}/{len(self.quantities)} placed ({fill.lag_ms:.1f}ms after deadline)")
+        return fill
+
+def build_job(client: BinanceFuturesClient, job_id: int, symbol: str, side: str, total_quantity: float, slices: int,
+              duration_seconds: float, start: float, max_slippage_bps: Optional[float] = None) -> TWAPJob:
+    """TWAPJob whose slice 0 is due at start (monotonic clock); see TWAPScheduler.submit."""
+    if slices <= 0:
+        raise ValueError("slices must be > 0")
+    # validate the whole schedule up front so a bad slice can't strand a half-done TWAP
+    filters = client.exchange_info.get(symbol)
+    mark = client.latest_mark_price(symbol)
+    plan = [{"side": side, "order_type": "MARKET", "quantity": q} for q in plan_slices(filters, total_quantity, slices)]
+    checked, errors = validate_plan(filters, plan, mark_price=mark)
+    if errors:
+        raise FilterRejected(f"TWAP slice {errors[0][0] + 1} rejected: {errors[0][1]}")
+    book = get_order_book(client, symbol) if max_slippage_bps is not None else None
+    job = TWAPJob(job_id, symbol, side, [c["quantity"] for c in checked], duration_seconds / slices,
+                  start, filters, mark, book, max_slippage_bps)
+    logger.info(f"Running TWAP {job.job_id} {symbol} {side}: {slices} slices every {job.interval:.2f}s of {checked[0]['quantity']} each.")
+    return job
+
+class TWAPScheduler:
+    """
+    Runs any number of TWAPs from one timer thread. Every slice deadline is fixed when the job is
+    submitted, so request latency or errors never push later slices back. Due slices go to a small
+    worker pool, so a slow request on one symbol doesn't delay another symbol's slice.
+    """
+
+    def __init__(self, client: Optional[BinanceFuturesClient] = None, max_workers: int = 8):
+        self.client = client or BinanceFuturesClient()
+        self.clock = time.monotonic
+        self._heap: List[Tuple[float, int, TWAPJob, int]] = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="twap")
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.jobs: List[TWAPJob] = []  # finished jobs are pruned on the next submit
+
+    def submit(self, symbol: str, side: str, total_quantity: float, slices: int, duration_seconds: float,
+               max_slippage_bps: Optional[float] = None, start_delay: float = 0.0) -> TWAPJob:
+        """
+        Validate the whole schedule and queue it; slice 0 is due start_delay seconds from now.
+        max_slippage_bps: when set, each slice is capped at what the local order book absorbs within
+        that many bps of the touch; the rest is deferred to later slices (the last slice sends all).
+        """
+        job = build_job(self.client, next(self._ids), symbol, side, total_quantity, slices, duration_seconds,
+                        self.clock() + start_delay, max_slippage_bps)
+        self.jobs = [j for j in self.jobs if not j.done.is_set()] + [job]
+        self._push(job, 0)
+        self.start()
+        return job
+
+    def cancel(self, job: TWAPJob) -> None:
+        """Drop the job's remaining slices (one already in flight still completes first)."""
+        job.cancelled = True
+        with job._lock:
+            job.done.set()
+
+    def _push(self, job: TWAPJob, index: int) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (job.due(index), next(self._seq), job, index))
+            self._cond.notify()
+
+    # ----- timer thread -----
+
+    def start(self) -> "TWAPScheduler":
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="twap-timer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None and wait:
+            self._thread.join()
+        self._pool.shutdown(wait=wait)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                        continue
+                    delay = self._heap[0][0] - self.clock() if self._heap else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if self._stopping:
+                    return
+                _, _, job, index = heapq.heappop(self._heap)
+                if index + 1 < len(job.quantities):
+                    # next deadline comes from the plan, not from when this slice finishes
+                    heapq.heappush(self._heap, (job.due(index + 1), next(self._seq), job, index + 1))
+            self._pool.submit(self._fire, job, index)
+
+    def _fire(self, job: TWAPJob, index: int) -> None:
+        last = index == len(job.quantities) - 1
+        with job._lock:
             try:
-                r = self.client.place_market_order(symbol=symbol, side=side, quantity=slice_qty)
-                results.append(r)
-                logger.info(f"TWAP slice {i+1}/{slices} placed")
-            except Exception as e:
-                logger.error(f"Failed to place TWAP slice {i+1}: {e}")
-                results.append({"error": str(e)})
-            time.sleep(interval)
-        return {"results": results}
+                if not job.cancelled:
+                    job.slices.append(job.send(self.client, index, self.clock))
+            finally:
+                if last or job.cancelled:
+                    job.done.set()
+
+    def join(self, jobs: Optional[List[TWAPJob]] = None, timeout: Optional[float] = None) -> bool:
+        """Wait for jobs (default: everything submitted so far); False if the timeout ran out first."""
+        jobs = list(self.jobs) if jobs is None else jobs
+        deadline = None if timeout is None else self.clock() + timeout
+        for job in jobs:
+            if not job.done.wait(None if deadline is None else max(0.0, deadline - self.clock())):
+                return False
+        return True
+
+class TWAPExecutor:
+    def __init__(self, client: Optional[BinanceFuturesClient] = None):
+        self.client = client or BinanceFuturesClient()
+
+    def run(self, symbol: str, side: str, total_quantity: float, slices: int, duration_seconds: int,
+            max_slippage_bps: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Blocking single TWAP on a private TWAPScheduler; returns the job summary.
+        max_slippage_bps: see TWAPScheduler.submit.
+        """
+        scheduler = TWAPScheduler(self.client, max_workers=1)
+        try:
+            job = scheduler.submit(symbol, side, total_quantity, slices, duration_seconds,
+                                   max_slippage_bps=max_slippage_bps)
+            job.done.wait()
+        finally:
+            scheduler.stop()
+        return job.summary()
+
+    @staticmethod
+    def _fit_to_book(book, filters, side: str, qty: Decimal, max_slippage_bps: float, mark) -> Tuple[Decimal, Decimal]:
+        """Split qty into (send now, defer) so the send-now part stays within max_slippage_bps."""
+        room = snap_quantity(filters, to_decimal(book.executable_qty(side, float(qty), max_slippage_bps)), market=True)
+        if room >= qty:
+            return qty, Decimal(0)
+        try:
+            check_order(filters, side, "MARKET", room, mark_price=book.mid() or mark, snap=False)
+        except FilterRejected:
+            room = Decimal(0)  # too thin to send anything valid: wait for the next slice
+        logger.info("TWAP: book holds %s of %s within %s bps, deferring %s", room, qty, max_slippage_bps, qty - room)
+        return room, qty - room
@@ -1,43 +1,56 @@
 # src/advanced/twap_cli.py
 from __future__ import annotations
 import argparse
+from typing import List, Optional
 from ..client import BinanceFuturesClient
 from ..advanced.twap import TWAPExecutor
 from ..validators import validate_symbol, validate_side, validate_quantity
 from ..logger import get_logger
+from ..ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="TWAP CLI")
     parser.add_argument("symbol")
     parser.add_argument("side")
     parser.add_argument("total_qty")
     parser.add_argument("slices", type=int)
     parser.add_argument("duration", type=int)
-    args = parser.parse_args()
+    parser.add_argument("--max-slippage-bps", type=float, help="Cap each slice at the book depth within this many bps")
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
     side = validate_side(args.side)
     total_qty = validate_quantity(args.total_qty)
     slices = args.slices
     duration = args.duration
 
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
+    client.start_time_resync()
     twap = TWAPExecutor(client)
     try:
-        summary = twap.run(symbol=symbol, side=side, total_quantity=total_qty, slices=slices, duration_seconds=duration)
+        summary = twap.run(symbol=symbol, side=side, total_quantity=total_qty, slices=slices, duration_seconds=duration,
+                           max_slippage_bps=args.max_slippage_bps)
         logger.info("TWAP summary: %s", summary)
         print("TWAP summary.")
         print(f"Symbol: {symbol}")
         print(f"Side: {side}")
         print(f"Total Qty: {total_qty}")
         print(f"Slices: {slices}")
-        print(f"Executed slices: {len(summary.get('slices', []))}")
+        print(f"Executed slices: {summary['executed']}")
+        print(f"Filled Qty: {summary['filled_qty']}, Avg Price: {summary['avg_price']:.8g}")
+        print(f"Schedule lag: mean {summary['lag_ms_mean']:.1f}ms, max {summary['lag_ms_max']:.1f}ms")
     except Exception as e:
         logger.error("TWAP failed: %s", e)
         print("TWAP failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("twap", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,233 @@
+# src/advanced/vwap.py
+from __future__ import annotations
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+import numpy as np
+from ..client import BinanceFuturesClient
+from ..history import HistoryDownloader, load_klines
+from ..market_data import MarketDataStream, ws_url_for
+from ..validators import check_order, snap_quantity, to_decimal, FilterRejected
+from ..logger import get_logger
+from .twap import SliceFill, send_slice, summarize_slices
+
+logger = get_logger(__name__)
+
+DAY_MS = 86_400_000
+PROFILE_BUCKET_MS = 300_000  # 5-minute buckets, 288 per UTC day
+PROFILE_INTERVAL = "5m"
+
+def volume_profile(open_time: np.ndarray, volume: np.ndarray, bucket_ms: int = PROFILE_BUCKET_MS) -> np.ndarray:
+    """Share of a UTC day's volume traded in each bucket_ms bucket, pooled over every day given; sums to 1."""
+    n = DAY_MS // bucket_ms
+    buckets = (np.asarray(open_time, dtype=np.int64) % DAY_MS) // bucket_ms
+    totals = np.bincount(buckets, weights=np.asarray(volume, dtype=np.float64), minlength=n)
+    total = totals.sum()
+    return totals / total if total > 0 else np.full(n, 1.0 / n)
+
+def load_volume_profile(client: BinanceFuturesClient, symbol: str, days: int = 5,
+                        bucket_ms: int = PROFILE_BUCKET_MS, root: Optional[str] = None) -> np.ndarray:
+    """Profile from the last `days` of stored 5m klines, downloading whatever the store is missing first."""
+    end = int(time.time() * 1000)
+    start = end - days * DAY_MS
+    downloader = HistoryDownloader(client, root=root, workers=4)
+    try:
+        downloader.klines(symbol, PROFILE_INTERVAL, start, end)
+    finally:
+        downloader.close()
+    bars = load_klines(symbol, PROFILE_INTERVAL, root)
+    keep = bars["open_time"] >= start
+    return volume_profile(bars["open_time"][keep], bars["volume"][keep], bucket_ms)
+
+def curve_weights(profile: np.ndarray, start_ms: int, duration_ms: int, slices: int) -> np.ndarray:
+    """
+    Expected share of volume in each of `slices` equal windows from start_ms: the day-periodic
+    profile integrated over each window (linear inside a bucket), normalised to sum to 1.
+    """
+    bucket_ms = DAY_MS // len(profile)
+    cum = np.concatenate(([0.0], np.cumsum(profile)))
+    edges = start_ms + np.arange(slices + 1, dtype=np.int64) * duration_ms // slices
+    day, rem = np.divmod(edges, DAY_MS)
+    b = rem // bucket_ms
+    F = day * cum[-1] + cum[b] + profile[b] * (rem - b * bucket_ms) / bucket_ms
+    w = np.diff(F)
+    total = w.sum()
+    return w / total if total > 0 else np.full(slices, 1.0 / slices)
+
+def allocate(weights: np.ndarray, units: int) -> np.ndarray:
+    """Split `units` lot steps by weight; cumulative rounding keeps the total exact and no entry negative."""
+    cum = np.floor(np.cumsum(weights) / weights.sum() * units + 1e-9).astype(np.int64)
+    cum[-1] = units
+    return np.diff(cum, prepend=0)
+
+def refresh_mark(client: BinanceFuturesClient, symbol: str, mark: float) -> float:
+    """Current mark price for a child's MIN_NOTIONAL check; keeps the last one if it can't be read."""
+    try:
+        return client.latest_mark_price(symbol)
+    except Exception as e:
+        logger.warning("Mark price refresh for %s failed, reusing %s: %s", symbol, mark, e)
+        return mark
+
+
+class VWAPExecutor:
+    """
+    Market children on fixed monotonic deadlines whose sizes follow the intraday volume curve.
+    Before every child the remaining quantity is re-spread over the rest of the curve, so errors
+    and children too small to send are absorbed by later slices in proportion to their volume.
+    """
+
+    def __init__(self, client: Optional[BinanceFuturesClient] = None):
+        self.client = client or BinanceFuturesClient()
+
+    def run(self, symbol: str, side: str, total_quantity: float, duration_seconds: float, slices: int,
+            profile: Optional[np.ndarray] = None, days: int = 5) -> Dict[str, Any]:
+        if slices <= 0:
+            raise ValueError("slices must be > 0")
+        filters = self.client.exchange_info.get(symbol)
+        mark = self.client.latest_mark_price(symbol)
+        total = check_order(filters, side, "MARKET", total_quantity, mark_price=mark).quantity
+        if profile is None:
+            profile = load_volume_profile(self.client, symbol, days)
+        weights = curve_weights(profile, int(time.time() * 1000), int(duration_seconds * 1000), slices)
+        step = filters.market_step_size
+        interval = duration_seconds / slices
+        logger.info("Running VWAP %s %s %s over %ss in %s slices (largest %.1f%%)", symbol, side, total,
+                    duration_seconds, slices, weights.max() * 100)
+        start = time.monotonic()
+        done = Decimal(0)
+        fills: List[SliceFill] = []
+        for i in range(slices):
+            due = start + i * interval
+            time.sleep(max(0.0, due - time.monotonic()))
+            remaining = total - done
+            if remaining <= 0:
+                break
+            last = i == slices - 1
+            # re-plan: the rest of the curve shares what is still to do
+            qty = remaining if last else int(allocate(weights[i:], int(remaining / step))[0]) * step
+            mark = refresh_mark(self.client, symbol, mark)
+            try:
+                qty = check_order(filters, side, "MARKET", qty, mark_price=mark).quantity
+            except FilterRejected as e:
+                if last:
+                    fills.append(SliceFill(i, (time.monotonic() - due) * 1000, 0.0, 0.0, 0.0, 0.0, None, "ERROR", str(e)))
+                    logger.error("VWAP final slice rejected, %s left unsent: %s", remaining, e)
+                    break
+                qty = Decimal(0)  # below min size: the re-plan moves it to later slices
+            fill = send_slice(self.client, symbol, side, i, qty, due)
+            fills.append(fill)
+            if fill.order_id is not None:
+                done += qty
+                logger.info("VWAP slice %s/%s: %s (%.1f%% of plan)", i + 1, slices, qty, weights[i] * 100)
+        return summarize_slices(symbol, side, fills)
+
+class TradeFlow:
+    """
+    Market volume traded in one symbol since start(). Reads its own aggTrade-only stream; without a
+    WebSocket endpoint, poll() pages GET /fapi/v1/aggTrades by id instead. Trades missed while the
+    stream reconnects are not counted, which only makes POV trade less, never more.
+    """
+
+    def __init__(self, client: BinanceFuturesClient, symbol: str):
+        self.client = client
+        self.symbol = symbol
+        self.volume = 0.0
+        self.trades = 0
+        self._stream: Optional[MarketDataStream] = None
+        self._last_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "TradeFlow":
+        try:
+            stream = MarketDataStream(ws_url_for(self.client.base_url), streams=("aggTrade",))
+        except ValueError as e:
+            logger.warning("Trade stream unavailable, polling aggTrades: %s", e)
+            rows = self.client._request("GET", "/fapi/v1/aggTrades", params={"symbol": self.symbol, "limit": 1})
+            self._last_id = int(rows[-1]["a"]) if rows else 0
+            return self
+        stream.add_listener(self._on_trade)
+        self._stream = stream.start([self.symbol])
+        return self
+
+    def stop(self) -> None:
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream = None
+
+    def add(self, qty: float) -> None:
+        with self._lock:
+            self.volume += qty
+            self.trades += 1
+
+    def _on_trade(self, quote) -> None:
+        if quote.symbol == self.symbol and quote.last_qty:
+            self.add(quote.last_qty)
+
+    def poll(self) -> None:
+        """Catch up over REST (no-op while the stream is in use)."""
+        if self._last_id is None:
+            return
+        while True:
+            rows = self.client._request("GET", "/fapi/v1/aggTrades",
+                                        params={"symbol": self.symbol, "fromId": self._last_id + 1, "limit": 1000})
+            if not rows:
+                return
+            qty = np.fromiter((float(r["q"]) for r in rows), dtype=np.float64, count=len(rows))
+            with self._lock:
+                self.volume += float(qty.sum())
+                self.trades += len(rows)
+            self._last_id = int(rows[-1]["a"])
+            if len(rows) < 1000:
+                return
+
+class POVExecutor:
+    """
+    Percent of volume: every check_interval, send whatever brings our quantity up to rate x the
+    market volume printed since the start (our own prints included, as on the tape).
+    """
+
+    def __init__(self, client: Optional[BinanceFuturesClient] = None):
+        self.client = client or BinanceFuturesClient()
+
+    def run(self, symbol: str, side: str, total_quantity: float, rate: float, max_duration: float,
+            check_interval: float = 1.0, flow: Optional[TradeFlow] = None) -> Dict[str, Any]:
+        if not 0 < rate < 1:
+            raise ValueError("rate must be between 0 and 1")
+        filters = self.client.exchange_info.get(symbol)
+        mark = self.client.latest_mark_price(symbol)
+        total = check_order(filters, side, "MARKET", total_quantity, mark_price=mark).quantity
+        own_flow = flow is None
+        flow = flow or TradeFlow(self.client, symbol).start()
+        logger.info("Running POV %s %s %s at %.1f%% of volume for up to %ss", symbol, side, total, rate * 100, max_duration)
+        start = time.monotonic()
+        done = Decimal(0)
+        fills: List[SliceFill] = []
+        i = 0
+        try:
+            while done < total and time.monotonic() - start < max_duration:
+                due = start + (i + 1) * check_interval
+                time.sleep(max(0.0, due - time.monotonic()))
+                i += 1
+                flow.poll()
+                target = min(total, snap_quantity(filters, to_decimal(flow.volume * rate), market=True))
+                qty = target - done
+                if qty <= 0:
+                    continue
+                mark = refresh_mark(self.client, symbol, mark)
+                try:
+                    qty = check_order(filters, side, "MARKET", qty, mark_price=mark, snap=False).quantity
+                except FilterRejected:
+                    continue  # not enough volume yet for a valid child
+                fill = send_slice(self.client, symbol, side, len(fills), qty, due)
+                fills.append(fill)
+                if fill.order_id is not None:
+                    done += qty
+                    logger.info("POV child %s: %s (%s of %s, market volume %.6g)", len(fills), qty, done, total, flow.volume)
+        finally:
+            if own_flow:
+                flow.stop()
+        summary = summarize_slices(symbol, side, fills)
+        summary["market_volume"] = flow.volume
+        summary["participation"] = float(done) / flow.volume if flow.volume else 0.0
+        return summary
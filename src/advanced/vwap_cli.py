@@ -0,0 +1,59 @@
+# src/advanced/vwap_cli.py
+from __future__ import annotations
+import argparse
+from typing import List, Optional
+from ..client import BinanceFuturesClient
+from ..advanced.vwap import VWAPExecutor, POVExecutor
+from ..validators import validate_symbol, validate_side, validate_quantity
+from ..logger import get_logger
+from ..ctl import forward_to_daemon
+
+logger = get_logger(__name__)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="VWAP / percent-of-volume CLI")
+    parser.add_argument("mode", choices=("vwap", "pov"))
+    parser.add_argument("symbol")
+    parser.add_argument("side")
+    parser.add_argument("total_qty")
+    parser.add_argument("duration", type=float, help="vwap: schedule length; pov: give up after this many seconds")
+    parser.add_argument("--slices", type=int, default=60, help="vwap: number of children")
+    parser.add_argument("--days", type=int, default=5, help="vwap: days of 5m klines in the volume curve")
+    parser.add_argument("--rate", type=float, default=0.05, help="pov: target share of market volume")
+    parser.add_argument("--check-interval", type=float, default=1.0, help="pov: seconds between children")
+    return parser
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
+    symbol = validate_symbol(args.symbol)
+    side = validate_side(args.side)
+    total_qty = validate_quantity(args.total_qty)
+
+    client = client or BinanceFuturesClient()
+    client.start_time_resync()
+    try:
+        if args.mode == "vwap":
+            summary = VWAPExecutor(client).run(symbol, side, total_qty, args.duration, args.slices, days=args.days)
+        else:
+            summary = POVExecutor(client).run(symbol, side, total_qty, args.rate, args.duration,
+                                              check_interval=args.check_interval)
+        logger.info("%s summary: %s", args.mode.upper(), {k: v for k, v in summary.items() if k != "slices"})
+        print(f"{args.mode.upper()} summary.")
+        print(f"Symbol: {symbol}")
+        print(f"Side: {side}")
+        print(f"Total Qty: {total_qty}")
+        print(f"Children sent: {summary['executed']}, Errors: {summary['errors']}")
+        print(f"Sent Qty: {summary['sent_qty']:.8g}, Filled Qty: {summary['filled_qty']:.8g}, Avg Price: {summary['avg_price']:.8g}")
+        if args.mode == "pov":
+            print(f"Market volume: {summary['market_volume']:.8g}, Participation: {summary['participation']:.2%}")
+    except Exception as e:
+        logger.error("%s failed: %s", args.mode.upper(), e)
+        print(f"{args.mode.upper()} failed.")
+        print(f"Error: {e}")
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("vwap", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    main()
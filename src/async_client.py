@@ -0,0 +1,222 @@
+# src/async_client.py
+from __future__ import annotations
+import asyncio
+import os
+import time
+import aiohttp
+from yarl import URL
+from typing import Dict, Any, Optional, List, Awaitable, Iterable, Union
+from .logger import get_logger
+from .signing import RequestSigner, encode_query, coerce_number
+from .clock import ClockSync, TIMESTAMP_ERROR
+from .errors import BinanceAPIError
+from .rate_limiter import RateGovernor, get_shared_governor, request_weight, order_count, classify_priority
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = get_logger(__name__)
+
+
+class AsyncBinanceFuturesClient:
+    """
+    asyncio counterpart of BinanceFuturesClient.
+    Same signing, time offset and error semantics as the blocking client, but independent
+    calls can be fanned out with gather() so N requests cost about one round trip.
+
+        async with AsyncBinanceFuturesClient() as client:
+            results = await client.place_orders([...])
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, base_url: Optional[str] = None,
+                 session: Optional[aiohttp.ClientSession] = None, timeout: float = 15.0, max_concurrency: int = 32,
+                 governor: Optional[RateGovernor] = None, clock: Optional[ClockSync] = None):
+        self.api_key = api_key or os.getenv("BINANCE_API_KEY")
+        self.api_secret = api_secret or os.getenv("BINANCE_API_SECRET")
+        self.base_url = base_url or os.getenv("BINANCE_BASE_URL", "https://fapi.binance.com")
+        if not self.api_key or not self.api_secret:
+            logger.error("API key/secret not provided. Set BINANCE_API_KEY and BINANCE_API_SECRET.")
+            raise ValueError("API key/secret missing")
+        self._signer = RequestSigner(self.api_secret)
+        self.session = session
+        self._owns_session = session is None
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=3.05)
+        self.max_concurrency = max_concurrency
+        # request weight / order count limiter, shared with blocking clients in this process
+        self.governor = governor or get_shared_governor()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # server clock model, shared on disk with the blocking client
+        self.clock = clock or ClockSync(self.base_url)
+
+    @property
+    def time_offset(self) -> int:
+        """Offset between server and local time (ms)."""
+        return int(self.clock.offset_ms)
+
+    @classmethod
+    async def create(cls, **kwargs) -> "AsyncBinanceFuturesClient":
+        client = cls(**kwargs)
+        await client.start()
+        return client
+
+    async def start(self) -> None:
+        """Open the connection pool and sync server time (unless a fresh offset is cached)."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            if not self.clock.load():
+                await self._sync_time()
+        except Exception as e:
+            # don't fail hard — keep offset 0 but log
+            logger.warning("Failed to sync server time: %s — continuing with local time", e)
+
+    async def close(self) -> None:
+        if self.session is not None and self._owns_session:
+            await self.session.close()
+        self.session = None
+
+    async def __aenter__(self) -> "AsyncBinanceFuturesClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _sync_time(self) -> None:
+        """
+        Query Binance server time and compute offset (server_time - local_time).
+        """
+        try:
+            url = self.base_url.rstrip("/") + "/fapi/v1/time"
+            await self.governor.acquire_async(request_weight("GET", "/fapi/v1/time"))
+            sent = time.time() * 1000
+            async with self.session.get(url) as resp:
+                received = time.time() * 1000
+                self.governor.update_from_headers(resp.headers, resp.status)
+                data = await resp.json(content_type=None)
+                status = resp.status
+            # a 429/418 body has no serverTime; recording 0 would persist a bogus offset
+            if status >= 400 or not isinstance(data, dict) or "serverTime" not in data:
+                raise BinanceAPIError.from_response(data, status)
+            self.clock.record(int(data["serverTime"]), sent, received)
+        except Exception as e:
+            logger.error("Error syncing time: %s", e)
+            raise
+
+    def _sign(self, params: Dict[str, Any]) -> str:
+        return self._signer.sign(encode_query(params))
+
+    async def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, signed: bool = False,
+                       priority: Optional[int] = None) -> Dict[str, Any]:
+        if self.session is None:
+            raise RuntimeError("Client not started; use 'async with' or await create()")
+        url = self.base_url.rstrip("/") + path
+        params = params.copy() if params else {}
+        method = method.upper()
+        if priority is None:
+            priority = classify_priority(method, path, params)
+        weight = request_weight(method, path, params)
+        orders = order_count(method, path, params)
+        headers = {"X-MBX-APIKEY": self.api_key}
+        if method not in ("GET", "POST", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        try:
+            async with self._semaphore:
+                for attempt in range(2):
+                    # wait for rate budget before stamping, so queue time doesn't eat into recvWindow;
+                    # the -1021 resend is a second request and is charged again
+                    await self.governor.acquire_async(weight, orders, priority)
+                    if signed:
+                        # correct timestamp using the server clock model
+                        params["timestamp"] = self.clock.now_ms()
+                        params["recvWindow"] = params.get("recvWindow", 5000)
+                        params.pop("signature", None)
+                        query = encode_query(params)
+                        params["signature"] = self._signer.sign(query)
+                        query = f"{query}&signature={params['signature']}"
+                    else:
+                        query = encode_query(params)
+                    # send exactly the signed string; yarl must not re-quote it
+                    target = URL(url + ("?" + query if query else ""), encoded=True)
+                    async with self.session.request(method, target, headers=headers) as resp:
+                        self.governor.update_from_headers(resp.headers, resp.status)
+                        try:
+                            data = await resp.json(content_type=None)
+                        except Exception:
+                            resp.raise_for_status()
+                            data = {}
+                        status = resp.status
+                    if (status >= 400 and signed and attempt == 0 and isinstance(data, dict)
+                            and data.get("code") == TIMESTAMP_ERROR):
+                        # clock drifted outside recvWindow: resync and resend once with a fresh stamp
+                        logger.warning("Timestamp rejected (-1021); resyncing clock and retrying %s %s", method, path)
+                        await self._sync_time()
+                        continue
+                    break
+
+            if status >= 400:
+                logger.error("HTTP %s error: %s", status, data)
+                raise BinanceAPIError.from_response(data, status)
+
+            logger.info("Request %s %s params=%s response=%s", method, path, params, data)
+            return data
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Network error: %s", e)
+            raise
+
+    # Public helpers
+    async def place_order(self, symbol: str, side: str, order_type: str, quantity: float, price: Optional[float] = None,
+                          time_in_force: Optional[str] = None, reduce_only: bool = False, stop_price: Optional[float] = None) -> Dict[str, Any]:
+        path = "/fapi/v1/order"
+        params: Dict[str, Any] = {
+            "symbol": symbol,
+            "side": side,
+            "type": order_type,
+            "quantity": coerce_number(quantity),
+        }
+        if price is not None:
+            params["price"] = coerce_number(price)
+        if time_in_force:
+            params["timeInForce"] = time_in_force
+        if reduce_only:
+            params["reduceOnly"] = "true"
+        if stop_price is not None:
+            params["stopPrice"] = coerce_number(stop_price)
+
+        return await self._request("POST", path, params=params, signed=True)
+
+    async def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict[str, Any]:
+        return await self.place_order(symbol=symbol, side=side, order_type="MARKET", quantity=quantity)
+
+    async def place_limit_order(self, symbol: str, side: str, price: float, quantity: float, time_in_force: str = "GTC") -> Dict[str, Any]:
+        return await self.place_order(symbol=symbol, side=side, order_type="LIMIT", price=price, quantity=quantity, time_in_force=time_in_force)
+
+    async def get_symbol_price(self, symbol: str) -> Dict[str, Any]:
+        path = "/fapi/v1/ticker/price"
+        return await self._request("GET", path, params={"symbol": symbol}, signed=False)
+
+    async def get_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        return await self._request("GET", "/fapi/v1/order", params={"symbol": symbol, "orderId": order_id}, signed=True)
+
+    async def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        return await self._request("DELETE", "/fapi/v1/order", params={"symbol": symbol, "orderId": order_id}, signed=True)
+
+    # Fan-out helpers
+    @staticmethod
+    async def gather(calls: Iterable[Awaitable[Any]], return_exceptions: bool = True) -> List[Union[Any, BaseException]]:
+        """
+        Run independent calls concurrently; results keep the input order.
+        With return_exceptions=True a failed call yields its exception instead of aborting the rest.
+        """
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+    async def place_orders(self, orders: List[Dict[str, Any]]) -> List[Union[Dict[str, Any], BaseException]]:
+        """orders: list of place_order keyword dicts."""
+        return await self.gather(self.place_order(**o) for o in orders)
+
+    async def get_orders(self, symbol: str, order_ids: List[int]) -> List[Union[Dict[str, Any], BaseException]]:
+        return await self.gather(self.get_order(symbol, oid) for oid in order_ids)
+
+    async def cancel_orders(self, symbol: str, order_ids: List[int]) -> List[Union[Dict[str, Any], BaseException]]:
+        return await self.gather(self.cancel_order(symbol, oid) for oid in order_ids)
@@ -0,0 +1,351 @@
+# src/backtest.py
+from __future__ import annotations
+import argparse
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from .history import INTERVAL_MS, load_klines, parse_time
+from .validators import validate_symbol, validate_side
+from .logger import get_logger
+from .ctl import forward_to_daemon
+
+logger = get_logger(__name__)
+
+FUNDING_PERIOD_MS = 8 * 3_600_000
+FILL_DTYPE = np.dtype([("time", "<i8"), ("bar", "<i8"), ("side", "i1"), ("price", "<f8"), ("qty", "<f8"),
+                       ("fee", "<f8"), ("maker", "?")])
+_BIG = np.iinfo(np.int64).max // 4
+
+
+class FillModel(NamedTuple):
+    """How simulated orders fill against OHLC bars."""
+    maker_fee: float = 0.0002
+    taker_fee: float = 0.0005
+    slippage_bps: float = 1.0     # market and triggered orders fill this much worse than the bar price
+    funding_rate: float = 0.0001  # per 8h funding time; positive rates are paid by longs
+    touch: bool = True            # limit fills when the price touches it (False: must trade through)
+
+
+class BacktestResult:
+    """
+    Per-bar series (all aligned with the input bars) plus the fill log. equity is PnL from a flat,
+    zero-cash start: realised + unrealised - fees + funding. drawdown is equity minus its running
+    peak, so it is <= 0.
+    """
+
+    def __init__(self, bars: Dict[str, np.ndarray], fills: np.ndarray, model: FillModel):
+        n = len(bars["close"])
+        close = np.asarray(bars["close"], dtype=np.float64)
+        self.time = np.asarray(bars["open_time"])
+        self.fills = fills
+        signed = fills["side"] * fills["qty"]
+        self.position = np.cumsum(np.bincount(fills["bar"], weights=signed, minlength=n))
+        cash = np.cumsum(np.bincount(fills["bar"], weights=-signed * fills["price"] - fills["fee"], minlength=n))
+        # funding settles at the open of every 8h bar on the position held coming into it
+        held = np.concatenate(([0.0], self.position[:-1]))
+        due = (self.time % FUNDING_PERIOD_MS) == 0
+        self.funding = np.cumsum(np.where(due, -held * np.asarray(bars["open"], dtype=np.float64) * model.funding_rate, 0.0))
+        self.equity = cash + self.position * close + self.funding
+        self.drawdown = self.equity - np.maximum.accumulate(self.equity)
+
+    def summary(self) -> Dict[str, Any]:
+        fills = self.fills
+        return {
+            "pnl": float(self.equity[-1]) if len(self.equity) else 0.0,
+            "max_drawdown": float(self.drawdown.min()) if len(self.drawdown) else 0.0,
+            "fills": int(len(fills)),
+            "volume": float((fills["price"] * fills["qty"]).sum()),
+            "fees": float(fills["fee"].sum()),
+            "funding": float(self.funding[-1]) if len(self.funding) else 0.0,
+            "final_position": float(self.position[-1]) if len(self.position) else 0.0,
+        }
+
+
+def _fills(bars: Dict[str, np.ndarray], bar: np.ndarray, side: np.ndarray, price: np.ndarray, qty: np.ndarray,
+           maker: np.ndarray, model: FillModel) -> np.ndarray:
+    fills = np.empty(len(bar), dtype=FILL_DTYPE)
+    fills["bar"] = bar
+    fills["time"] = np.asarray(bars["open_time"])[bar]
+    fills["side"] = side
+    fills["price"] = price
+    fills["qty"] = qty
+    fills["maker"] = maker
+    fills["fee"] = price * qty * np.where(maker, model.maker_fee, model.taker_fee)
+    return fills
+
+
+def _taker_price(price: float, side: int, model: FillModel) -> float:
+    return price * (1 + side * model.slippage_bps / 10000)
+
+
+def _sign(side: str) -> int:
+    return 1 if side == "BUY" else -1
+
+
+def slice_bars(bars: Dict[str, np.ndarray], start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Views of the bars with start_ms <= open_time < end_ms (no copy, memmaps stay memmaps)."""
+    t = bars["open_time"]
+    lo = 0 if start_ms is None else int(np.searchsorted(t, start_ms))
+    hi = len(t) if end_ms is None else int(np.searchsorted(t, end_ms))
+    return {k: v[lo:hi] for k, v in bars.items()}
+
+
+# ----- grid -----
+
+def _clip_scan(lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inclusive prefix composition of x -> clip(x, lo[i], hi[i]). Clips compose into clips, so the
+    sequential grid state machine becomes log2(n) vectorized passes (Hillis-Steele scan).
+    """
+    lo, hi = lo.copy(), hi.copy()
+    d = 1
+    while d < len(lo):
+        clo, chi = lo[d:], hi[d:]
+        new_lo = np.minimum(np.maximum(lo[:-d], clo), chi)
+        new_hi = np.minimum(np.maximum(hi[:-d], clo), chi)
+        lo[d:], hi[d:] = new_lo, new_hi
+        d *= 2
+    return lo, hi
+
+
+def backtest_grid(bars: Dict[str, np.ndarray], lower: float, upper: float, steps: int, qty: float,
+                  model: FillModel = FillModel()) -> BacktestResult:
+    """
+    Reactive neutral grid on generate_grid_prices(lower, upper, steps): one resting order per level
+    except the level nearest the start price; buys below, sells above. A filled buy at level k
+    re-quotes a sell at k+1 and vice versa, so the whole book is one "empty level" index j.
+    Each bar runs open -> low -> high -> close (open -> high -> low -> close on down bars).
+    """
+    from .advanced.grid_cli import generate_grid_prices
+
+    levels = np.asarray(generate_grid_prices(lower, upper, steps), dtype=np.float64)
+    o = np.asarray(bars["open"], dtype=np.float64)
+    n = len(o)
+    if n == 0:
+        return BacktestResult(bars, np.empty(0, dtype=FILL_DTYPE), model)
+    # lowest level whose buy the bar's low fills / highest level whose sell the high fills
+    down = np.searchsorted(levels, bars["low"], side="left" if model.touch else "right")
+    up = np.searchsorted(levels, bars["high"], side="right" if model.touch else "left") - 1
+    up_first = np.asarray(bars["close"]) < o
+
+    # two half-steps per bar: a down leg is min(j, down), an up leg is max(j, up)
+    lo = np.full(2 * n, -_BIG, dtype=np.int64)
+    hi = np.full(2 * n, _BIG, dtype=np.int64)
+    first, second = np.arange(0, 2 * n, 2), np.arange(1, 2 * n, 2)
+    down_at = np.where(up_first, second, first)
+    up_at = np.where(up_first, first, second)
+    hi[down_at] = down
+    lo[up_at] = up
+    lo, hi = _clip_scan(lo, hi)
+    j0 = int(np.abs(levels - o[0]).argmin())
+    state = np.minimum(np.maximum(j0, lo), hi)
+    prev = np.concatenate(([j0], state[:-1]))
+    delta = state - prev
+
+    steps_hit = np.flatnonzero(delta)
+    count = np.abs(delta[steps_hit])
+    step = np.repeat(steps_hit, count)
+    offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    buy = delta[step] < 0
+    level = np.where(buy, prev[step] - 1 - offset, prev[step] + 1 + offset)
+    bar = step // 2
+    price = levels[level]
+    # orders resting before the bar fill at the open when it gaps through them
+    gap = (step % 2) == 0
+    price = np.where(gap & buy, np.minimum(price, o[bar]), price)
+    price = np.where(gap & ~buy, np.maximum(price, o[bar]), price)
+    side = np.where(buy, 1, -1).astype(np.int8)
+    fills = _fills(bars, bar, side, price, np.full(len(bar), qty), np.ones(len(bar), dtype=bool), model)
+    return BacktestResult(bars, fills, model)
+
+
+# ----- TWAP -----
+
+def backtest_twap(bars: Dict[str, np.ndarray], side: str, total_quantity: float, slices: int, duration_seconds: float,
+                  start: int = 0, model: FillModel = FillModel(), filters=None) -> Tuple[BacktestResult, Dict[str, float]]:
+    """
+    TWAPExecutor schedule: `slices` market orders every duration_seconds / slices from bar `start`,
+    each filled at its bar's open plus slippage. With filters, quantities come from plan_slices
+    exactly as live. Returns the result and execution stats (average price vs arrival and VWAP).
+    """
+    if slices <= 0:
+        raise ValueError("slices must be > 0")
+    t = np.asarray(bars["open_time"])
+    bar_ms = int(t[1] - t[0]) if len(t) > 1 else 60_000
+    offsets = np.round(np.arange(slices) * duration_seconds * 1000 / slices / bar_ms).astype(np.int64)
+    bar = start + offsets
+    if bar[-1] >= len(t):
+        raise ValueError("TWAP schedule runs past the end of the data")
+    if filters is not None:
+        from .advanced.twap import plan_slices
+        qty = np.array([float(q) for q in plan_slices(filters, total_quantity, slices)])
+    else:
+        qty = np.full(slices, total_quantity / slices)
+    sign = _sign(side)
+    o = np.asarray(bars["open"], dtype=np.float64)
+    price = o[bar] * (1 + sign * model.slippage_bps / 10000)
+    fills = _fills(bars, bar, np.full(slices, sign, dtype=np.int8), price, qty, np.zeros(slices, dtype=bool), model)
+
+    window = slice(int(bar[0]), int(bar[-1]) + 1)
+    typical = (np.asarray(bars["high"][window]) + bars["low"][window] + bars["close"][window]) / 3
+    volume = np.asarray(bars["volume"][window], dtype=np.float64) if "volume" in bars else np.ones(len(typical))
+    avg = float((price * qty).sum() / qty.sum())
+    arrival = float(o[bar[0]])
+    vwap = float((typical * volume).sum() / volume.sum()) if volume.sum() else arrival
+    stats = {"avg_price": avg, "arrival": arrival, "vwap": vwap,
+             "shortfall_bps": sign * (avg - arrival) / arrival * 10000,
+             "vs_vwap_bps": sign * (avg - vwap) / vwap * 10000}
+    return BacktestResult(bars, fills, model), stats
+
+
+# ----- stop-limit / OCO -----
+
+def _first(mask: np.ndarray, start: int) -> Optional[int]:
+    if start >= len(mask):
+        return None
+    i = int(np.argmax(mask[start:]))
+    return start + i if mask[start + i] else None
+
+
+def _stop_limit(bars: Dict[str, np.ndarray], start: int, side: str, trigger_down: bool, trigger: float,
+                limit: float, model: FillModel) -> Optional[Tuple[int, float, bool]]:
+    """
+    (bar, price, maker) of a LIMIT `side` order sent once price crosses trigger, or None.
+    At the trigger the limit is marketable if the trigger price is on the right side of it
+    (taker fill, slippage capped at the limit); otherwise it rests from the next bar on.
+    """
+    o = np.asarray(bars["open"], dtype=np.float64)
+    crossed = (bars["low"] <= trigger) if trigger_down else (bars["high"] >= trigger)
+    t = _first(crossed, start)
+    if t is None:
+        return None
+    at = min(trigger, o[t]) if trigger_down else max(trigger, o[t])  # gap through the trigger
+    sign = _sign(side)
+    if (sign > 0 and at <= limit) or (sign < 0 and at >= limit):
+        px = _taker_price(at, sign, model)
+        return t, (min(px, limit) if sign > 0 else max(px, limit)), False
+    resting = _limit_touch(bars, side, limit, model)
+    f = _first(resting, t + 1)
+    if f is None:
+        return None
+    return f, (min(limit, o[f]) if sign > 0 else max(limit, o[f])), True
+
+
+def _limit_touch(bars: Dict[str, np.ndarray], side: str, price: float, model: FillModel) -> np.ndarray:
+    if side == "BUY":
+        return (bars["low"] <= price) if model.touch else (bars["low"] < price)
+    return (bars["high"] >= price) if model.touch else (bars["high"] > price)
+
+
+def backtest_stop_limit(bars: Dict[str, np.ndarray], side: str, quantity: float, trigger_price: float,
+                        limit_price: float, start: int = 0, model: FillModel = FillModel()) -> BacktestResult:
+    """StopLimitTrigger: BUY waits for price <= trigger, SELL for price >= trigger, then sends the LIMIT."""
+    hit = _stop_limit(bars, start, side, side == "BUY", trigger_price, limit_price, model)
+    if hit is None:
+        return BacktestResult(bars, np.empty(0, dtype=FILL_DTYPE), model)
+    bar, price, maker = hit
+    fills = _fills(bars, np.array([bar]), np.array([_sign(side)], dtype=np.int8), np.array([price]),
+                   np.array([quantity]), np.array([maker]), model)
+    return BacktestResult(bars, fills, model)
+
+
+def backtest_oco(bars: Dict[str, np.ndarray], side: str, quantity: float, tp_price: float, stop_price: float,
+                 stop_limit_price: float, entry: int = 0, model: FillModel = FillModel()) -> Tuple[BacktestResult, str]:
+    """
+    Market entry on `side` at the open of bar `entry`, then OCOExecutorCLI's bracket: a TP LIMIT and
+    a STOP (stop-limit) on the exit side; whichever fills first cancels the other. When both would
+    fill in the same bar the bar's assumed path decides. Returns the result and "TP"/"STOP"/"NO_FILL".
+    """
+    sign = _sign(side)
+    exit_side = "SELL" if side == "BUY" else "BUY"
+    o = np.asarray(bars["open"], dtype=np.float64)
+    entry_px = _taker_price(o[entry], sign, model)
+    bar, side_, price, qty, maker = [entry], [sign], [entry_px], [quantity], [False]
+
+    tp = _first(_limit_touch(bars, exit_side, tp_price, model), entry)
+    # a long's stop is hit on the way down, a short's on the way up
+    stop = _stop_limit(bars, entry, exit_side, sign > 0, stop_price, stop_limit_price, model)
+    outcome = "NO_FILL"
+    if tp is not None and (stop is None or tp < stop[0] or (tp == stop[0] and _tp_first(bars, tp, sign))):
+        tp_px = tp_price
+        if tp > entry:  # resting since before this bar: a gap through it fills at the open
+            tp_px = max(tp_price, o[tp]) if sign > 0 else min(tp_price, o[tp])
+        bar.append(tp), side_.append(-sign), price.append(tp_px), qty.append(quantity), maker.append(True)
+        outcome = "TP"
+    elif stop is not None:
+        bar.append(stop[0]), side_.append(-sign), price.append(stop[1]), qty.append(quantity), maker.append(stop[2])
+        outcome = "STOP"
+    fills = _fills(bars, np.array(bar), np.array(side_, dtype=np.int8), np.array(price), np.array(qty),
+                   np.array(maker), model)
+    return BacktestResult(bars, fills, model), outcome
+
+
+def _tp_first(bars: Dict[str, np.ndarray], t: int, sign: int) -> bool:
+    """On an up bar (open -> low -> high) a long's stop comes before its TP; the reverse on down bars."""
+    up_bar = bars["close"][t] >= bars["open"][t]
+    return not up_bar if sign > 0 else up_bar
+
+
+def _print_summary(result: BacktestResult, extra: Optional[Dict[str, Any]] = None) -> None:
+    s = result.summary()
+    print("Backtest summary.")
+    print(f"Bars: {len(result.time)}, Fills: {s['fills']}, Volume: {s['volume']:,.2f}")
+    print(f"PnL: {s['pnl']:.4f}, Max drawdown: {s['max_drawdown']:.4f}")
+    print(f"Fees: {s['fees']:.4f}, Funding: {s['funding']:.4f}, Final position: {s['final_position']:g}")
+    for key, value in (extra or {}).items():
+        print(f"{key}: {value}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    defaults = FillModel()
+    parser = argparse.ArgumentParser(description="Backtest grid / TWAP / OCO / stop-limit on downloaded klines")
+    parser.add_argument("strategy", choices=("grid", "twap", "oco", "stop_limit"))
+    parser.add_argument("symbol", help="Symbol e.g., BTCUSDT (download it first with src.history)")
+    parser.add_argument("params", nargs="+", help="grid: lower upper levels qty | twap: side qty slices seconds | "
+                                                  "oco: side qty tp stop stop_limit | stop_limit: side qty trigger limit")
+    parser.add_argument("--interval", default="1m", choices=sorted(INTERVAL_MS))
+    parser.add_argument("--start", help="UTC start, YYYY-MM-DD[THH:MM] or epoch ms")
+    parser.add_argument("--end", help="UTC end")
+    parser.add_argument("--maker-fee", type=float, default=defaults.maker_fee)
+    parser.add_argument("--taker-fee", type=float, default=defaults.taker_fee)
+    parser.add_argument("--slippage-bps", type=float, default=defaults.slippage_bps)
+    parser.add_argument("--funding-rate", type=float, default=defaults.funding_rate, help="Per 8h")
+    parser.add_argument("--through", action="store_true", help="Limits fill only when price trades through")
+    return parser
+
+
+def execute(args: argparse.Namespace, client=None) -> None:
+    symbol = validate_symbol(args.symbol)
+    model = FillModel(args.maker_fee, args.taker_fee, args.slippage_bps, args.funding_rate, not args.through)
+    p = args.params
+    try:
+        bars = slice_bars(load_klines(symbol, args.interval),
+                          parse_time(args.start) if args.start else None, parse_time(args.end) if args.end else None)
+        if len(bars["close"]) == 0:
+            raise ValueError(f"no {args.interval} klines stored for {symbol} in that range")
+        if args.strategy == "grid":
+            _print_summary(backtest_grid(bars, float(p[0]), float(p[1]), int(p[2]), float(p[3]), model))
+        elif args.strategy == "twap":
+            result, stats = backtest_twap(bars, validate_side(p[0]), float(p[1]), int(p[2]), float(p[3]), model=model)
+            _print_summary(result, {"Avg price": f"{stats['avg_price']:g}",
+                                    "Shortfall": f"{stats['shortfall_bps']:.2f} bps",
+                                    "Vs VWAP": f"{stats['vs_vwap_bps']:.2f} bps"})
+        elif args.strategy == "oco":
+            result, outcome = backtest_oco(bars, validate_side(p[0]), float(p[1]), float(p[2]), float(p[3]),
+                                           float(p[4]), model=model)
+            _print_summary(result, {"Result": outcome})
+        else:
+            _print_summary(backtest_stop_limit(bars, validate_side(p[0]), float(p[1]), float(p[2]), float(p[3]),
+                                               model=model))
+    except Exception as e:
+        logger.error("Backtest failed: %s", e)
+        print("Backtest failed.")
+        print(f"Error: {e}")
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("backtest", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    main()
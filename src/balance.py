@@ -1,13 +1,20 @@
 # src/balance.py
 from __future__ import annotations
+import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Show futures wallet balance")
+    return parser
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     try:
-        client = BinanceFuturesClient()
+        client = client or BinanceFuturesClient()
         data = client._request("GET", "/fapi/v2/balance", params={}, signed=True)
         usdt = next((d for d in data if d.get("asset") == "USDT"), None)
         logger.info("Balance fetched: %s", usdt or data)
@@ -21,5 +28,10 @@ def main():
         print("Balance fetch failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("balance", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
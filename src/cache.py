@@ -0,0 +1,28 @@
+# src/cache.py
+from __future__ import annotations
+import os
+import tempfile
+
+# On-disk state shared across bot processes (clock offset, exchangeInfo, ...)
+CACHE_DIR = os.getenv("BOT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "lanson-binance-bot"))
+
+
+def cache_path(name: str) -> str:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write via temp file + rename so concurrent readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -1,19 +1,22 @@
 # src/cancel_all.py
 from __future__ import annotations
 import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
 from .validators import validate_symbol
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Cancel ALL open Futures orders for a symbol")
     parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
-    args = parser.parse_args()
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
     try:
         resp = client._request("DELETE", "/fapi/v1/allOpenOrders", params={"symbol": symbol}, signed=True)
         logger.info("Cancel all response: %s", resp)
@@ -25,5 +28,10 @@ def main():
         print("Cancel all failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("cancel_all", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
@@ -1,23 +1,35 @@
 # src/cancel_order.py
 from __future__ import annotations
 import argparse
-from .client import BinanceFuturesClient
+from typing import List, Optional
+from .client import BinanceFuturesClient, is_error
 from .validators import validate_symbol
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
-    parser = argparse.ArgumentParser(description="Cancel a single futures order by order id")
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Cancel futures orders by order id")
     parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
-    parser.add_argument("order_id", help="Order ID", type=int)
-    args = parser.parse_args()
+    parser.add_argument("order_ids", help="One or more order IDs", type=int, nargs="+")
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
-    order_id = args.order_id
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
+    if len(args.order_ids) > 1:
+        cancel_many(client, symbol, args.order_ids)
+        return
+    order_id = args.order_ids[0]
     try:
-        resp = client._request("DELETE", "/fapi/v1/order", params={"symbol": symbol, "orderId": order_id}, signed=True)
+        rec = client.order_store.get(order_id)
+        if rec is not None and rec.symbol == symbol and not rec.is_open:
+            print("Cancel order result.")
+            print(f"Order ID: {order_id}")
+            print(f"Status: already {rec.status}")
+            return
+        resp = client.cancel_order(symbol, order_id)
         logger.info("Cancel order response: %s", resp)
         print("Cancel order result.")
         print(f"Order ID: {order_id}")
@@ -27,5 +39,17 @@ def main():
         print("Cancel failed.")
         print(f"Error: {e}")
 
+def cancel_many(client: BinanceFuturesClient, symbol: str, order_ids: List[int]) -> None:
+    results = client.cancel_orders_batch(symbol, order_ids)
+    logger.info("Batch cancel response: %s", results)
+    print("Cancel order result.")
+    for order_id, resp in zip(order_ids, results):
+        print(f"Order ID: {order_id}, Status: {resp.get('msg') if is_error(resp) else 'CANCELLED'}")
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("cancel_order", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
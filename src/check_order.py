@@ -1,31 +1,33 @@
 # src/check_order.py
 from __future__ import annotations
 import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
 from .validators import validate_symbol
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Check status of a Binance Futures order")
     parser.add_argument("symbol", help="Symbol, e.g., BTCUSDT")
     parser.add_argument("order_id", help="Order ID", type=int)
-    args = parser.parse_args()
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
     order_id = args.order_id
 
     try:
-        client = BinanceFuturesClient()
+        client = client or BinanceFuturesClient()
 
-        # CORRECT ENDPOINT
-        resp = client._request(
-            "GET",
-            "/fapi/v1/order",
-            params={"symbol": symbol, "orderId": order_id},
-            signed=True
-        )
+        # final states never change, and live symbols are kept current by the user stream
+        rec = client.order_store.get(order_id)
+        if rec is not None and rec.symbol == symbol and (not rec.is_open or client.order_store.is_live(symbol)):
+            resp = rec.as_order()
+        else:
+            resp = client.get_order(symbol, order_id)
 
         print("\nOrder Status:")
         print(resp)
@@ -35,5 +37,10 @@ def main():
         logger.error(f"Failed to check order: {e}")
         print("Error:", e)
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("check_order", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
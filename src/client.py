@@ -2,120 +2,388 @@
 from __future__ import annotations
 import os
 import time
-import hmac
-import hashlib
+import json
+import threading
 import requests
-from typing import Dict, Any, Optional
-from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, Tuple, Union, List
 from .logger import get_logger
+from .signing import RequestSigner, encode_query, coerce_number, format_param
+from .clock import ClockSync, TIMESTAMP_ERROR
+from .errors import BinanceAPIError
+from .rate_limiter import RateGovernor, get_shared_governor, request_weight, order_count, classify_priority
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = get_logger(__name__)
 
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.05, 15.0)
+
+# /fapi/v1/batchOrders limits
+BATCH_ORDER_MAX = 5
+BATCH_CANCEL_MAX = 10
+
+# rejected before reaching the matching engine, so nothing was placed: too many requests
+# (429/418), too many new orders, timestamp outside recvWindow
+RETRYABLE_CODES = (-1003, -1015, -1021)
+# the order may or may not exist: unknown, disconnected, unexpected response, execution status
+# unknown (timeout), overloaded
+UNKNOWN_STATUS_CODES = (-1000, -1001, -1006, -1007, -1008)
+
+_shared_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+
+
+def create_session(pool_connections: int = 4, pool_maxsize: int = 16, max_retries: int = 3,
+                   backoff_factor: float = 0.2) -> requests.Session:
+    """
+    Build a keep-alive session backed by a pooled HTTPAdapter.
+    Only GETs are retried by the transport; an order POST/DELETE that may already have
+    reached the matching engine is never replayed.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                          max_retries=retry, pool_block=False)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Process-wide session so every client (and every executor holding one) reuses the same pool.
+    Pool size can be tuned with BINANCE_POOL_MAXSIZE / BINANCE_MAX_RETRIES.
+    """
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session(
+                pool_maxsize=int(os.getenv("BINANCE_POOL_MAXSIZE", "16")),
+                max_retries=int(os.getenv("BINANCE_MAX_RETRIES", "3")),
+            )
+        return _shared_session
+
+
+def close_shared_session() -> None:
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
+
+
+def is_error(result: Dict[str, Any]) -> bool:
+    """True for a per-order error entry from a batch call ({"code": ..., "msg": ...})."""
+    return isinstance(result, dict) and "msg" in result and "orderId" not in result
+
+
+def is_retryable(result: Dict[str, Any]) -> bool:
+    """True for a batch error entry that placed nothing and can be resent as is (rate limit, -1021)."""
+    return is_error(result) and result.get("code") in RETRYABLE_CODES
+
+
+def is_unknown(result: Dict[str, Any]) -> bool:
+    """
+    True for a batch error entry that leaves the order's fate open: no exchange reply (network
+    error, timeout, non-JSON 5xx; see _run_chunks) or an execution-status-unknown code. Look the
+    order up by clientOrderId before sending it again.
+    """
+    return is_error(result) and (result.get("code") is None or result.get("code") in UNKNOWN_STATUS_CODES)
+
 
 class BinanceFuturesClient:
     """
     Minimal Binance USDT-M Futures client with timestamp synchronization.
+    All requests go through one keep-alive session; by default that is the process-wide
+    shared pool, so pass the same client (or session) to every executor. Executors built
+    without a client construct a default one, which therefore rides on that pool too.
     """
 
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, base_url: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 governor: Optional[RateGovernor] = None, clock: Optional[ClockSync] = None):
         self.api_key = api_key or os.getenv("BINANCE_API_KEY")
         self.api_secret = api_secret or os.getenv("BINANCE_API_SECRET")
         self.base_url = base_url or os.getenv("BINANCE_BASE_URL", "https://fapi.binance.com")
         if not self.api_key or not self.api_secret:
             logger.error("API key/secret not provided. Set BINANCE_API_KEY and BINANCE_API_SECRET.")
             raise ValueError("API key/secret missing")
-        # time offset between server and local (ms)
-        self.time_offset = 0
+        self._signer = RequestSigner(self.api_secret)
+        self.session = session or get_shared_session()
+        self.timeout = timeout
+        # request weight / order count limiter, shared process-wide unless one is passed in
+        self.governor = governor or get_shared_governor()
+        # server clock model; a fresh offset persisted by another process skips the /time round trip
+        self.clock = clock or ClockSync(self.base_url)
         try:
-            self._sync_time()
+            self.clock.ensure(self._sync_time)
         except Exception as e:
             # don't fail hard — keep offset 0 but log
             logger.warning("Failed to sync server time: %s — continuing with local time", e)
 
+    @property
+    def exchange_info(self):
+        """Process-wide cached exchangeInfo index (src.exchange_info.ExchangeInfoStore)."""
+        from .exchange_info import get_exchange_info
+        return get_exchange_info(self)
+
+    @property
+    def market_data(self):
+        """Process-wide WebSocket price cache (src.market_data.MarketDataStream); call start() to use it."""
+        from .market_data import get_market_data
+        return get_market_data(self)
+
+    @property
+    def user_stream(self):
+        """Process-wide listenKey stream (src.user_stream.UserDataStream) for order/account events."""
+        from .user_stream import get_user_stream
+        return get_user_stream(self)
+
+    @property
+    def order_store(self):
+        """Process-wide local order state (src.order_store.OrderStore), fed by every order response."""
+        from .order_store import get_order_store
+        return get_order_store(self)
+
+    @property
+    def time_offset(self) -> int:
+        """Offset between server and local time (ms)."""
+        return int(self.clock.offset_ms)
+
+    def start_time_resync(self, interval: float = 60.0) -> None:
+        """
+        Keep the clock model fresh from a background thread. Every long-running command (TWAP,
+        VWAP, OCO, grid, brackets, triggers, runtime) calls this first, so requests made late in
+        a run are stamped with a current offset instead of drifting into -1021.
+        """
+        self.clock.start_background(self._sync_time, interval)
+
+    def close(self) -> None:
+        """Close the session if it is private to this client; the shared pool stays open."""
+        self.clock.stop_background()
+        if self.session is not _shared_session:
+            self.session.close()
+
+    def __enter__(self) -> "BinanceFuturesClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
     def _sync_time(self) -> None:
         """
         Query Binance server time and compute offset (server_time - local_time).
         This avoids timestamp errors (-1021).
         """
         try:
-            url = self.base_url + "/fapi/v1/time"
-            resp = requests.get(url, timeout=5)
+            url = self.base_url.rstrip("/") + "/fapi/v1/time"
+            self.governor.acquire(request_weight("GET", "/fapi/v1/time"))
+            sent = time.time() * 1000
+            resp = self.session.get(url, timeout=self.timeout)
+            received = time.time() * 1000
+            self.governor.update_from_headers(resp.headers, resp.status_code)
             data = resp.json()
-            server_time = int(data.get("serverTime", 0))
-            local_time = int(time.time() * 1000)
-            self.time_offset = server_time - local_time
-            logger.info("Time synced. server_time=%s local_time=%s offset=%sms", server_time, local_time, self.time_offset)
+            # a 429/418 body has no serverTime; recording 0 would persist a bogus offset
+            if resp.status_code >= 400 or not isinstance(data, dict) or "serverTime" not in data:
+                raise BinanceAPIError.from_response(data, resp.status_code)
+            self.clock.record(int(data["serverTime"]), sent, received)
         except Exception as e:
             logger.error("Error syncing time: %s", e)
             raise
 
     def _sign(self, params: Dict[str, Any]) -> str:
-        query = urlencode(params, doseq=True)
-        signature = hmac.new(self.api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
-        return signature
+        return self._signer.sign(encode_query(params))
 
-    def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, signed: bool = False) -> Dict[str, Any]:
+    def _send(self, method: str, url: str, query: str, headers: Dict[str, str]) -> requests.Response:
+        """
+        Send the query string exactly as encoded (and signed). The prepared URL is checked so a
+        transport-side re-encode can never produce a -1022 signature mismatch.
+        """
+        target = f"{url}?{query}" if query else url
+        prepared = self.session.prepare_request(requests.Request(method, target, headers=headers))
+        if query and not prepared.url.endswith("?" + query):
+            raise RuntimeError(f"Query was re-encoded before sending: {prepared.url}")
+        settings = self.session.merge_environment_settings(prepared.url, {}, None, None, None)
+        return self.session.send(prepared, timeout=self.timeout, **settings)
+
+    def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, signed: bool = False,
+                 priority: Optional[int] = None) -> Dict[str, Any]:
+        """
+        priority overrides the governor's queue class (see rate_limiter.PRIORITY_*);
+        by default it is derived from the method/path.
+        """
         url = self.base_url.rstrip("/") + path
         params = params.copy() if params else {}
-        headers = {"X-MBX-APIKEY": self.api_key}
-        if signed:
-            # correct timestamp using server offset
-            ts = int(time.time() * 1000 + getattr(self, "time_offset", 0))
-            params["timestamp"] = ts
-            params["recvWindow"] = params.get("recvWindow", 5000)
-            signature = self._sign(params)
-            params["signature"] = signature
-
         method = method.upper()
-        try:
-            if method == "GET":
-                resp = requests.get(url, params=params, headers=headers, timeout=15)
-            elif method == "POST":
-                resp = requests.post(url, params=params, headers=headers, timeout=15)
-            elif method == "DELETE":
-                resp = requests.delete(url, params=params, headers=headers, timeout=15)
+        if priority is None:
+            priority = classify_priority(method, path, params)
+        weight = request_weight(method, path, params)
+        orders = order_count(method, path, params)
+        headers = {"X-MBX-APIKEY": self.api_key}
+        if method not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        for attempt in range(2):
+            # wait for rate budget before stamping, so queue time doesn't eat into recvWindow;
+            # the -1021 resend is a second request and is charged again
+            self.governor.acquire(weight, orders, priority)
+            if signed:
+                # correct timestamp using the server clock model
+                params["timestamp"] = self.clock.now_ms()
+                params["recvWindow"] = params.get("recvWindow", 5000)
+                params.pop("signature", None)
+                query = encode_query(params)
+                signature = self._signer.sign(query)
+                query = f"{query}&signature={signature}"
+                params["signature"] = signature
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                query = encode_query(params)
 
-            # try parse json
             try:
-                data = resp.json()
-            except Exception:
-                resp.raise_for_status()
-                data = {}
-
-            if resp.status_code >= 400:
-                logger.error("HTTP %s error: %s", resp.status_code, data)
-                raise RuntimeError(f"Binance API error: {data}")
-
-            logger.info("Request %s %s params=%s response=%s", method, path, params, data)
-            return data
-        except requests.RequestException as e:
-            logger.error("Network error: %s", e)
-            raise
+                resp = self._send(method, url, query, headers)
+                self.governor.update_from_headers(resp.headers, resp.status_code)
+
+                # try parse json
+                try:
+                    data = resp.json()
+                except Exception:
+                    resp.raise_for_status()
+                    data = {}
+
+                if resp.status_code >= 400:
+                    if signed and attempt == 0 and isinstance(data, dict) and data.get("code") == TIMESTAMP_ERROR:
+                        # clock drifted outside recvWindow: resync and resend once with a fresh stamp
+                        logger.warning("Timestamp rejected (-1021); resyncing clock and retrying %s %s", method, path)
+                        self._sync_time()
+                        continue
+                    logger.error("HTTP %s error: %s", resp.status_code, data)
+                    raise BinanceAPIError.from_response(data, resp.status_code)
+
+                logger.info("Request %s %s params=%s response=%s", method, path, params, data)
+                return data
+            except requests.RequestException as e:
+                logger.error("Network error: %s", e)
+                raise
 
     # Public helpers
-    def place_order(self, symbol: str, side: str, order_type: str, quantity: float, price: Optional[float] = None,
-                    time_in_force: Optional[str] = None, reduce_only: bool = False, stop_price: Optional[float] = None) -> Dict[str, Any]:
-        path = "/fapi/v1/order"
+    @staticmethod
+    def _order_params(symbol: str, side: str, order_type: str, quantity: float, price: Optional[float] = None,
+                      time_in_force: Optional[str] = None, reduce_only: bool = False,
+                      stop_price: Optional[float] = None, client_order_id: Optional[str] = None) -> Dict[str, Any]:
         params: Dict[str, Any] = {
             "symbol": symbol,
             "side": side,
             "type": order_type,
-            "quantity": float(quantity),
+            "quantity": coerce_number(quantity),
         }
         if price is not None:
-            params["price"] = float(price)
+            params["price"] = coerce_number(price)
         if time_in_force:
             params["timeInForce"] = time_in_force
         if reduce_only:
             params["reduceOnly"] = "true"
         if stop_price is not None:
-            params["stopPrice"] = float(stop_price)
+            params["stopPrice"] = coerce_number(stop_price)
+        if client_order_id:
+            params["newClientOrderId"] = client_order_id
+        return params
+
+    def place_order(self, symbol: str, side: str, order_type: str, quantity: float, price: Optional[float] = None,
+                    time_in_force: Optional[str] = None, reduce_only: bool = False, stop_price: Optional[float] = None,
+                    client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        path = "/fapi/v1/order"
+        params = self._order_params(symbol, side, order_type, quantity, price=price, time_in_force=time_in_force,
+                                    reduce_only=reduce_only, stop_price=stop_price, client_order_id=client_order_id)
+        resp = self._request("POST", path, params=params, signed=True)
+        self.order_store.apply_response(resp)
+        return resp
+
+    def get_order(self, symbol: str, order_id: Optional[int] = None,
+                  client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"symbol": symbol}
+        if order_id is not None:
+            params["orderId"] = order_id
+        else:
+            params["origClientOrderId"] = client_order_id
+        resp = self._request("GET", "/fapi/v1/order", params=params, signed=True)
+        self.order_store.apply_response(resp)
+        return resp
 
-        return self._request("POST", path, params=params, signed=True)
+    def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        resp = self._request("DELETE", "/fapi/v1/order", params={"symbol": symbol, "orderId": order_id}, signed=True)
+        self.order_store.apply_response(resp)
+        return resp
+
+    def _run_chunks(self, chunks: List[Any], send, max_workers: int) -> List[Any]:
+        """Send each chunk (concurrently when there are several) and return per-chunk results in order."""
+        def guarded(chunk):
+            try:
+                resp = send(chunk)
+            except BinanceAPIError as e:
+                # whole request rejected — report the exchange's error against every item in the chunk
+                return [{"code": e.code, "msg": e.msg} for _ in chunk]
+            except Exception as e:
+                # no reply (network error, timeout): report it against every item in the chunk
+                return [{"code": None, "msg": str(e)} for _ in chunk]
+            if not isinstance(resp, list) or len(resp) != len(chunk):
+                return [{"code": None, "msg": f"Unexpected batch response: {resp}"} for _ in chunk]
+            return resp
+
+        if len(chunks) <= 1 or max_workers <= 1:
+            return [guarded(c) for c in chunks]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            return list(pool.map(guarded, chunks))
+
+    def place_orders_batch(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Place many orders via /fapi/v1/batchOrders, BATCH_ORDER_MAX per request, chunks sent concurrently.
+        orders: place_order keyword dicts. Returns one entry per input, in input order: the order
+        response, or a {"code", "msg"} error dict (see is_error).
+        """
+        chunks = [orders[i:i + BATCH_ORDER_MAX] for i in range(0, len(orders), BATCH_ORDER_MAX)]
+
+        def send(chunk):
+            batch = [{k: format_param(v) for k, v in self._order_params(**o).items()} for o in chunk]
+            return self._request("POST", "/fapi/v1/batchOrders",
+                                 params={"batchOrders": json.dumps(batch, separators=(",", ":"))}, signed=True)
+
+        results = [r for chunk in self._run_chunks(chunks, send, max_workers) for r in chunk]
+        self.order_store.apply_responses(results)
+        failed = sum(1 for r in results if is_error(r))
+        if failed:
+            logger.warning("Batch placement: %s of %s orders rejected", failed, len(results))
+        return results
+
+    def cancel_orders_batch(self, symbol: str, order_ids: List[int], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Cancel many orders of one symbol via DELETE /fapi/v1/batchOrders, BATCH_CANCEL_MAX per request.
+        Returns one entry per order id, in input order (cancel response or {"code", "msg"}).
+        """
+        chunks = [order_ids[i:i + BATCH_CANCEL_MAX] for i in range(0, len(order_ids), BATCH_CANCEL_MAX)]
+
+        def send(chunk):
+            return self._request("DELETE", "/fapi/v1/batchOrders",
+                                 params={"symbol": symbol, "orderIdList": json.dumps([int(i) for i in chunk], separators=(",", ":"))},
+                                 signed=True)
+
+        results = [r for chunk in self._run_chunks(chunks, send, max_workers) for r in chunk]
+        self.order_store.apply_responses(results)
+        return results
 
     def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict[str, Any]:
         return self.place_order(symbol=symbol, side=side, order_type="MARKET", quantity=quantity)
@@ -126,3 +394,40 @@ class BinanceFuturesClient:
     def get_symbol_price(self, symbol: str) -> Dict[str, Any]:
         path = "/fapi/v1/ticker/price"
         return self._request("GET", path, params={"symbol": symbol}, signed=False)
+
+    def cached_price(self, symbol: str, max_age: float = 2.0) -> Optional[float]:
+        """Price from the running market-data stream, or None; never touches the network."""
+        from .market_data import running_stream
+        stream = running_stream(self)
+        if stream is None:
+            return None
+        price = stream.price(symbol, max_age)
+        if price is None:
+            stream.subscribe([symbol])  # warm it for the next caller
+        return price
+
+    def cached_mark_price(self, symbol: str, max_age: float = 2.0) -> Optional[float]:
+        """Mark price from the running market-data stream, or None; never touches the network."""
+        from .market_data import running_stream
+        stream = running_stream(self)
+        if stream is None:
+            return None
+        quote = stream.get(symbol)
+        if quote is None or time.monotonic() - quote.updated_at > max_age or quote.mark_price is None:
+            stream.subscribe([symbol])  # warm it for the next caller
+            return None
+        return quote.mark_price
+
+    def latest_price(self, symbol: str, max_age: float = 2.0) -> float:
+        """cached_price() when the stream has a fresh value, else one ticker/price REST call."""
+        price = self.cached_price(symbol, max_age)
+        if price is None:
+            price = float(self.get_symbol_price(symbol)["price"])
+        return price
+
+    def latest_mark_price(self, symbol: str, max_age: float = 2.0) -> float:
+        """cached_mark_price() when the stream has a fresh value, else one premiumIndex REST call."""
+        price = self.cached_mark_price(symbol, max_age)
+        if price is None:
+            price = float(self._request("GET", "/fapi/v1/premiumIndex", params={"symbol": symbol})["markPrice"])
+        return price
@@ -0,0 +1,132 @@
+# src/clock.py
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Callable
+from .cache import cache_path, atomic_write
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOCK_FILE = "clock.json"
+# "Timestamp for this request is outside of the recvWindow."
+TIMESTAMP_ERROR = -1021
+# how long a persisted offset is trusted without a fresh /fapi/v1/time call
+DEFAULT_TTL = float(os.getenv("BINANCE_CLOCK_TTL", "300"))
+# samples closer together than this are too noisy to estimate drift from
+MIN_DRIFT_INTERVAL = 30.0
+
+
+class ClockSync:
+    """
+    Server clock model: offset (server - local, ms) measured at the midpoint of the request,
+    plus a linear drift rate so long runs keep stamping close to server time.
+    State is persisted per base_url and reused by other processes until it is older than ttl.
+    """
+
+    def __init__(self, base_url: str, ttl: float = DEFAULT_TTL, path: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.path = path
+        self.offset_ms = 0.0
+        self.rtt_ms = 0.0
+        self.drift_ms_per_s = 0.0
+        self.synced_at = 0.0  # local epoch seconds of the last measurement
+        self._lock = threading.Lock()
+        self._stop: Optional[threading.Event] = None
+
+    # Model
+    def now_ms(self) -> int:
+        """Best estimate of the current server time in ms."""
+        now = time.time()
+        drift = self.drift_ms_per_s * (now - self.synced_at) if self.synced_at else 0.0
+        return int(now * 1000 + self.offset_ms + drift)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.synced_at if self.synced_at else float("inf")
+
+    def record(self, server_ms: int, sent_ms: float, received_ms: float) -> None:
+        """Fold one /fapi/v1/time measurement into the model and persist it."""
+        rtt = received_ms - sent_ms
+        offset = server_ms - (sent_ms + rtt / 2)
+        now = received_ms / 1000
+        with self._lock:
+            elapsed = now - self.synced_at if self.synced_at else 0.0
+            if elapsed >= MIN_DRIFT_INTERVAL:
+                rate = (offset - self.offset_ms) / elapsed
+                # smooth: a single noisy RTT shouldn't swing the rate
+                self.drift_ms_per_s = rate if self.drift_ms_per_s == 0 else 0.7 * self.drift_ms_per_s + 0.3 * rate
+            self.offset_ms = offset
+            self.rtt_ms = rtt
+            self.synced_at = now
+        logger.info("Time synced. server_time=%s offset=%.1fms rtt=%.1fms drift=%.4fms/s",
+                    server_ms, offset, rtt, self.drift_ms_per_s)
+        self.save()
+
+    # Persistence
+    def _file(self) -> str:
+        return self.path or cache_path(CLOCK_FILE)
+
+    def _read_all(self) -> Dict[str, Any]:
+        try:
+            with open(self._file(), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self) -> bool:
+        """Adopt the persisted state for this base_url if it is younger than ttl."""
+        state = self._read_all().get(self.base_url)
+        if not state or time.time() - float(state.get("synced_at", 0)) > self.ttl:
+            return False
+        with self._lock:
+            self.offset_ms = float(state["offset_ms"])
+            self.rtt_ms = float(state.get("rtt_ms", 0))
+            self.drift_ms_per_s = float(state.get("drift_ms_per_s", 0))
+            self.synced_at = float(state["synced_at"])
+        logger.info("Clock offset loaded from cache: offset=%.1fms age=%.0fs", self.offset_ms, self.age)
+        return True
+
+    def save(self) -> None:
+        try:
+            # drop endpoints nobody has synced against for a day
+            states = {k: v for k, v in self._read_all().items()
+                      if time.time() - float(v.get("synced_at", 0)) < 86400}
+            states[self.base_url] = {
+                "offset_ms": self.offset_ms,
+                "rtt_ms": self.rtt_ms,
+                "drift_ms_per_s": self.drift_ms_per_s,
+                "synced_at": self.synced_at,
+            }
+            atomic_write(self._file(), json.dumps(states).encode())
+        except OSError as e:
+            logger.warning("Could not persist clock offset: %s", e)
+
+    def ensure(self, sync: Callable[[], None]) -> None:
+        """Use the cached offset when fresh, otherwise call sync() (one round trip)."""
+        if not self.load():
+            sync()
+
+    # Background resync for long-lived executors
+    def start_background(self, sync: Callable[[], None], interval: float = 60.0) -> None:
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        stop = self._stop
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    sync()
+                except Exception as e:
+                    logger.warning("Background time resync failed: %s", e)
+
+        threading.Thread(target=loop, name="clock-resync", daemon=True).start()
+
+    def stop_background(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
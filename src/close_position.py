@@ -1,9 +1,14 @@
 # src/close_position.py
 from __future__ import annotations
 import argparse
+import time
+from decimal import Decimal
+from typing import List, Optional
 from .client import BinanceFuturesClient
-from .validators import validate_symbol
+from .validators import validate_symbol, check_order, snap_quantity, to_decimal
+from .order_book import get_order_book
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
@@ -11,13 +16,41 @@ def get_position_info(client: BinanceFuturesClient, symbol: str):
     data = client._request("GET", "/fapi/v2/positionRisk", params={"symbol": symbol}, signed=True)
     return data[0] if isinstance(data, list) and data else None
 
-def main():
+def close_in_chunks(client: BinanceFuturesClient, symbol: str, side: str, qty: Decimal, max_slippage_bps: float,
+                    timeout: float = 30.0, pause: float = 0.5) -> List[dict]:
+    """
+    Reduce-only MARKET chunks, each sized to what the local book absorbs within max_slippage_bps.
+    Waits for the book to refill between chunks; after timeout the remainder goes out in one order.
+    """
+    book = get_order_book(client, symbol)
+    filters = client.exchange_info.get(symbol)
+    responses = []
+    deadline = time.time() + timeout
+    remaining = qty
+    while remaining > 0:
+        chunk = remaining
+        if book is not None and book.synced and time.time() < deadline:
+            chunk = min(remaining, snap_quantity(filters, to_decimal(book.qty_within(side, max_slippage_bps)), market=True))
+            if chunk <= 0:
+                time.sleep(pause)
+                continue
+        logger.info("Closing chunk: %s %s qty=%s (remaining %s)", symbol, side, chunk, remaining)
+        responses.append(client.place_order(symbol=symbol, side=side, order_type="MARKET", quantity=chunk, reduce_only=True))
+        remaining -= chunk
+        if remaining > 0:
+            time.sleep(pause)
+    return responses
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Close open futures position (market, reduce-only)")
     parser.add_argument("symbol", help="Symbol, e.g., BTCUSDT")
-    args = parser.parse_args()
+    parser.add_argument("--max-slippage-bps", type=float,
+                        help="Split the close into chunks the order book absorbs within this many bps")
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
     try:
         position = get_position_info(client, symbol)
         if not position:
@@ -30,11 +63,14 @@ def main():
             return
 
         side = "SELL" if position_amt > 0 else "BUY"
-        qty = abs(position_amt)
+        qty = check_order(client.exchange_info.get(symbol), side, "MARKET", abs(position_amt), reduce_only=True).quantity
 
         logger.info("Attempting to close position: %s %s qty=%s", symbol, side, qty)
-        resp = client.place_order(symbol=symbol, side=side, order_type="MARKET", quantity=qty, reduce_only=True)
-        logger.info("Close position response: %s", resp)
+        if args.max_slippage_bps is not None:
+            resps = close_in_chunks(client, symbol, side, qty, args.max_slippage_bps)
+        else:
+            resps = [client.place_order(symbol=symbol, side=side, order_type="MARKET", quantity=qty, reduce_only=True)]
+        logger.info("Close position response: %s", resps)
 
         # Re-check position
         updated = get_position_info(client, symbol)
@@ -43,6 +79,8 @@ def main():
         print("Position close result.")
         print(f"Side: {side}")
         print(f"Qty: {qty}")
+        if len(resps) > 1:
+            print(f"Chunks: {len(resps)}")
         print(f"Result: {'SUCCESS' if new_amt == 0 else 'PARTIAL' if new_amt != 0 else 'UNKNOWN'}")
         print(f"Final position size: {new_amt}")
         if new_amt == 0:
@@ -52,5 +90,10 @@ def main():
         print("Close position failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("close_position", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,73 @@
+# src/commands.py
+from __future__ import annotations
+import importlib
+import threading
+from types import ModuleType
+from typing import Dict, List
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# command name -> module exposing build_parser() and execute(args, client)
+COMMANDS: Dict[str, str] = {
+    "market_orders": "src.market_orders",
+    "limit_orders": "src.limit_orders",
+    "close_position": "src.close_position",
+    "price": "src.price",
+    "market_data": "src.market_data",
+    "order_book": "src.order_book",
+    "stats": "src.stats",
+    "snapshot": "src.snapshot",
+    "history": "src.history",
+    "backtest": "src.backtest",
+    "exchange_info": "src.exchange_info",
+    "open_orders": "src.open_orders",
+    "check_order": "src.check_order",
+    "cancel_order": "src.cancel_order",
+    "cancel_all": "src.cancel_all",
+    "positions": "src.positions",
+    "balance": "src.balance",
+    "oco": "src.advanced.oco_cli",
+    "brackets": "src.advanced.brackets",
+    "stop_limit": "src.advanced.stop_limit",
+    "triggers": "src.advanced.triggers",
+    "twap": "src.advanced.twap_cli",
+    "vwap": "src.advanced.vwap_cli",
+    "grid": "src.advanced.grid_cli",
+    "grid_engine": "src.advanced.grid_engine",
+    "runtime": "src.runtime",
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The one long-lived client (session, clock, exchangeInfo) shared by in-process commands."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from .client import BinanceFuturesClient
+            _client = BinanceFuturesClient()
+        return _client
+
+
+def get_command(name: str) -> ModuleType:
+    try:
+        return importlib.import_module(COMMANDS[name])
+    except KeyError:
+        raise ValueError(f"Unknown command: {name}")
+
+
+def run_command(name: str, argv: List[str], client=None) -> int:
+    """
+    Parse argv with the command's own parser and run it in this process.
+    Returns 0 on success, 2 on bad arguments (argparse would otherwise exit the process).
+    """
+    module = get_command(name)
+    try:
+        args = module.build_parser().parse_args(argv)
+    except SystemExit as e:
+        return int(e.code or 0)
+    module.execute(args, client or get_client())
+    return 0
@@ -0,0 +1,97 @@
+# src/ctl.py
+"""
+Thin client for the bot daemon (src/daemon.py). Deliberately imports nothing heavy, so
+
+    python -m src.ctl price BTCUSDT
+
+costs interpreter start-up plus one Unix-socket round trip. The regular CLI entry points call
+forward_to_daemon() first and only build their own client when no daemon is running.
+
+Protocol: one JSON object per line in each direction over a persistent connection.
+    request:  {"cmd": "price", "argv": ["BTCUSDT"]}
+    response: {"ok": true, "code": 0, "out": "<captured stdout/stderr>", "ms": 2.1}
+"""
+from __future__ import annotations
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, List, Optional
+
+
+def socket_path() -> str:
+    default = os.path.join(os.getenv("BOT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "lanson-binance-bot")), "bot.sock")
+    return os.getenv("BOT_DAEMON_SOCKET", default)
+
+
+class DaemonClient:
+    """Persistent connection to the daemon; reuse it for many commands."""
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or socket_path())
+        self._reader = self.sock.makefile("rb")
+
+    def call(self, cmd: str, argv: Optional[List[str]] = None) -> Dict[str, Any]:
+        self.sock.sendall(json.dumps({"cmd": cmd, "argv": argv or []}, separators=(",", ":")).encode() + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+        return json.loads(line)
+
+    def close(self) -> None:
+        self._reader.close()
+        self.sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def forward_to_daemon(cmd: str, argv: Optional[List[str]] = None) -> bool:
+    """
+    Run the command on the daemon if one is listening and print its output.
+    Returns False (caller runs locally) when there is no daemon or BOT_NO_DAEMON is set.
+    """
+    if os.getenv("BOT_NO_DAEMON"):
+        return False
+    path = socket_path()
+    if not os.path.exists(path):
+        return False
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        with DaemonClient(path) as client:
+            resp = client.call(cmd, argv)
+    except (OSError, ValueError):
+        # stale socket or daemon gone: fall back to running locally
+        return False
+    sys.stdout.write(resp.get("out", ""))
+    if not resp.get("ok"):
+        print(f"Error: {resp.get('error')}")
+    if resp.get("code"):
+        sys.exit(resp["code"])
+    return True
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.ctl <command> [args...]   (commands: see src/commands.py, plus ping/status/shutdown)")
+        sys.exit(2)
+    try:
+        with DaemonClient() as client:
+            resp = client.call(sys.argv[1], sys.argv[2:])
+    except OSError as e:
+        print(f"Daemon not reachable at {socket_path()}: {e}")
+        sys.exit(1)
+    sys.stdout.write(resp.get("out", ""))
+    if not resp.get("ok"):
+        print(f"Error: {resp.get('error')}")
+        sys.exit(resp.get("code") or 1)
+    sys.exit(resp.get("code") or 0)
+
+
+if __name__ == "__main__":
+    main()
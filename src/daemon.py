@@ -0,0 +1,185 @@
+# src/daemon.py
+from __future__ import annotations
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from .commands import COMMANDS, get_client, run_command
+from .ctl import socket_path, DaemonClient
+from .market_data import running_stream
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    sys.stdout/sys.stderr stand-in that sends each handler thread's writes to its own buffer,
+    so concurrent commands never mix output; other threads still reach the real stream.
+    """
+
+    def __init__(self, real):
+        self.real = real
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        buf = getattr(self.local, "buffer", None)
+        return (buf or self.real).write(text)
+
+    def flush(self) -> None:
+        if getattr(self.local, "buffer", None) is None:
+            self.real.flush()
+
+
+class BotDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Holds the warm client (connection pool, clock model, exchangeInfo, rate governor) and
+    runs commands from src/commands.py on it for any number of local clients.
+    """
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.time()
+        self.served = 0
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+        self.stdout = _ThreadOutput(sys.stdout)
+        self.stderr = _ThreadOutput(sys.stderr)
+
+    def warm_up(self) -> None:
+        client = get_client()
+        client.start_time_resync()
+        try:
+            client.exchange_info.symbols()
+        except Exception as e:
+            logger.warning("exchangeInfo preload failed: %s", e)
+        symbols = [s.strip().upper() for s in os.getenv("BOT_STREAM_SYMBOLS", "").split(",") if s.strip()]
+        if symbols:
+            # price/market commands then read the WebSocket cache instead of calling REST
+            try:
+                client.market_data.start(symbols)
+            except Exception as e:
+                logger.warning("Market data stream not started: %s", e)
+        if os.getenv("BOT_USER_STREAM"):
+            # order events + periodic openOrders reconcile make open_orders/check_order local lookups
+            try:
+                client.user_stream.start()
+                for symbol in symbols:
+                    client.order_store.reconcile(client, symbol)
+                client.order_store.start_reconcile(client, symbols)
+            except Exception as e:
+                logger.warning("User data stream not started: %s", e)
+
+    def status(self) -> Dict[str, Any]:
+        client = get_client()
+        md = running_stream(client)
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started, 1),
+            "served": self.served,
+            "clock_offset_ms": client.clock.offset_ms,
+            "clock_age_s": round(client.clock.age, 1),
+            "exchange_info_age_s": round(client.exchange_info.age, 1),
+            "rate": client.governor.usage(),
+            "stream_frames": md.frames if md is not None else None,
+            "orders_tracked": len(client.order_store),
+        }
+
+    def execute(self, cmd: str, argv: List[str]) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        buf = io.StringIO()
+        self.stdout.local.buffer = buf
+        self.stderr.local.buffer = buf
+        code, ok, error = 0, True, None
+        try:
+            if cmd == "ping":
+                buf.write("pong\n")
+            elif cmd == "status":
+                buf.write(json.dumps(self.status(), indent=2, default=str) + "\n")
+            elif cmd == "shutdown":
+                buf.write("Daemon stopping.\n")
+            elif cmd in COMMANDS:
+                code = run_command(cmd, argv)
+            else:
+                ok, code, error = False, 2, f"Unknown command: {cmd}"
+        except Exception as e:
+            logger.error("Daemon command %s failed: %s", cmd, e)
+            ok, code, error = False, 1, str(e)
+        finally:
+            self.stdout.local.buffer = None
+            self.stderr.local.buffer = None
+        self.served += 1
+        resp = {"ok": ok, "code": code, "out": buf.getvalue(), "ms": round((time.perf_counter() - t0) * 1000, 3)}
+        if error:
+            resp["error"] = error
+        return resp
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict) or not isinstance(req.get("argv", []), list):
+                    raise ValueError("expected an object with cmd and an argv list")
+                resp = self.server.execute(str(req.get("cmd", "")), [str(a) for a in req.get("argv", [])])
+            except ValueError as e:
+                resp = {"ok": False, "code": 2, "out": "", "error": f"Bad request: {e}"}
+            self.wfile.write(json.dumps(resp, separators=(",", ":")).encode() + b"\n")
+            self.wfile.flush()
+            if resp["ok"] and req.get("cmd") == "shutdown":
+                # reply first, then stop serve_forever() from outside its own thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+def serve(path: Optional[str] = None) -> None:
+    path = path or socket_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    server = BotDaemon(path)
+    sys.stdout, sys.stderr = server.stdout, server.stderr
+    server.warm_up()
+    logger.info("Bot daemon listening on %s", path)
+    print(f"Bot daemon listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sys.stdout, sys.stderr = server.stdout.real, server.stderr.real
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident bot daemon with a Unix-socket command API")
+    parser.add_argument("action", choices=["start", "stop", "status"], nargs="?", default="start")
+    parser.add_argument("--socket", help="Socket path (default: BOT_DAEMON_SOCKET or the bot cache dir)")
+    args = parser.parse_args()
+
+    if args.action == "start":
+        serve(args.socket)
+        return
+    try:
+        with DaemonClient(args.socket) as client:
+            resp = client.call("shutdown" if args.action == "stop" else "status")
+        print(resp.get("out", "").rstrip())
+    except OSError as e:
+        print(f"Daemon not running: {e}")
+
+if __name__ == "__main__":
+    main()
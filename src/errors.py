@@ -0,0 +1,24 @@
+# src/errors.py
+from __future__ import annotations
+from typing import Any, Optional
+
+
+class BinanceAPIError(RuntimeError):
+    """
+    An error reply from the exchange. code/msg are Binance's error body (code is None when the
+    body was not one, e.g. an HTML 5xx page); status is the HTTP status when there was a response.
+    """
+
+    def __init__(self, code: Optional[int], msg: str, status: Optional[int] = None):
+        # same text as the {"code", "msg"} body it came from, so CLI output is unchanged
+        super().__init__(f"Binance API error: {{'code': {code!r}, 'msg': {msg!r}}}")
+        self.code = code
+        self.msg = msg
+        self.status = status
+
+    @classmethod
+    def from_response(cls, data: Any, status: Optional[int] = None) -> "BinanceAPIError":
+        if isinstance(data, dict) and "msg" in data:
+            code = data.get("code")
+            return cls(int(code) if code is not None else None, str(data["msg"]), status)
+        return cls(None, str(data), status)
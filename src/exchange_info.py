@@ -1,30 +1,238 @@
 # src/exchange_info.py
 from __future__ import annotations
 import argparse
-from .client import BinanceFuturesClient
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Any, Optional, List, NamedTuple, TYPE_CHECKING, get_type_hints
+from .cache import cache_path, atomic_write
 from .validators import validate_symbol
 from .logger import get_logger
+from .ctl import forward_to_daemon
+
+if TYPE_CHECKING:
+    from .client import BinanceFuturesClient
 
 logger = get_logger(__name__)
 
-def main():
+EXCHANGE_INFO_FILE = "exchange_info.json"
+DEFAULT_TTL = float(os.getenv("BINANCE_EXCHANGE_INFO_TTL", "3600"))
+# bump when SymbolFilters changes shape so old cache files are ignored
+CACHE_VERSION = 2
+
+_ZERO = Decimal("0")
+
+
+class SymbolFilters(NamedTuple):
+    """One symbol's trading rules, pre-decoded from the exchangeInfo filters."""
+    symbol: str
+    status: str
+    base_asset: str
+    quote_asset: str
+    price_precision: int
+    quantity_precision: int
+    tick_size: Decimal
+    min_price: Decimal
+    max_price: Decimal
+    step_size: Decimal
+    min_qty: Decimal
+    max_qty: Decimal
+    market_step_size: Decimal
+    market_min_qty: Decimal
+    market_max_qty: Decimal
+    min_notional: Decimal
+    multiplier_up: Decimal
+    multiplier_down: Decimal
+    multiplier_decimal: int
+    max_num_orders: int
+
+
+# per-field decoder for cached rows (Decimals are stored as strings)
+_ROW_TYPES = tuple(get_type_hints(SymbolFilters).values())
+
+
+def _dec(f: Dict[str, Any], key: str) -> Decimal:
+    value = f.get(key)
+    return Decimal(str(value)) if value not in (None, "") else _ZERO
+
+
+def parse_symbol(entry: Dict[str, Any]) -> SymbolFilters:
+    filters = {f.get("filterType"): f for f in entry.get("filters", [])}
+    price = filters.get("PRICE_FILTER", {})
+    lot = filters.get("LOT_SIZE", {})
+    market_lot = filters.get("MARKET_LOT_SIZE", lot)
+    notional = filters.get("MIN_NOTIONAL", {})
+    percent = filters.get("PERCENT_PRICE", {})
+    return SymbolFilters(
+        symbol=entry["symbol"],
+        status=entry.get("status", ""),
+        base_asset=entry.get("baseAsset", ""),
+        quote_asset=entry.get("quoteAsset", ""),
+        price_precision=int(entry.get("pricePrecision", 8)),
+        quantity_precision=int(entry.get("quantityPrecision", 8)),
+        tick_size=_dec(price, "tickSize"),
+        min_price=_dec(price, "minPrice"),
+        max_price=_dec(price, "maxPrice"),
+        step_size=_dec(lot, "stepSize"),
+        min_qty=_dec(lot, "minQty"),
+        max_qty=_dec(lot, "maxQty"),
+        market_step_size=_dec(market_lot, "stepSize"),
+        market_min_qty=_dec(market_lot, "minQty"),
+        market_max_qty=_dec(market_lot, "maxQty"),
+        min_notional=_dec(notional, "notional"),
+        multiplier_up=_dec(percent, "multiplierUp"),
+        multiplier_down=_dec(percent, "multiplierDown"),
+        multiplier_decimal=int(percent.get("multiplierDecimal", 0) or 0),
+        max_num_orders=int(filters.get("MAX_NUM_ORDERS", {}).get("limit", 0) or 0),
+    )
+
+
+def parse_exchange_info(payload: Dict[str, Any]) -> Dict[str, SymbolFilters]:
+    """Index the raw /fapi/v1/exchangeInfo payload by symbol."""
+    return {s["symbol"]: parse_symbol(s) for s in payload.get("symbols", []) if s.get("symbol")}
+
+
+class ExchangeInfoStore:
+    """
+    exchangeInfo parsed once into a symbol -> SymbolFilters dict and cached on disk as JSON rows
+    of that index, so startup is one small file read instead of downloading and re-parsing
+    the full payload. Plain data only: the cache dir is never trusted with anything executable.
+    Refreshes from the exchange when older than ttl.
+    """
+
+    def __init__(self, client: Optional["BinanceFuturesClient"] = None, ttl: float = DEFAULT_TTL,
+                 path: Optional[str] = None):
+        self.client = client
+        self.base_url = (client.base_url if client else os.getenv("BINANCE_BASE_URL", "https://fapi.binance.com")).rstrip("/")
+        self.ttl = ttl
+        self.path = path
+        self.fetched_at = 0.0
+        self._index: Dict[str, SymbolFilters] = {}
+        self._lock = threading.Lock()
+
+    def _file(self) -> str:
+        return self.path or cache_path(EXCHANGE_INFO_FILE)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at if self.fetched_at else float("inf")
+
+    def load(self) -> bool:
+        """Adopt the on-disk index if it belongs to this base_url and is within ttl."""
+        try:
+            with open(self._file(), "r", encoding="utf-8") as f:
+                blob = json.load(f)
+            if blob.get("version") != CACHE_VERSION or blob.get("base_url") != self.base_url:
+                return False
+            if time.time() - blob.get("fetched_at", 0) > self.ttl:
+                return False
+            index = {s: SymbolFilters(*(conv(v) for conv, v in zip(_ROW_TYPES, row)))
+                     for s, row in blob["symbols"].items()}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError, ArithmeticError):
+            return False  # missing, foreign or corrupt file: download instead
+        self._index = index
+        self.fetched_at = blob["fetched_at"]
+        return True
+
+    def save(self) -> None:
+        blob = {
+            "version": CACHE_VERSION,
+            "base_url": self.base_url,
+            "fetched_at": self.fetched_at,
+            "symbols": {s: [v if isinstance(v, int) else str(v) for v in f] for s, f in self._index.items()},
+        }
+        try:
+            atomic_write(self._file(), json.dumps(blob, separators=(",", ":")).encode())
+        except OSError as e:
+            logger.warning("Could not persist exchangeInfo cache: %s", e)
+
+    def refresh(self) -> None:
+        if self.client is None:
+            from .client import BinanceFuturesClient
+            self.client = BinanceFuturesClient()
+        payload = self.client._request("GET", "/fapi/v1/exchangeInfo", params={}, signed=False)
+        self._index = parse_exchange_info(payload)
+        self.fetched_at = time.time()
+        logger.info("exchangeInfo refreshed: %s symbols", len(self._index))
+        self.save()
+
+    def _ensure(self) -> None:
+        if self._index and self.age <= self.ttl:
+            return
+        with self._lock:
+            if self._index and self.age <= self.ttl:
+                return
+            if self.load():
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                if not self._index:
+                    raise
+                # serve the stale index rather than failing order validation outright
+                logger.warning("exchangeInfo refresh failed, using %.0fs old data: %s", self.age, e)
+
+    def get(self, symbol: str) -> SymbolFilters:
+        self._ensure()
+        try:
+            return self._index[symbol]
+        except KeyError:
+            raise ValueError(f"Unknown symbol: {symbol}")
+
+    def find(self, symbol: str) -> Optional[SymbolFilters]:
+        self._ensure()
+        return self._index.get(symbol)
+
+    def symbols(self) -> List[str]:
+        self._ensure()
+        return list(self._index)
+
+
+_stores: Dict[str, ExchangeInfoStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_exchange_info(client: "BinanceFuturesClient") -> ExchangeInfoStore:
+    """One store per base_url for the whole process."""
+    key = client.base_url.rstrip("/")
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ExchangeInfoStore(client)
+        return store
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Get exchange info for a symbol")
     parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
-    args = parser.parse_args()
+    parser.add_argument("--refresh", action="store_true", help="Ignore the local cache and re-download")
+    return parser
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
 
-    client = BinanceFuturesClient()
+    from .client import BinanceFuturesClient
+    client = client or BinanceFuturesClient()
     try:
-        resp = client._request("GET", "/fapi/v1/exchangeInfo", params={}, signed=False)
-        symbols = resp.get("symbols", [])
-        info = next((s for s in symbols if s.get("symbol") == symbol), None)
-        logger.info("Exchange info: %s", info or resp)
+        store = client.exchange_info
+        if args.refresh:
+            store.refresh()
+        info = store.find(symbol)
+        logger.info("Exchange info: %s", info)
         if info:
             # Print key filters cleanly
             print("Exchange info summary.")
             print(f"Symbol: {symbol}")
-            for f in info.get("filters", []):
-                print(f"{f.get('filterType')}: {f}")
+            print(f"Status: {info.status}")
+            print(f"PRICE_FILTER: tickSize={info.tick_size} minPrice={info.min_price} maxPrice={info.max_price}")
+            print(f"LOT_SIZE: stepSize={info.step_size} minQty={info.min_qty} maxQty={info.max_qty}")
+            print(f"MARKET_LOT_SIZE: stepSize={info.market_step_size} minQty={info.market_min_qty} maxQty={info.market_max_qty}")
+            print(f"MIN_NOTIONAL: notional={info.min_notional}")
+            print(f"PERCENT_PRICE: multiplierUp={info.multiplier_up} multiplierDown={info.multiplier_down}")
+            print(f"MAX_NUM_ORDERS: limit={info.max_num_orders}")
+            print(f"Cache age: {store.age:.0f}s")
         else:
             print("Symbol info not found.")
     except Exception as e:
@@ -32,5 +240,10 @@ def main():
         print("Exchange info failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("exchange_info", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,273 @@
+# src/history.py
+from __future__ import annotations
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .cache import cache_path
+from .client import BinanceFuturesClient
+from .validators import validate_symbol
+from .logger import get_logger
+from .ctl import forward_to_daemon
+
+logger = get_logger(__name__)
+
+# field name -> dtype, in the order of the REST row
+KLINE_SCHEMA: List[Tuple[str, str]] = [
+    ("open_time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("volume", "<f8"), ("close_time", "<i8"), ("quote_volume", "<f8"), ("trades", "<i8"),
+    ("taker_buy_volume", "<f8"), ("taker_buy_quote_volume", "<f8"),
+]
+AGG_TRADE_SCHEMA: List[Tuple[str, str]] = [
+    ("agg_id", "<i8"), ("price", "<f8"), ("qty", "<f8"), ("first_id", "<i8"), ("last_id", "<i8"),
+    ("time", "<i8"), ("buyer_maker", "|u1"),
+]
+_AGG_KEYS = ("a", "p", "q", "f", "l", "T", "m")
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000, "8h": 28_800_000,
+    "12h": 43_200_000, "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000,
+}
+KLINE_PAGE = 1000       # weight 5; the 1500 page costs 10, so 1000 is the cheaper rate per bar
+AGG_TRADE_PAGE = 1000   # weight 20
+AGG_TRADE_WINDOW = 3_600_000 - 1  # startTime/endTime queries may span at most one hour
+
+
+def data_dir() -> str:
+    return os.getenv("BOT_DATA_DIR") or cache_path("history")
+
+
+class ColumnStore:
+    """
+    Append-only columnar series: one raw little-endian file per field (<dir>/<field>.bin),
+    all with the same row count. read() memory-maps every column, so analysis code gets
+    zero-copy numpy arrays. A crash between column writes is repaired on open by truncating
+    every column to the shortest one.
+    """
+
+    def __init__(self, path: str, schema: List[Tuple[str, str]]):
+        self.path = path
+        self.schema = [(name, np.dtype(dt)) for name, dt in schema]
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._repair()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _rows(self, name: str, dtype: np.dtype) -> int:
+        try:
+            return os.path.getsize(self._file(name)) // dtype.itemsize
+        except OSError:
+            return 0
+
+    def _repair(self) -> None:
+        rows = min(self._rows(n, dt) for n, dt in self.schema)
+        for name, dtype in self.schema:
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) != rows * dtype.itemsize:
+                logger.warning("Truncating %s to %d rows after an interrupted append", path, rows)
+                with open(path, "r+b") as f:
+                    f.truncate(rows * dtype.itemsize)
+        self.length = rows
+
+    def __len__(self) -> int:
+        return self.length
+
+    def append(self, columns: Dict[str, np.ndarray]) -> None:
+        n = len(columns[self.schema[0][0]])
+        if n == 0:
+            return
+        with self._lock:
+            for name, dtype in self.schema:
+                with open(self._file(name), "ab") as f:
+                    f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+            self.length += n
+
+    def last(self, name: str) -> Optional[Any]:
+        if self.length == 0:
+            return None
+        dtype = dict(self.schema)[name]
+        with open(self._file(name), "rb") as f:
+            f.seek((self.length - 1) * dtype.itemsize)
+            return np.frombuffer(f.read(dtype.itemsize), dtype=dtype)[0].item()
+
+    def read(self) -> Dict[str, np.ndarray]:
+        """Every column as a read-only memmap (plain empty arrays for an empty store)."""
+        if self.length == 0:
+            return {name: np.empty(0, dtype=dt) for name, dt in self.schema}
+        return {name: np.memmap(self._file(name), dtype=dt, mode="r", shape=(self.length,)) for name, dt in self.schema}
+
+
+def kline_store(symbol: str, interval: str, root: Optional[str] = None) -> ColumnStore:
+    return ColumnStore(os.path.join(root or data_dir(), symbol, f"klines_{interval}"), KLINE_SCHEMA)
+
+
+def agg_trade_store(symbol: str, root: Optional[str] = None) -> ColumnStore:
+    return ColumnStore(os.path.join(root or data_dir(), symbol, "aggTrades"), AGG_TRADE_SCHEMA)
+
+
+def load_klines(symbol: str, interval: str, root: Optional[str] = None) -> Dict[str, np.ndarray]:
+    return kline_store(symbol, interval, root).read()
+
+
+def load_agg_trades(symbol: str, root: Optional[str] = None) -> Dict[str, np.ndarray]:
+    return agg_trade_store(symbol, root).read()
+
+
+def _kline_columns(rows: List[List[Any]]) -> Dict[str, np.ndarray]:
+    table = np.array([r[:len(KLINE_SCHEMA)] for r in rows], dtype=object).reshape(-1, len(KLINE_SCHEMA))
+    return {name: table[:, i].astype(np.float64).astype(dt) for i, (name, dt) in enumerate(KLINE_SCHEMA)}
+
+
+def _agg_columns(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    return {name: np.array([float(r[k]) if name in ("price", "qty") else int(r[k]) for r in rows], dtype=dt)
+            for (name, dt), k in zip(AGG_TRADE_SCHEMA, _AGG_KEYS)}
+
+
+class HistoryDownloader:
+    """
+    Pages klines/aggTrades into ColumnStores. Kline pages have known start times, so one series
+    is fetched several pages at a time and appended in order; different series run in
+    parallel. Every request goes through the client's rate governor, so weight limits hold no
+    matter how many workers run. Re-running resumes after the last stored row.
+    """
+
+    def __init__(self, client: Optional[BinanceFuturesClient] = None, root: Optional[str] = None, workers: int = 8):
+        self.client = client or BinanceFuturesClient()
+        self.root = root
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+
+    def klines(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> int:
+        """Download [start_ms, end_ms) of closed bars; returns rows appended."""
+        step = INTERVAL_MS[interval]
+        store = kline_store(symbol, interval, self.root)
+        last = store.last("open_time")
+        if last is not None:
+            start_ms = max(start_ms, last + step)
+        end_ms = min(end_ms, int(time.time() * 1000) // step * step)  # skip the bar still forming
+        starts = list(range(start_ms - start_ms % step if start_ms % step else start_ms, end_ms, KLINE_PAGE * step))
+        if not starts:
+            return 0
+
+        def page(page_start: int) -> List[List[Any]]:
+            page_end = min(page_start + KLINE_PAGE * step, end_ms) - 1
+            return self.client._request("GET", "/fapi/v1/klines", params={
+                "symbol": symbol, "interval": interval, "startTime": page_start, "endTime": page_end, "limit": KLINE_PAGE})
+
+        added = 0
+        # bounded read-ahead: at most `workers` pages of this series in flight, appended in order
+        for i in range(0, len(starts), self.workers):
+            for rows in self.pool.map(page, starts[i:i + self.workers]):
+                if rows:
+                    cols = _kline_columns(rows)
+                    last = store.last("open_time")
+                    if last is not None:
+                        keep = cols["open_time"] > last
+                        cols = {k: v[keep] for k, v in cols.items()}
+                    store.append(cols)
+                    added += len(cols["open_time"])
+        logger.info("Klines %s %s: +%d rows (%d total)", symbol, interval, added, len(store))
+        return added
+
+    def agg_trades(self, symbol: str, start_ms: int, end_ms: int) -> int:
+        """Download aggregate trades with time in [start_ms, end_ms); returns rows appended."""
+        store = agg_trade_store(symbol, self.root)
+        next_id = store.last("agg_id")
+        window = start_ms
+        added = 0
+        while True:
+            by_id = next_id is not None
+            if by_id:
+                params = {"symbol": symbol, "fromId": next_id + 1, "limit": AGG_TRADE_PAGE}
+            else:
+                if window >= end_ms:
+                    break
+                params = {"symbol": symbol, "startTime": window, "endTime": min(window + AGG_TRADE_WINDOW, end_ms - 1),
+                          "limit": AGG_TRADE_PAGE}
+            rows = self.client._request("GET", "/fapi/v1/aggTrades", params=params)
+            if not rows:
+                if by_id:
+                    break  # caught up with the exchange
+                window += AGG_TRADE_WINDOW + 1  # quiet hour: look further
+                continue
+            rows = [r for r in rows if r["T"] < end_ms]
+            if rows:
+                store.append(_agg_columns(rows))
+                added += len(rows)
+                next_id = rows[-1]["a"]
+            # a short window page only means a quiet hour; page on by fromId from its last trade.
+            # A short fromId page is the exchange's head (or end_ms, once the filter trimmed it).
+            if by_id and len(rows) < AGG_TRADE_PAGE:
+                break
+        logger.info("aggTrades %s: +%d rows (%d total)", symbol, added, len(store))
+        return added
+
+    def download(self, symbols: List[str], start_ms: int, end_ms: int, intervals: List[str],
+                 trades: bool = False) -> Dict[str, int]:
+        """All series concurrently; returns {"SYMBOL interval": rows appended}."""
+        jobs: Dict[str, Any] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(symbols) * (len(intervals) + trades)))) as outer:
+            for s in symbols:
+                for iv in intervals:
+                    jobs[f"{s} {iv}"] = outer.submit(self.klines, s, iv, start_ms, end_ms)
+                if trades:
+                    jobs[f"{s} aggTrades"] = outer.submit(self.agg_trades, s, start_ms, end_ms)
+            return {k: f.result() for k, f in jobs.items()}
+
+
+def parse_time(value: str) -> int:
+    """YYYY-MM-DD[THH:MM] (UTC) or epoch milliseconds."""
+    if value.isdigit():
+        return int(value)
+    fmt = "%Y-%m-%dT%H:%M" if "T" in value else "%Y-%m-%d"
+    return int(datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Download historical klines / aggTrades to memory-mappable storage")
+    parser.add_argument("symbols", nargs="+", help="Symbols e.g., BTCUSDT ETHUSDT")
+    parser.add_argument("--start", required=True, help="UTC start, YYYY-MM-DD[THH:MM] or epoch ms")
+    parser.add_argument("--end", help="UTC end (default: now)")
+    parser.add_argument("--interval", action="append", choices=sorted(INTERVAL_MS), help="Kline interval (repeatable, default 1m)")
+    parser.add_argument("--trades", action="store_true", help="Also download aggTrades")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests")
+    return parser
+
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
+    symbols = [validate_symbol(s) for s in args.symbols]
+    start = parse_time(args.start)
+    end = parse_time(args.end) if args.end else int(time.time() * 1000)
+    downloader = HistoryDownloader(client or BinanceFuturesClient(), workers=args.workers)
+    t0 = time.time()
+    try:
+        added = downloader.download(symbols, start, end, args.interval or ["1m"], trades=args.trades)
+        print("Download summary.")
+        for series, rows in added.items():
+            print(f"Series: {series}, New rows: {rows}")
+        print(f"Elapsed: {time.time() - t0:.1f}s, Data dir: {downloader.root or data_dir()}")
+    except Exception as e:
+        logger.error("History download failed: %s", e)
+        print("Download failed.")
+        print(f"Error: {e}")
+    finally:
+        downloader.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("history", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,35 @@
 # src/limit_orders.py
 from __future__ import annotations
 import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
-from .validators import validate_symbol, validate_side, validate_quantity, validate_price
+from .validators import validate_symbol, validate_side, validate_quantity, validate_price, check_order
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Place a limit order")
     parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
     parser.add_argument("side", help="BUY or SELL")
     parser.add_argument("quantity", help="Quantity")
     parser.add_argument("price", help="Price")
-    args = parser.parse_args()
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
     side = validate_side(args.side)
     qty = validate_quantity(args.quantity)
     price = validate_price(args.price)
 
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
     try:
+        # reject/snap locally against the symbol filters before spending a round trip on it;
+        # the mark price bounds the limit price (PERCENT_PRICE, -4016/-4024)
+        checked = check_order(client.exchange_info.get(symbol), side, "LIMIT", qty, price=price,
+                              mark_price=client.latest_mark_price(symbol))
+        qty, price = checked.quantity, checked.price
         resp = client.place_limit_order(symbol=symbol, side=side, price=price, quantity=qty)
         logger.info("Limit order response: %s", resp)
 
@@ -37,5 +45,10 @@ def main():
         print("Limit order failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("limit_orders", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
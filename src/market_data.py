@@ -0,0 +1,331 @@
+# src/market_data.py
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, TYPE_CHECKING
+from .validators import validate_symbol
+from .logger import get_logger
+from .ctl import forward_to_daemon
+
+if TYPE_CHECKING:
+    from .client import BinanceFuturesClient
+
+logger = get_logger(__name__)
+
+DEFAULT_STREAMS = ("markPrice@1s", "bookTicker", "aggTrade")
+# base_url host -> combined-stream host
+WS_URLS = {
+    "fapi.binance.com": "wss://fstream.binance.com",
+    "testnet.binancefuture.com": "wss://fstream.binancefuture.com",
+}
+RECONNECT_MIN = 0.5
+RECONNECT_MAX = 30.0
+
+
+class Quote(NamedTuple):
+    """Latest known state of one symbol. Immutable, so readers never see half an update."""
+    symbol: str
+    mark_price: Optional[float] = None
+    index_price: Optional[float] = None
+    funding_rate: Optional[float] = None
+    bid: Optional[float] = None
+    bid_qty: Optional[float] = None
+    ask: Optional[float] = None
+    ask_qty: Optional[float] = None
+    last_price: Optional[float] = None
+    last_qty: Optional[float] = None
+    event_ms: int = 0
+    updated_at: float = 0.0  # time.monotonic() of the last frame applied
+
+    @property
+    def mid(self) -> Optional[float]:
+        if self.bid is None or self.ask is None:
+            return None
+        return (self.bid + self.ask) / 2
+
+    @property
+    def price(self) -> Optional[float]:
+        """Last trade price (what ticker/price and stop triggers use), else mark price."""
+        return self.last_price if self.last_price is not None else self.mark_price
+
+
+def apply_event(quote: Quote, data: Dict[str, Any], now: float) -> Quote:
+    """Fold one markPriceUpdate/bookTicker/aggTrade payload into a quote."""
+    kind = data.get("e")
+    if kind == "markPriceUpdate":
+        return quote._replace(mark_price=float(data["p"]), index_price=float(data.get("i") or 0) or None,
+                              funding_rate=float(data["r"]) if data.get("r") else quote.funding_rate,
+                              event_ms=data.get("E", 0), updated_at=now)
+    if kind == "bookTicker":
+        return quote._replace(bid=float(data["b"]), bid_qty=float(data["B"]), ask=float(data["a"]),
+                              ask_qty=float(data["A"]), event_ms=data.get("E", 0), updated_at=now)
+    if kind in ("aggTrade", "trade"):
+        return quote._replace(last_price=float(data["p"]), last_qty=float(data["q"]),
+                              event_ms=data.get("E", 0), updated_at=now)
+    return quote
+
+
+def ws_url_for(base_url: str) -> str:
+    """Combined-stream host for a REST base_url; BINANCE_WS_URL overrides."""
+    url = os.getenv("BINANCE_WS_URL")
+    if url:
+        return url.rstrip("/")
+    host = base_url.split("://", 1)[-1].split("/", 1)[0]
+    if host not in WS_URLS:
+        raise ValueError(f"No WebSocket endpoint known for {base_url}; set BINANCE_WS_URL")
+    return WS_URLS[host]
+
+
+class MarketDataStream:
+    """
+    One multiplexed combined-stream connection for any number of symbols, run on a background
+    asyncio loop. Streams can be added at any time and are re-subscribed after a reconnect.
+
+    The cache is a plain dict of immutable Quote tuples written only by the stream thread, so
+    get()/price() are lock-free reads with no network I/O.
+    """
+
+    def __init__(self, ws_url: str, streams: Iterable[str] = DEFAULT_STREAMS, record_path: Optional[str] = None):
+        self.ws_url = ws_url.rstrip("/")
+        self.kinds = tuple(streams)
+        self.record_path = record_path
+        self.quotes: Dict[str, Quote] = {}
+        self.frames = 0
+        self.reconnects = 0
+        self._streams: Set[str] = set()
+        self._listeners: List[Callable[[Quote], None]] = []
+        self._first: Dict[str, threading.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ws = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._msg_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    # ----- reads -----
+
+    def get(self, symbol: str) -> Optional[Quote]:
+        return self.quotes.get(symbol)
+
+    def price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Latest trade (else mark) price, or None when unknown or older than max_age seconds."""
+        quote = self.quotes.get(symbol)
+        if quote is None or (max_age is not None and time.monotonic() - quote.updated_at > max_age):
+            return None
+        return quote.price
+
+    def wait_for(self, symbol: str, timeout: float = 5.0) -> Optional[Quote]:
+        """Block until the first frame for symbol has arrived."""
+        with self._lock:
+            event = self._first.setdefault(symbol, threading.Event())
+        if symbol in self.quotes:
+            event.set()
+        event.wait(timeout)
+        return self.quotes.get(symbol)
+
+    def add_listener(self, fn: Callable[[Quote], None]) -> None:
+        """fn(quote) runs on the stream thread after every update; keep it short."""
+        self._listeners = self._listeners + [fn]
+
+    def remove_listener(self, fn: Callable[[Quote], None]) -> None:
+        self._listeners = [f for f in self._listeners if f is not fn]
+
+    # ----- subscriptions -----
+
+    def _names(self, symbols: Iterable[str]) -> List[str]:
+        return [f"{s.lower()}@{k}" for s in symbols for k in self.kinds]
+
+    def subscribe(self, symbols: Iterable[str]) -> None:
+        names = [n for n in self._names(symbols) if n not in self._streams]
+        if not names:
+            return
+        with self._lock:
+            self._streams.update(names)
+        self._call_soon(self._send("SUBSCRIBE", names))
+
+    def unsubscribe(self, symbols: Iterable[str]) -> None:
+        symbols = list(symbols)
+        names = [n for n in self._names(symbols) if n in self._streams]
+        with self._lock:
+            self._streams.difference_update(names)
+        for s in symbols:
+            self.quotes.pop(s, None)
+        if names:
+            self._call_soon(self._send("UNSUBSCRIBE", names))
+
+    def _call_soon(self, coro) -> None:
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        else:
+            coro.close()  # the (re)connect path subscribes everything in self._streams
+
+    async def _send(self, method: str, names: List[str]) -> None:
+        ws = self._ws
+        if ws is None:
+            return
+        self._msg_id += 1
+        try:
+            await ws.send(json.dumps({"method": method, "params": names, "id": self._msg_id}))
+        except Exception as e:
+            logger.warning("%s failed, will retry on reconnect: %s", method, e)
+
+    # ----- lifecycle -----
+
+    def start(self, symbols: Iterable[str] = ()) -> "MarketDataStream":
+        self.subscribe(symbols)
+        if not self.running:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="market-data", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        loop, ws = self._loop, self._ws
+        if loop is not None and ws is not None:
+            asyncio.run_coroutine_threadsafe(ws.close(), loop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._connect_forever())
+        finally:
+            self._loop = None
+            loop.close()
+
+    async def _connect_forever(self) -> None:
+        from websockets.asyncio.client import connect
+
+        delay = RECONNECT_MIN
+        record = open(self.record_path, "a", encoding="utf-8") if self.record_path else None
+        try:
+            while not self._stopping:
+                try:
+                    async with connect(f"{self.ws_url}/stream", max_queue=None, compression=None) as ws:
+                        self._ws = ws
+                        with self._lock:
+                            names = sorted(self._streams)
+                        if names:
+                            await self._send("SUBSCRIBE", names)
+                        logger.info("Market data connected: %s (%d streams)", self.ws_url, len(names))
+                        self._on_connected()
+                        delay = RECONNECT_MIN
+                        async for raw in ws:
+                            if record is not None:
+                                record.write(raw if isinstance(raw, str) else raw.decode())
+                                record.write("\n")
+                            self._on_frame(raw)
+                except Exception as e:
+                    if self._stopping:
+                        break
+                    logger.warning("Market data connection lost: %s", e)
+                finally:
+                    self._ws = None
+                if self._stopping:
+                    break
+                # also reached on a clean server close (Binance drops connections every 24h)
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+        finally:
+            if record is not None:
+                record.close()
+
+    def _on_connected(self) -> None:
+        """Hook for subclasses whose state must be rebuilt after a reconnect."""
+
+    def _on_frame(self, raw) -> None:
+        msg = json.loads(raw)
+        data = msg.get("data", msg)
+        if not isinstance(data, dict) or "s" not in data:
+            return  # subscribe acks etc.
+        symbol = data["s"]
+        quote = apply_event(self.quotes.get(symbol) or Quote(symbol), data, time.monotonic())
+        self.quotes[symbol] = quote
+        self.frames += 1
+        if symbol in self._first:
+            self._first[symbol].set()
+        for fn in self._listeners:
+            try:
+                fn(quote)
+            except Exception as e:
+                logger.error("Market data listener failed: %s", e)
+
+
+_streams: Dict[str, MarketDataStream] = {}
+_streams_lock = threading.Lock()
+
+
+def get_market_data(client: "BinanceFuturesClient") -> MarketDataStream:
+    """One stream per WebSocket host for the whole process (not started until start())."""
+    url = ws_url_for(client.base_url)
+    with _streams_lock:
+        stream = _streams.get(url)
+        if stream is None:
+            stream = _streams[url] = MarketDataStream(url)
+        return stream
+
+
+def running_stream(client: "BinanceFuturesClient") -> Optional[MarketDataStream]:
+    """The process stream for this client if someone started it, without creating one."""
+    try:
+        stream = _streams.get(ws_url_for(client.base_url))
+    except ValueError:
+        return None
+    return stream if stream is not None and stream.running else None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Stream live mark/book/trade prices")
+    parser.add_argument("symbols", nargs="+", help="Symbols e.g., BTCUSDT ETHUSDT")
+    parser.add_argument("--seconds", type=float, default=10.0, help="How long to stream")
+    parser.add_argument("--record", help="Append raw frames to this JSONL file (replayable by benchmarks.ws_replay)")
+    return parser
+
+
+def execute(args: argparse.Namespace, client: Optional["BinanceFuturesClient"] = None) -> None:
+    from .client import BinanceFuturesClient
+
+    symbols = [validate_symbol(s) for s in args.symbols]
+    client = client or BinanceFuturesClient()
+    try:
+        stream = MarketDataStream(ws_url_for(client.base_url), record_path=args.record).start(symbols)
+        end = time.monotonic() + args.seconds
+        while time.monotonic() < end:
+            time.sleep(1.0)
+            for s in symbols:
+                q = stream.get(s)
+                if q is not None:
+                    print(f"Symbol: {s}, Last: {q.last_price}, Mark: {q.mark_price}, Bid: {q.bid}, Ask: {q.ask}")
+        stream.stop()
+        print("Stream summary.")
+        print(f"Frames: {stream.frames}, Reconnects: {stream.reconnects}")
+    except Exception as e:
+        logger.error("Market data failed: %s", e)
+        print("Market data failed.")
+        print(f"Error: {e}")
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("market_data", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    main()
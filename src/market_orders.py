@@ -1,25 +1,33 @@
 # src/market_orders.py
 from __future__ import annotations
 import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
-from .validators import validate_symbol, validate_side, validate_quantity
+from .validators import validate_symbol, validate_side, validate_quantity, check_order
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Place a market order")
     parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
     parser.add_argument("side", help="BUY or SELL")
     parser.add_argument("quantity", help="Quantity")
-    args = parser.parse_args()
+    return parser
 
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
     side = validate_side(args.side)
     qty = validate_quantity(args.quantity)
 
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
     try:
+        # reject/snap locally against the symbol filters before spending a round trip on it;
+        # the notional check prices a market order at the mark (stream, else one premiumIndex call)
+        filters = client.exchange_info.get(symbol)
+        mark = client.latest_mark_price(symbol)
+        qty = check_order(filters, side, "MARKET", qty, mark_price=mark).quantity
         resp = client.place_market_order(symbol=symbol, side=side, quantity=qty)
         # Log full response
         logger.info("Market order response: %s", resp)
@@ -36,5 +44,10 @@ def main():
         print("Order failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("market_orders", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
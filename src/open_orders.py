@@ -1,26 +1,38 @@
 # src/open_orders.py
 from __future__ import annotations
 import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
 from .validators import validate_symbol
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="View all open orders for a Futures symbol")
     parser.add_argument("symbol", help="Symbol, e.g., BTCUSDT")
-    args = parser.parse_args()
+    return parser
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
 
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
     try:
-        response = client._request("GET", "/fapi/v1/openOrders", params={"symbol": symbol}, signed=True)
-        logger.info("Open orders: %s", response)
+        store = client.order_store
+        if store.is_live(symbol):
+            # reconciled and streamed since: no request needed
+            records = store.open_orders(symbol)
+            logger.info("Open orders (local): %s", records)
+        else:
+            response = client._request("GET", "/fapi/v1/openOrders", params={"symbol": symbol}, signed=True)
+            logger.info("Open orders: %s", response)
+            store.reconcile(client, symbol, open_orders=response)
+            records = store.open_orders(symbol)
         print("Open orders summary.")
-        if response:
-            for o in response:
-                print(f"Order ID: {o.get('orderId')}, Side: {o.get('side')}, Qty: {o.get('origQty')}, Price: {o.get('price')}, Status: {o.get('status')}")
+        if records:
+            for r in records:
+                print(f"Order ID: {r.order_id}, Side: {r.side}, Qty: {r.orig_qty}, Price: {r.price}, Status: {r.status}")
         else:
             print("No open orders for", symbol)
     except Exception as e:
@@ -28,5 +40,10 @@ def main():
         print("Fetch open orders failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("open_orders", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,334 @@
+# src/order_book.py
+from __future__ import annotations
+import argparse
+import json
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+from .market_data import MarketDataStream, ws_url_for
+from .validators import validate_symbol
+from .logger import get_logger
+from .ctl import forward_to_daemon
+
+if TYPE_CHECKING:
+    from .client import BinanceFuturesClient
+
+logger = get_logger(__name__)
+
+DEPTH_LIMIT = 1000
+DEPTH_STREAM = "depth@100ms"
+
+
+class BookSide:
+    """
+    Price levels of one side in two parallel sorted lists. keys are prices for asks and negated
+    prices for bids, so index 0 is always the touch and bisect works the same on both sides.
+    """
+    __slots__ = ("sign", "keys", "qtys")
+
+    def __init__(self, sign: int):
+        self.sign = sign
+        self.keys: List[float] = []
+        self.qtys: List[float] = []
+
+    def load(self, levels: Iterable[Tuple[Any, Any]]) -> None:
+        pairs = sorted((self.sign * float(p), float(q)) for p, q in levels if float(q) > 0)
+        self.keys = [k for k, _ in pairs]
+        self.qtys = [q for _, q in pairs]
+
+    def set(self, price: float, qty: float) -> None:
+        key = self.sign * price
+        i = bisect_left(self.keys, key)
+        present = i < len(self.keys) and self.keys[i] == key
+        if qty == 0:
+            if present:
+                del self.keys[i]
+                del self.qtys[i]
+        elif present:
+            self.qtys[i] = qty
+        else:
+            self.keys.insert(i, key)
+            self.qtys.insert(i, qty)
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self.keys:
+            return None
+        return self.sign * self.keys[0], self.qtys[0]
+
+    def qty_within(self, bps: float) -> float:
+        """Quantity resting within bps of the touch."""
+        if not self.keys:
+            return 0.0
+        touch = self.keys[0]
+        bound = touch + abs(touch) * bps / 10000
+        return sum(self.qtys[:bisect_right(self.keys, bound)])
+
+    def walk(self, qty: float) -> Tuple[float, float]:
+        """(notional, filled) for taking qty from the touch outward."""
+        notional = filled = 0.0
+        sign = self.sign
+        for key, level in zip(self.keys, self.qtys):
+            take = min(level, qty - filled)
+            notional += take * key * sign
+            filled += take
+            if filled >= qty:
+                break
+        return notional, filled
+
+
+class OrderBook:
+    """
+    Local L2 book rebuilt from a REST snapshot plus @depth diffs, following Binance's
+    procedure: drop diffs with u < lastUpdateId, the first applied diff must straddle
+    lastUpdateId, and every later diff's pu must equal the previous u (else resync).
+    Taker-side arguments: BUY consumes asks, SELL consumes bids.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(-1)
+        self.asks = BookSide(1)
+        self.last_update_id = 0
+        self.synced = False
+        self.event_ms = 0
+        self.updated_at = 0.0
+        self.resyncs = 0
+        self.lock = threading.Lock()
+
+    def _taker(self, side: str) -> BookSide:
+        return self.asks if side == "BUY" else self.bids
+
+    # ----- maintenance -----
+
+    def load_snapshot(self, data: Dict[str, Any]) -> None:
+        with self.lock:
+            self.bids.load(data.get("bids", []))
+            self.asks.load(data.get("asks", []))
+            self.last_update_id = int(data["lastUpdateId"])
+            self.event_ms = int(data.get("E", 0))
+            self.updated_at = time.monotonic()
+            self.synced = False  # until a diff bridges the snapshot
+
+    def apply_diff(self, event: Dict[str, Any]) -> bool:
+        """Apply one depthUpdate. Returns False when the sequence breaks and a resync is needed."""
+        first, final, prev = int(event["U"]), int(event["u"]), int(event.get("pu", -1))
+        with self.lock:
+            if final < self.last_update_id:
+                return True  # already contained in the snapshot
+            if self.synced:
+                if prev != self.last_update_id:
+                    self.synced = False
+                    return False
+            elif not (first <= self.last_update_id <= final):
+                return False
+            for p, q in event.get("b", []):
+                self.bids.set(float(p), float(q))
+            for p, q in event.get("a", []):
+                self.asks.set(float(p), float(q))
+            self.last_update_id = final
+            self.event_ms = int(event.get("E", 0))
+            self.updated_at = time.monotonic()
+            self.synced = True
+            return True
+
+    # ----- queries -----
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        return self.asks.best()
+
+    def mid(self) -> Optional[float]:
+        with self.lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread_bps(self) -> Optional[float]:
+        with self.lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (ask[0] - bid[0]) / ((ask[0] + bid[0]) / 2) * 10000
+
+    def qty_within(self, side: str, bps: float) -> float:
+        """What a taker on `side` can fill within bps of the touch."""
+        with self.lock:
+            return self._taker(side).qty_within(bps)
+
+    def vwap(self, side: str, qty: float) -> Tuple[Optional[float], float]:
+        """(expected average fill price, fillable qty) for a market order of qty on `side`."""
+        with self.lock:
+            notional, filled = self._taker(side).walk(qty)
+        return (notional / filled if filled else None), filled
+
+    def slippage_bps(self, side: str, qty: float) -> Optional[float]:
+        """Expected cost vs the touch in bps (positive = worse), None if the book can't fill qty."""
+        with self.lock:
+            book = self._taker(side)
+            best = book.best()
+            notional, filled = book.walk(qty)
+        if best is None or filled < qty:
+            return None
+        return abs(notional / filled - best[0]) / best[0] * 10000
+
+    def executable_qty(self, side: str, qty: float, max_slippage_bps: float) -> float:
+        """Largest part of qty the book absorbs within max_slippage_bps of the touch."""
+        return min(qty, self.qty_within(side, max_slippage_bps))
+
+
+class BookStream(MarketDataStream):
+    """
+    Keeps an OrderBook per subscribed symbol on the shared combined-stream machinery. Diffs are
+    buffered while a snapshot is in flight; a sequence break or reconnect triggers a resync.
+    """
+
+    def __init__(self, client: "BinanceFuturesClient", ws_url: str, depth_limit: int = DEPTH_LIMIT,
+                 speed: str = DEPTH_STREAM):
+        super().__init__(ws_url, streams=(speed,))
+        self.client = client
+        self.depth_limit = depth_limit
+        self.books: Dict[str, OrderBook] = {}
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}  # symbol -> diffs buffered during a resync
+        self._ready: Dict[str, threading.Event] = {}
+
+    def subscribe(self, symbols: Iterable[str]) -> None:
+        symbols = list(symbols)
+        with self._lock:
+            for s in symbols:
+                if s not in self.books:
+                    self.books[s] = OrderBook(s)
+                    self._ready[s] = threading.Event()
+        super().subscribe(symbols)
+
+    def book(self, symbol: str, wait: float = 5.0) -> Optional[OrderBook]:
+        """Subscribe if needed and block until the book is synced; None if it doesn't sync in time."""
+        self.start([symbol])
+        self._ready[symbol].wait(wait)
+        book = self.books[symbol]
+        return book if book.synced else None
+
+    def _on_connected(self) -> None:
+        # anything may have been missed while disconnected
+        for book in self.books.values():
+            book.synced = False
+        self._pending = {}
+
+    def _on_frame(self, raw) -> None:
+        msg = json.loads(raw)
+        data = msg.get("data", msg)
+        if not isinstance(data, dict) or data.get("e") != "depthUpdate":
+            return
+        self.frames += 1
+        symbol = data["s"]
+        book = self.books.get(symbol)
+        if book is None:
+            return
+        pending = self._pending.get(symbol)
+        if pending is not None:
+            pending.append(data)
+            return
+        if not book.apply_diff(data):
+            self._resync(symbol, data)
+        elif book.synced and not self._ready[symbol].is_set():
+            self._ready[symbol].set()
+
+    def _resync(self, symbol: str, first_event: Dict[str, Any]) -> None:
+        book = self.books[symbol]
+        book.resyncs += 1
+        self._ready[symbol].clear()
+        self._pending[symbol] = [first_event]
+        self._loop.run_in_executor(None, self._fetch_snapshot, symbol)
+
+    def _fetch_snapshot(self, symbol: str) -> None:
+        try:
+            data = self.client._request("GET", "/fapi/v1/depth", params={"symbol": symbol, "limit": self.depth_limit})
+        except Exception as e:
+            logger.warning("Depth snapshot for %s failed: %s", symbol, e)
+            data = None
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._on_snapshot, symbol, data)
+
+    def _on_snapshot(self, symbol: str, data: Optional[Dict[str, Any]]) -> None:
+        events = self._pending.pop(symbol, [])
+        if data is None:
+            return  # the next diff starts another resync
+        book = self.books[symbol]
+        book.load_snapshot(data)
+        for event in events:
+            if not book.apply_diff(event):
+                # snapshot older than the buffered diffs (or a gap inside them): start over
+                logger.info("Depth snapshot for %s did not bridge the diff stream, retrying", symbol)
+                self._resync(symbol, event)
+                return
+        if book.synced:
+            self._ready[symbol].set()
+
+
+_book_streams: Dict[str, BookStream] = {}
+_book_streams_lock = threading.Lock()
+
+
+def get_book_stream(client: "BinanceFuturesClient") -> BookStream:
+    """One depth stream per WebSocket host for the whole process."""
+    url = ws_url_for(client.base_url)
+    with _book_streams_lock:
+        stream = _book_streams.get(url)
+        if stream is None:
+            stream = _book_streams[url] = BookStream(client, url)
+        return stream
+
+
+def get_order_book(client: "BinanceFuturesClient", symbol: str, wait: float = 5.0) -> Optional[OrderBook]:
+    """Synced local book for symbol, or None when streaming is unavailable (callers then trade blind)."""
+    try:
+        return get_book_stream(client).book(symbol, wait)
+    except Exception as e:
+        logger.warning("Order book for %s unavailable: %s", symbol, e)
+        return None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Local L2 book: spread, depth and expected market fill")
+    parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
+    parser.add_argument("--qty", type=float, help="Quote expected VWAP/slippage for this market quantity")
+    parser.add_argument("--bps", type=float, default=10.0, help="Depth band for the quantity-within report")
+    return parser
+
+
+def execute(args: argparse.Namespace, client: Optional["BinanceFuturesClient"] = None) -> None:
+    from .client import BinanceFuturesClient
+
+    symbol = validate_symbol(args.symbol)
+    client = client or BinanceFuturesClient()
+    try:
+        book = get_order_book(client, symbol)
+        if book is None:
+            raise RuntimeError("order book did not sync")
+        bid, ask = book.best_bid(), book.best_ask()
+        print("Order book summary.")
+        print(f"Symbol: {symbol}, Bid: {bid[0]} x {bid[1]}, Ask: {ask[0]} x {ask[1]}, Spread: {book.spread_bps():.2f} bps")
+        print(f"Within {args.bps:g} bps: buy {book.qty_within('BUY', args.bps):g}, sell {book.qty_within('SELL', args.bps):g}")
+        if args.qty:
+            for side in ("BUY", "SELL"):
+                px, filled = book.vwap(side, args.qty)
+                slip = book.slippage_bps(side, args.qty)
+                print(f"{side} {args.qty:g}: VWAP {px}, Filled: {filled:g}, Slippage: "
+                      f"{'n/a' if slip is None else f'{slip:.2f} bps'}")
+    except Exception as e:
+        logger.error("Order book failed: %s", e)
+        print("Order book failed.")
+        print(f"Error: {e}")
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("order_book", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    main()
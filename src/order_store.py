@@ -0,0 +1,283 @@
+# src/order_store.py
+from __future__ import annotations
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+from .errors import BinanceAPIError
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from .client import BinanceFuturesClient
+    from .user_stream import OrderEvent, UserDataStream
+
+logger = get_logger(__name__)
+
+OPEN_STATUSES = ("NEW", "PARTIALLY_FILLED")
+FINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH")
+MAX_CLOSED = 100_000  # closed orders kept for lookups; open orders are never evicted
+# "Order does not exist." -- the only query error that proves an order is gone
+ORDER_NOT_FOUND = -2013
+
+
+class OrderRecord:
+    """Compact per-order state. Repeated strings are interned so 100k records share them."""
+    __slots__ = ("order_id", "symbol", "client_order_id", "side", "order_type", "status", "price",
+                 "stop_price", "orig_qty", "filled_qty", "avg_price", "reduce_only", "update_ms")
+
+    def __init__(self, order_id: int, symbol: str):
+        self.order_id = order_id
+        self.symbol = sys.intern(symbol)
+        self.client_order_id = ""
+        self.side = ""
+        self.order_type = ""
+        self.status = "NEW"
+        self.price = 0.0
+        self.stop_price = 0.0
+        self.orig_qty = 0.0
+        self.filled_qty = 0.0
+        self.avg_price = 0.0
+        self.reduce_only = False
+        self.update_ms = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in OPEN_STATUSES
+
+    def as_order(self) -> Dict[str, Any]:
+        """Same keys as a GET /fapi/v1/order response."""
+        return {"orderId": self.order_id, "symbol": self.symbol, "clientOrderId": self.client_order_id,
+                "side": self.side, "type": self.order_type, "status": self.status, "price": str(self.price),
+                "stopPrice": str(self.stop_price), "origQty": str(self.orig_qty),
+                "executedQty": str(self.filled_qty), "avgPrice": str(self.avg_price),
+                "reduceOnly": self.reduce_only, "updateTime": self.update_ms}
+
+    def __repr__(self) -> str:
+        return (f"OrderRecord({self.order_id} {self.symbol} {self.side} {self.order_type} {self.status} "
+                f"{self.filled_qty}/{self.orig_qty} @ {self.price})")
+
+
+def _fields_from_rest(o: Dict[str, Any]) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {}
+    for key, attr, conv in (("clientOrderId", "client_order_id", str), ("side", "side", sys.intern),
+                            ("type", "order_type", sys.intern), ("status", "status", sys.intern),
+                            ("price", "price", float), ("stopPrice", "stop_price", float),
+                            ("origQty", "orig_qty", float), ("executedQty", "filled_qty", float),
+                            ("avgPrice", "avg_price", float), ("updateTime", "update_ms", int)):
+        if o.get(key) is not None:
+            fields[attr] = conv(o[key])
+    if "reduceOnly" in o:
+        fields["reduce_only"] = str(o["reduceOnly"]).lower() == "true"
+    return fields
+
+
+class OrderStore:
+    """
+    Everything this process placed or heard about, indexed by orderId, clientOrderId, symbol and
+    status. Fed by order/cancel responses, user-stream ORDER_TRADE_UPDATEs and openOrders
+    reconciles. Updates older than what a record already holds are ignored, so a late REST
+    response can't undo a stream fill.
+    """
+
+    def __init__(self, max_closed: int = MAX_CLOSED):
+        self.max_closed = max_closed
+        self._orders: Dict[int, OrderRecord] = {}
+        self._by_client: Dict[str, int] = {}
+        self._by_symbol: Dict[str, Set[int]] = {}
+        self._by_status: Dict[str, Set[int]] = {}
+        self._closed: deque = deque()  # closed orderIds, oldest first (final states never repeat)
+        self._synced: Dict[str, Tuple[float, int]] = {}  # symbol -> (reconciled at, stream generation)
+        self._stream: Optional["UserDataStream"] = None
+        self._stop: Optional[threading.Event] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    # ----- writes -----
+
+    def _apply(self, order_id: int, symbol: str, fields: Dict[str, Any]) -> Optional[OrderRecord]:
+        with self._lock:
+            rec = self._orders.get(order_id)
+            if rec is None:
+                rec = self._orders[order_id] = OrderRecord(order_id, symbol)
+                self._by_symbol.setdefault(rec.symbol, set()).add(order_id)
+                self._by_status.setdefault(rec.status, set()).add(order_id)
+            else:
+                ts = fields.get("update_ms", 0)
+                if ts and ts < rec.update_ms:
+                    return rec
+                if rec.status in FINAL_STATUSES and fields.get("status", rec.status) != rec.status:
+                    return rec  # final states don't move
+            old_status = rec.status
+            for attr, value in fields.items():
+                setattr(rec, attr, value)
+            if rec.client_order_id:
+                self._by_client[rec.client_order_id] = order_id
+            if rec.status != old_status:
+                self._by_status[old_status].discard(order_id)
+                self._by_status.setdefault(rec.status, set()).add(order_id)
+                if rec.status in FINAL_STATUSES:
+                    self._closed.append(order_id)
+                    self._evict()
+            return rec
+
+    def _evict(self) -> None:
+        while len(self._closed) > self.max_closed:
+            order_id = self._closed.popleft()
+            rec = self._orders.pop(order_id, None)
+            if rec is None:
+                continue
+            self._by_symbol[rec.symbol].discard(order_id)
+            self._by_status[rec.status].discard(order_id)
+            if self._by_client.get(rec.client_order_id) == order_id:
+                del self._by_client[rec.client_order_id]
+
+    def apply_response(self, resp: Any) -> Optional[OrderRecord]:
+        """Record a place/cancel/query REST response (error dicts are ignored)."""
+        if not isinstance(resp, dict) or resp.get("orderId") is None or not resp.get("symbol"):
+            return None
+        return self._apply(int(resp["orderId"]), resp["symbol"], _fields_from_rest(resp))
+
+    def apply_responses(self, responses: Iterable[Any]) -> None:
+        for resp in responses:
+            self.apply_response(resp)
+
+    def apply_event(self, event: "OrderEvent") -> Optional[OrderRecord]:
+        return self._apply(event.order_id, event.symbol, {
+            "client_order_id": event.client_order_id, "side": sys.intern(event.side),
+            "order_type": sys.intern(event.order_type), "status": sys.intern(event.status),
+            "price": event.price, "stop_price": event.stop_price, "orig_qty": event.orig_qty,
+            "filled_qty": event.filled_qty, "avg_price": event.avg_price, "reduce_only": event.reduce_only,
+            "update_ms": event.trade_ms or event.event_ms,
+        })
+
+    def attach(self, stream: "UserDataStream") -> None:
+        """Keep the store current from a user-data stream."""
+        self._stream = stream
+        stream.add_listener(self._on_stream)
+
+    def _on_stream(self, kind: str, payload: Any) -> None:
+        if kind == "ORDER_TRADE_UPDATE":
+            self.apply_event(payload)
+
+    # ----- reads -----
+
+    def get(self, order_id: int) -> Optional[OrderRecord]:
+        return self._orders.get(int(order_id))
+
+    def by_client_id(self, client_order_id: str) -> Optional[OrderRecord]:
+        order_id = self._by_client.get(client_order_id)
+        return self._orders.get(order_id) if order_id is not None else None
+
+    def _select(self, ids: Set[int], symbol: Optional[str]) -> List[OrderRecord]:
+        with self._lock:
+            if symbol is not None:
+                ids = ids & self._by_symbol.get(symbol, set())
+            return sorted((self._orders[i] for i in ids), key=lambda r: r.order_id)
+
+    def with_status(self, status: str, symbol: Optional[str] = None) -> List[OrderRecord]:
+        return self._select(self._by_status.get(status, set()), symbol)
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[OrderRecord]:
+        with self._lock:
+            ids = set().union(*(self._by_status.get(s, set()) for s in OPEN_STATUSES))
+        return self._select(ids, symbol)
+
+    def is_filled(self, order_id: int) -> Optional[bool]:
+        """True/False from local state, None when the order is unknown here."""
+        rec = self.get(order_id)
+        return None if rec is None else rec.status == "FILLED"
+
+    def is_live(self, symbol: str) -> bool:
+        """
+        Local state for symbol is authoritative: it was reconciled against openOrders and the user
+        stream has been connected without a gap ever since.
+        """
+        synced = self._synced.get(symbol)
+        stream = self._stream
+        return (synced is not None and stream is not None and stream.connected
+                and stream.generation == synced[1])
+
+    # ----- reconcile -----
+
+    def reconcile(self, client: "BinanceFuturesClient", symbol: str,
+                  open_orders: Optional[List[Dict[str, Any]]] = None) -> Dict[str, int]:
+        """
+        Diff GET /fapi/v1/openOrders against local state: unseen orders are added, changed ones
+        updated, and local open orders missing from the exchange are resolved with one order query
+        each. Pass open_orders when the caller already fetched them.
+        """
+        generation = self._stream.generation if self._stream is not None else 0
+        if open_orders is None:
+            open_orders = client._request("GET", "/fapi/v1/openOrders", params={"symbol": symbol}, signed=True)
+        stats = {"added": 0, "updated": 0, "closed": 0}
+        seen = set()
+        for o in open_orders:
+            order_id = int(o["orderId"])
+            seen.add(order_id)
+            rec = self.get(order_id)
+            fields = _fields_from_rest(o)
+            if rec is None:
+                stats["added"] += 1
+            elif any(getattr(rec, k) != v for k, v in fields.items()):
+                stats["updated"] += 1
+            else:
+                continue
+            self._apply(order_id, o["symbol"], fields)
+        for rec in self.open_orders(symbol):
+            if rec.order_id in seen:
+                continue
+            try:
+                client.get_order(symbol, rec.order_id)
+            except Exception as e:
+                if not isinstance(e, BinanceAPIError) or e.code != ORDER_NOT_FOUND:
+                    # timeout, 429/418, 5xx...: proves nothing, so keep it open and retry next reconcile
+                    logger.warning("Order %s missing from openOrders; query failed, will retry: %s", rec.order_id, e)
+                    continue
+                # gone from the book and not queryable (archived): it is no longer open either way
+                logger.warning("Order %s missing from openOrders and not queryable: %s", rec.order_id, e)
+                self._apply(rec.order_id, symbol, {"status": "EXPIRED"})
+            stats["closed"] += 1
+        self._synced[symbol] = (time.time(), generation)
+        if any(stats.values()):
+            logger.info("Order store reconcile %s: %s", symbol, stats)
+        return stats
+
+    def start_reconcile(self, client: "BinanceFuturesClient", symbols: Iterable[str], interval: float = 60.0) -> None:
+        """Reconcile symbols every interval seconds from a background thread."""
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        stop = self._stop
+        symbols = list(symbols)
+
+        def loop():
+            while not stop.wait(interval):
+                for symbol in symbols:
+                    try:
+                        self.reconcile(client, symbol)
+                    except Exception as e:
+                        logger.warning("Order store reconcile failed for %s: %s", symbol, e)
+
+        threading.Thread(target=loop, name="order-reconcile", daemon=True).start()
+
+    def stop_reconcile(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+
+_stores: Dict[Tuple[str, str], OrderStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_order_store(client: "BinanceFuturesClient") -> OrderStore:
+    """One store per (base_url, api_key) for the whole process."""
+    key = (client.base_url.rstrip("/"), client.api_key)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = OrderStore()
+        return store
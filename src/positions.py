@@ -1,13 +1,20 @@
 # src/positions.py
 from __future__ import annotations
+import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Show open futures positions")
+    return parser
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     try:
-        client = BinanceFuturesClient()
+        client = client or BinanceFuturesClient()
         data = client._request("GET", "/fapi/v2/positionRisk", params={}, signed=True)
         non_zero = [p for p in data if float(p.get("positionAmt", 0)) != 0.0]
         logger.info("Positions fetched: %s", non_zero)
@@ -22,5 +29,10 @@ def main():
         print("Positions fetch failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("positions", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
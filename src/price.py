@@ -1,28 +1,41 @@
 # src/price.py
 from __future__ import annotations
 import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
 from .validators import validate_symbol
 from .logger import get_logger
+from .ctl import forward_to_daemon
 
 logger = get_logger(__name__)
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Get latest price for a symbol")
     parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
-    args = parser.parse_args()
+    return parser
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
 
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
     try:
-        resp = client.get_symbol_price(symbol)
-        logger.info("Price fetched: %s", resp)
+        cached = client.cached_price(symbol)
+        if cached is not None:
+            price, source = cached, "stream"
+        else:
+            price, source = client.get_symbol_price(symbol).get("price"), "rest"
+        logger.info("Price fetched: %s %s (%s)", symbol, price, source)
         print("Price summary.")
-        print(f"Symbol: {symbol}, Price: {resp.get('price')}")
+        print(f"Symbol: {symbol}, Price: {price}")
     except Exception as e:
         logger.error("Price failed: %s", e)
         print("Price fetch failed.")
         print(f"Error: {e}")
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("price", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
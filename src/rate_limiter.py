@@ -0,0 +1,368 @@
+# src/rate_limiter.py
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Mapping, Tuple, List
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Dispatch priorities (lower goes first)
+PRIORITY_CANCEL = 0
+PRIORITY_CLOSE = 1
+PRIORITY_ORDER = 2
+PRIORITY_INFO = 3
+PRIORITY_NAMES = {PRIORITY_CANCEL: "cancel", PRIORITY_CLOSE: "close", PRIORITY_ORDER: "order", PRIORITY_INFO: "info"}
+
+# USDT-M futures default limits
+WEIGHT_LIMIT_1M = 2400
+ORDER_LIMIT_10S = 300
+ORDER_LIMIT_1M = 1200
+
+# Fraction of each limit a priority class may use; lower classes leave headroom for cancels.
+HEADROOM = {PRIORITY_CANCEL: 1.0, PRIORITY_CLOSE: 0.97, PRIORITY_ORDER: 0.9, PRIORITY_INFO: 0.8}
+
+# (method, path) -> (weight with symbol, weight without symbol)
+ENDPOINT_WEIGHTS: Dict[Tuple[str, str], Tuple[int, int]] = {
+    ("GET", "/fapi/v1/time"): (1, 1),
+    ("GET", "/fapi/v1/exchangeInfo"): (1, 1),
+    ("GET", "/fapi/v1/ticker/price"): (1, 2),
+    ("GET", "/fapi/v2/ticker/price"): (1, 2),
+    ("GET", "/fapi/v1/ticker/bookTicker"): (2, 5),
+    ("GET", "/fapi/v1/ticker/24hr"): (1, 40),
+    ("GET", "/fapi/v1/premiumIndex"): (1, 10),
+    ("GET", "/fapi/v1/aggTrades"): (20, 20),
+    ("GET", "/fapi/v1/order"): (1, 1),
+    ("GET", "/fapi/v1/openOrders"): (1, 40),
+    ("GET", "/fapi/v2/positionRisk"): (5, 5),
+    ("GET", "/fapi/v2/balance"): (5, 5),
+    ("POST", "/fapi/v1/order"): (0, 0),
+    ("DELETE", "/fapi/v1/order"): (1, 1),
+    ("DELETE", "/fapi/v1/allOpenOrders"): (1, 1),
+    ("POST", "/fapi/v1/batchOrders"): (5, 5),
+    ("DELETE", "/fapi/v1/batchOrders"): (1, 1),
+    ("POST", "/fapi/v1/listenKey"): (1, 1),
+    ("PUT", "/fapi/v1/listenKey"): (1, 1),
+    ("DELETE", "/fapi/v1/listenKey"): (1, 1),
+}
+
+
+def _limit_weight(limit: int, table: List[Tuple[int, int]]) -> int:
+    for bound, weight in table:
+        if limit <= bound:
+            return weight
+    return table[-1][1]
+
+
+def request_weight(method: str, path: str, params: Optional[Mapping[str, Any]] = None) -> int:
+    """IP weight of one request according to Binance's published weight table."""
+    params = params or {}
+    if path == "/fapi/v1/depth":
+        return _limit_weight(int(params.get("limit", 500)), [(50, 2), (100, 5), (500, 10), (1000, 20)])
+    if path in ("/fapi/v1/klines", "/fapi/v1/continuousKlines", "/fapi/v1/markPriceKlines"):
+        return _limit_weight(int(params.get("limit", 500)), [(99, 1), (499, 2), (1000, 5), (1500, 10)])
+    with_symbol, without_symbol = ENDPOINT_WEIGHTS.get((method, path), (1, 1))
+    return with_symbol if "symbol" in params else without_symbol
+
+
+def order_count(method: str, path: str, params: Optional[Mapping[str, Any]] = None) -> int:
+    """How many orders a request adds to the X-MBX-ORDER-COUNT-* windows."""
+    if method != "POST":
+        return 0
+    if path == "/fapi/v1/order":
+        return 1
+    if path == "/fapi/v1/batchOrders":
+        batch = (params or {}).get("batchOrders", "[]")
+        return max(1, str(batch).count("{"))
+    return 0
+
+
+def classify_priority(method: str, path: str, params: Optional[Mapping[str, Any]] = None) -> int:
+    params = params or {}
+    if method == "DELETE" and path != "/fapi/v1/listenKey":
+        return PRIORITY_CANCEL
+    if method == "POST" and path in ("/fapi/v1/order", "/fapi/v1/batchOrders"):
+        if str(params.get("reduceOnly", "")).lower() == "true" or "reduceOnly" in str(params.get("batchOrders", "")):
+            return PRIORITY_CLOSE
+        return PRIORITY_ORDER
+    if method in ("POST", "PUT"):
+        return PRIORITY_ORDER
+    return PRIORITY_INFO
+
+
+class _Window:
+    """Fixed counting window aligned to the wall clock, like the exchange's own."""
+    __slots__ = ("length", "limit", "start", "used")
+
+    def __init__(self, length: float, limit: int):
+        self.length = length
+        self.limit = limit
+        self.start = 0.0
+        self.used = 0
+
+    def roll(self, now: float) -> None:
+        start = now - (now % self.length)
+        if start != self.start:
+            self.start = start
+            self.used = 0
+
+    def wait_for(self, amount: int, fraction: float, now: float) -> float:
+        self.roll(now)
+        if amount == 0 or self.used + amount <= self.limit * fraction:
+            return 0.0
+        return self.start + self.length - now
+
+
+class QueueStats:
+    """Queue-wait instrumentation per priority class."""
+
+    def __init__(self, keep: int = 1000):
+        self.count: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self.total: Dict[int, float] = {p: 0.0 for p in PRIORITY_NAMES}
+        self.max: Dict[int, float] = {p: 0.0 for p in PRIORITY_NAMES}
+        self.recent: Dict[int, deque] = {p: deque(maxlen=keep) for p in PRIORITY_NAMES}
+
+    def record(self, priority: int, waited: float) -> None:
+        self.count[priority] += 1
+        self.total[priority] += waited
+        self.max[priority] = max(self.max[priority], waited)
+        self.recent[priority].append(waited)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for p, name in PRIORITY_NAMES.items():
+            samples = sorted(self.recent[p])
+            n = self.count[p]
+            out[name] = {
+                "count": n,
+                "mean_ms": (self.total[p] / n * 1000) if n else 0.0,
+                "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000 if samples else 0.0,
+                "max_ms": self.max[p] * 1000,
+            }
+        return out
+
+
+class RateGovernor:
+    """
+    Client-side limiter for request weight and order counts.
+    Requests wait in a priority queue (cancels, then reduce-only closes, then new orders,
+    then informational GETs) until their window has room; counters are re-synced from the
+    X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-* headers and 429/418 responses pause everything
+    until Retry-After has passed.
+    """
+
+    def __init__(self, weight_limit: int = WEIGHT_LIMIT_1M, order_limit_10s: int = ORDER_LIMIT_10S,
+                 order_limit_1m: int = ORDER_LIMIT_1M, slow_wait_log: float = 0.5):
+        self.weight = _Window(60.0, weight_limit)
+        self.orders_10s = _Window(10.0, order_limit_10s)
+        self.orders_1m = _Window(60.0, order_limit_1m)
+        self.banned_until = 0.0
+        self.stats = QueueStats()
+        self.slow_wait_log = slow_wait_log
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+
+    # Core bookkeeping (call with the lock held)
+    def _delay(self, weight: int, orders: int, priority: int, now: float) -> float:
+        fraction = HEADROOM[priority]
+        return max(
+            self.banned_until - now,
+            self.weight.wait_for(weight, fraction, now),
+            self.orders_10s.wait_for(orders, fraction, now),
+            self.orders_1m.wait_for(orders, fraction, now),
+        )
+
+    def _consume(self, weight: int, orders: int) -> None:
+        self.weight.used += weight
+        self.orders_10s.used += orders
+        self.orders_1m.used += orders
+
+    def _finish(self, priority: int, waited: float, weight: int) -> None:
+        self.stats.record(priority, waited)
+        if waited >= self.slow_wait_log:
+            logger.warning("Rate governor held %s request %.0fms (weight=%s used=%s/%s)",
+                           PRIORITY_NAMES[priority], waited * 1000, weight, self.weight.used, self.weight.limit)
+
+    def _abandon(self, ticket: Tuple[int, int]) -> None:
+        # a waiter gave up (interrupt/cancellation); drop its ticket so the queue keeps moving
+        with self._cond:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def acquire(self, weight: int, orders: int = 0, priority: int = PRIORITY_INFO) -> float:
+        """Block until the request may be sent; returns seconds spent queued."""
+        t0 = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        delay = self._delay(weight, orders, priority, time.time())
+                        if delay <= 0:
+                            heapq.heappop(self._waiting)
+                            self._consume(weight, orders)
+                            self._cond.notify_all()
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                self._abandon(ticket)
+                raise
+            waited = time.monotonic() - t0
+            self._finish(priority, waited, weight)
+        return waited
+
+    async def acquire_async(self, weight: int, orders: int = 0, priority: int = PRIORITY_INFO) -> float:
+        """asyncio variant of acquire(); shares the same queue and counters."""
+        t0 = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+        try:
+            while True:
+                with self._cond:
+                    delay = 0.002
+                    if self._waiting[0] == ticket:
+                        delay = self._delay(weight, orders, priority, time.time())
+                        if delay <= 0:
+                            heapq.heappop(self._waiting)
+                            self._consume(weight, orders)
+                            self._cond.notify_all()
+                            waited = time.monotonic() - t0
+                            self._finish(priority, waited, weight)
+                            return waited
+                await asyncio.sleep(min(delay, 0.05))
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def update_from_headers(self, headers: Mapping[str, str], status: int = 200) -> None:
+        """Sync counters with what the exchange reports; server numbers win if higher."""
+        now = time.time()
+        with self._cond:
+            for window, name in ((self.weight, "X-MBX-USED-WEIGHT-1M"),
+                                 (self.orders_10s, "X-MBX-ORDER-COUNT-10S"),
+                                 (self.orders_1m, "X-MBX-ORDER-COUNT-1M")):
+                value = headers.get(name)
+                if value is not None:
+                    window.roll(now)
+                    window.used = max(window.used, int(value))
+            if status in (418, 429):
+                retry_after = float(headers.get("Retry-After") or 60)
+                self.banned_until = max(self.banned_until, now + retry_after)
+                logger.error("HTTP %s from exchange — pausing all requests for %.0fs", status, retry_after)
+            self._cond.notify_all()
+
+    def usage(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._cond:
+            for w in (self.weight, self.orders_10s, self.orders_1m):
+                w.roll(now)
+            return {
+                "weight_1m": self.weight.used,
+                "orders_10s": self.orders_10s.used,
+                "orders_1m": self.orders_1m.used,
+                "queued": len(self._waiting),
+                "banned_for": max(0.0, self.banned_until - now),
+                "queue_wait": self.stats.snapshot(),
+            }
+
+
+class BudgetGovernor:
+    """
+    One consumer's share of a parent RateGovernor (one strategy in src/runtime.py). A request first
+    waits for room in this budget's own weight-per-minute and orders-per-10s windows, then queues
+    on the parent as usual. Cancels are never held back by a budget. Headers and bans go to the
+    parent, since that is what the exchange counts.
+    """
+
+    def __init__(self, parent: RateGovernor, weight_limit: Optional[int] = None, order_limit_10s: Optional[int] = None):
+        self.parent = parent
+        self.weight = _Window(60.0, weight_limit or parent.weight.limit)
+        self.orders_10s = _Window(10.0, order_limit_10s or parent.orders_10s.limit)
+        self.requests = 0
+        self.weight_total = 0
+        self.held = 0.0  # seconds spent waiting on this budget (parent queueing not included)
+        self._cond = threading.Condition()
+
+    def _delay(self, weight: int, orders: int, priority: int, now: float) -> float:
+        if priority == PRIORITY_CANCEL:
+            return 0.0
+        delay = 0.0
+        for window, amount in ((self.weight, weight), (self.orders_10s, orders)):
+            wait = window.wait_for(amount, 1.0, now)
+            # a request bigger than the whole budget still goes out, at the start of a window
+            if wait and window.used:
+                delay = max(delay, wait)
+        return delay
+
+    def _consume(self, weight: int, orders: int, held: float) -> None:
+        self.weight.used += weight
+        self.orders_10s.used += orders
+        self.requests += 1
+        self.weight_total += weight
+        self.held += held
+
+    def acquire(self, weight: int, orders: int = 0, priority: int = PRIORITY_INFO) -> float:
+        t0 = time.monotonic()
+        with self._cond:
+            while True:
+                delay = self._delay(weight, orders, priority, time.time())
+                if delay <= 0:
+                    break
+                self._cond.wait(delay)
+            held = time.monotonic() - t0
+            self._consume(weight, orders, held)
+        return held + self.parent.acquire(weight, orders, priority)
+
+    async def acquire_async(self, weight: int, orders: int = 0, priority: int = PRIORITY_INFO) -> float:
+        t0 = time.monotonic()
+        while True:
+            with self._cond:
+                delay = self._delay(weight, orders, priority, time.time())
+                if delay <= 0:
+                    held = time.monotonic() - t0
+                    self._consume(weight, orders, held)
+                    break
+            await asyncio.sleep(min(delay, 0.05))
+        return held + await self.parent.acquire_async(weight, orders, priority)
+
+    def update_from_headers(self, headers: Mapping[str, str], status: int = 200) -> None:
+        self.parent.update_from_headers(headers, status)
+
+    def usage(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._cond:
+            for w in (self.weight, self.orders_10s):
+                w.roll(now)
+            return {
+                "weight_1m": self.weight.used,
+                "weight_limit_1m": self.weight.limit,
+                "orders_10s": self.orders_10s.used,
+                "order_limit_10s": self.orders_10s.limit,
+                "requests": self.requests,
+                "weight_total": self.weight_total,
+                "held_s": round(self.held, 3),
+            }
+
+
+_shared_governor: Optional[RateGovernor] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_governor() -> RateGovernor:
+    """Limits are per IP and per account, so every client in the process shares one governor."""
+    global _shared_governor
+    with _shared_lock:
+        if _shared_governor is None:
+            _shared_governor = RateGovernor()
+        return _shared_governor
@@ -0,0 +1,541 @@
+# src/runtime.py
+from __future__ import annotations
+import argparse
+import heapq
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from .client import BinanceFuturesClient
+from .rate_limiter import BudgetGovernor
+from .advanced.brackets import BracketManager, parse_bracket
+from .advanced.grid_cli import generate_grid_prices
+from .advanced.grid_engine import GridEngine, RESYNC_INTERVAL
+from .advanced.triggers import TriggerEngine, parse_trigger
+from .advanced.twap import build_job
+from .logger import get_logger
+from .ctl import forward_to_daemon
+
+logger = get_logger(__name__)
+
+MAX_FAILURES = 5       # consecutive failed steps before an instance is given up
+RETRY_INTERVAL = 2.0   # seconds before a failed step is retried
+FINAL_STATES = ("STOPPED", "DONE", "FAILED")
+
+
+class _Timings:
+    """Count, total and recent samples (ms) of one measurement, for mean/p50/p99."""
+
+    def __init__(self, keep: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.recent: deque = deque(maxlen=keep)
+
+    def record(self, ms: float) -> None:
+        self.count += 1
+        self.total += ms
+        self.recent.append(ms)
+
+    def snapshot(self) -> Dict[str, float]:
+        samples = sorted(self.recent)
+        pick = lambda q: samples[min(len(samples) - 1, int(len(samples) * q))] if samples else 0.0
+        return {"count": self.count, "mean_ms": self.total / self.count if self.count else 0.0,
+                "p50_ms": pick(0.5), "p99_ms": pick(0.99)}
+
+
+class StrategyClient(BinanceFuturesClient):
+    """A hosted instance's client: the runtime client's session and clock, its own governor, timed requests."""
+
+    def __init__(self, parent: BinanceFuturesClient, governor):
+        super().__init__(parent.api_key, parent.api_secret, parent.base_url, session=parent.session,
+                         timeout=parent.timeout, governor=governor, clock=parent.clock)
+        self.requests = _Timings()
+
+    def _send(self, method: str, url: str, query: str, headers: Dict[str, str]):
+        t0 = time.perf_counter()
+        try:
+            return super()._send(method, url, query, headers)
+        finally:
+            self.requests.record((time.perf_counter() - t0) * 1000)
+
+
+# ----- strategies -----
+
+class Strategy:
+    """
+    Unit of work hosted by StrategyRuntime. setup() runs once with the instance's client, step()
+    does one bounded pass and returns seconds until the next one (None when finished), teardown()
+    runs once at the end or on stop(). Event callbacks call self.wake() to run the next step now.
+    The runtime never runs two of these at once for the same instance.
+    """
+    kind = "strategy"
+
+    def __init__(self):
+        self.client: Optional[BinanceFuturesClient] = None
+        self.wake: Callable[[], None] = lambda: None
+
+    def setup(self, client: BinanceFuturesClient) -> None:
+        self.client = client
+
+    def step(self) -> Optional[float]:
+        raise NotImplementedError
+
+    def teardown(self) -> None:
+        pass
+
+    def summary(self) -> Dict[str, Any]:
+        return {}
+
+
+class GridStrategy(Strategy):
+    """GridEngine (see src/advanced/grid_engine.py); fills on the user stream wake it up."""
+    kind = "grid"
+
+    def __init__(self, symbol: str, lower: float, upper: float, levels: int, qty: float, poll_interval: float = 2.0,
+                 resync_interval: float = RESYNC_INTERVAL, cancel_on_stop: bool = False):
+        super().__init__()
+        self.symbol = symbol
+        self.prices = generate_grid_prices(lower, upper, levels)
+        self.qty = qty
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.cancel_on_stop = cancel_on_stop
+        self.engine: Optional[GridEngine] = None
+
+    def setup(self, client: BinanceFuturesClient) -> None:
+        super().setup(client)
+        self.engine = GridEngine(client, self.symbol, self.prices, self.qty, poll_interval=self.poll_interval,
+                                 resync_interval=self.resync_interval, on_wake=self.wake)
+        self.engine.attach()
+
+    def step(self) -> Optional[float]:
+        return self.engine.tick()
+
+    def teardown(self) -> None:
+        self.engine.detach()
+        if self.cancel_on_stop:
+            self.engine.cancel_all()
+
+    def summary(self) -> Dict[str, Any]:
+        return dict(self.engine.stats, open_orders=len(self.engine.live)) if self.engine else {}
+
+
+class TWAPStrategy(Strategy):
+    """One TWAP; each step sends the due slice and sleeps until the next fixed deadline."""
+    kind = "twap"
+
+    def __init__(self, symbol: str, side: str, quantity: float, slices: int, duration: float,
+                 max_slippage_bps: Optional[float] = None):
+        super().__init__()
+        self.args = (symbol, side, quantity, slices, duration)
+        self.max_slippage_bps = max_slippage_bps
+        self.job = None
+        self.index = 0
+
+    def setup(self, client: BinanceFuturesClient) -> None:
+        super().setup(client)
+        symbol, side, quantity, slices, duration = self.args
+        self.job = build_job(client, 1, symbol, side, quantity, slices, duration, time.monotonic(),
+                             self.max_slippage_bps)
+
+    def step(self) -> Optional[float]:
+        self.job.slices.append(self.job.send(self.client, self.index))
+        self.index += 1
+        if self.index >= len(self.job.quantities):
+            self.job.done.set()
+            return None
+        return max(0.0, self.job.due(self.index) - time.monotonic())
+
+    def summary(self) -> Dict[str, Any]:
+        if self.job is None:
+            return {}
+        summary = self.job.summary()
+        del summary["slices"]
+        return summary
+
+
+class BracketStrategy(Strategy):
+    """BracketManager (see src/advanced/brackets.py); finishes when every bracket is closed."""
+    kind = "brackets"
+
+    def __init__(self, brackets: List[Union[str, Dict[str, Any]]], poll_interval: float = 2.0,
+                 cancel_on_stop: bool = True):
+        super().__init__()
+        self.specs = [parse_bracket(b) if isinstance(b, str) else b for b in brackets]
+        self.poll_interval = poll_interval
+        self.cancel_on_stop = cancel_on_stop
+        self.manager: Optional[BracketManager] = None
+
+    def setup(self, client: BinanceFuturesClient) -> None:
+        super().setup(client)
+        self.manager = BracketManager(client, poll_interval=self.poll_interval, on_wake=self.wake)
+        self.manager.attach()
+        self.manager.add_many(self.specs)
+
+    def step(self) -> Optional[float]:
+        wait = self.manager.tick()
+        return wait if self.manager.has_work() else None
+
+    def teardown(self) -> None:
+        self.manager.detach()
+        if self.cancel_on_stop:
+            # leaving both legs resting unmanaged could fill both
+            for b in self.manager.open_brackets():
+                self.manager.cancel(b)
+
+    def summary(self) -> Dict[str, Any]:
+        if self.manager is None:
+            return {}
+        results: Dict[str, int] = {}
+        for b in self.manager.brackets.values():
+            results[b.status] = results.get(b.status, 0) + 1
+        return dict(self.manager.stats, **results)
+
+
+class TriggerStrategy(Strategy):
+    """TriggerEngine (see src/advanced/triggers.py); price updates that cross a trigger wake it up."""
+    kind = "triggers"
+
+    def __init__(self, triggers: List[Union[str, Dict[str, Any]]] = (), state: Optional[str] = None,
+                 check_interval: float = 2.0):
+        super().__init__()
+        self.specs = [parse_trigger(t) if isinstance(t, str) else t for t in triggers]
+        self.state = state
+        self.check_interval = check_interval
+        self.engine: Optional[TriggerEngine] = None
+
+    def setup(self, client: BinanceFuturesClient) -> None:
+        super().setup(client)
+        self.engine = TriggerEngine(client, persist_path=self.state, check_interval=self.check_interval,
+                                    on_wake=self.wake)
+        self.engine.load()
+        if self.specs:
+            self.engine.add_many(self.specs)
+
+    def step(self) -> Optional[float]:
+        wait = self.engine.tick()
+        return wait if self.engine.has_work() else None
+
+    def teardown(self) -> None:
+        self.engine.detach()
+
+    def summary(self) -> Dict[str, Any]:
+        return dict(self.engine.stats, pending=len(self.engine.pending())) if self.engine else {}
+
+
+STRATEGIES = {cls.kind: cls for cls in (GridStrategy, TWAPStrategy, BracketStrategy, TriggerStrategy)}
+
+
+# ----- runtime -----
+
+class StrategyInstance:
+    """One strategy on the runtime: its client and budget, lifecycle state and step accounting."""
+
+    def __init__(self, name: str, strategy: Strategy, client: StrategyClient, budget: Optional[BudgetGovernor]):
+        self.name = name
+        self.strategy = strategy
+        self.client = client
+        self.budget = budget
+        self.state = "PENDING"  # PENDING, RUNNING, PAUSED, STOPPING, STOPPED, DONE, FAILED
+        self.error = ""
+        self.ready = False      # setup() done
+        self.errors = 0
+        self.failures = 0       # consecutive
+        self.cpu_s = 0.0
+        self.steps = _Timings()
+        self.lag = _Timings()   # step start minus when it was due
+        self.done = threading.Event()
+        # scheduler bookkeeping (under the runtime's lock)
+        self._token: Optional[int] = None
+        self._due = 0.0
+        self._busy = False
+        self._rerun = False
+
+    def record(self, lag_s: float, wall_s: float, cpu_s: float) -> None:
+        self.lag.record(max(0.0, lag_s) * 1000)
+        self.steps.record(wall_s * 1000)
+        self.cpu_s += cpu_s
+
+    def status(self) -> Dict[str, Any]:
+        return {"name": self.name, "kind": self.strategy.kind, "state": self.state, "error": self.error,
+                "errors": self.errors, "cpu_ms": round(self.cpu_s * 1000, 3), "step": self.steps.snapshot(),
+                "lag": self.lag.snapshot(), "requests": self.client.requests.snapshot(),
+                "budget": self.budget.usage() if self.budget is not None else None,
+                "summary": self.strategy.summary()}
+
+
+class StrategyRuntime:
+    """
+    Hosts any number of strategy instances in one process. One scheduler thread keeps a heap of
+    next-step deadlines and hands due steps to a small worker pool, one step at a time per
+    instance, so a slow request in one strategy never holds up another. Every instance shares the
+    session pool, clock model, exchangeInfo, market-data stream, order store and rate governor;
+    each gets its own client, whose BudgetGovernor (when given a budget) caps its request weight
+    and whose requests, steps and CPU time are accounted per instance.
+    """
+
+    def __init__(self, client: Optional[BinanceFuturesClient] = None, max_workers: int = 8):
+        self.client = client or BinanceFuturesClient()
+        self.clock = time.monotonic
+        self.instances: Dict[str, StrategyInstance] = {}
+        self._heap: List[Tuple[float, int, StrategyInstance]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="strategy")
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    # ----- lifecycle controls -----
+
+    def add(self, strategy: Strategy, name: Optional[str] = None, weight_budget: Optional[int] = None,
+            order_budget: Optional[int] = None, start: bool = True) -> StrategyInstance:
+        """
+        Host a strategy. weight_budget caps its request weight per minute, order_budget its orders
+        per 10s (both on top of the shared account limits); without either it only shares those.
+        """
+        name = name or f"{strategy.kind}-{len(self.instances) + 1}"
+        if name in self.instances:
+            raise ValueError(f"Strategy name already in use: {name}")
+        budget = None
+        if weight_budget or order_budget:
+            budget = BudgetGovernor(self.client.governor, weight_budget, order_budget)
+        inst = StrategyInstance(name, strategy, StrategyClient(self.client, budget or self.client.governor), budget)
+        strategy.wake = lambda: self.wake(inst)
+        self.instances[name] = inst
+        logger.info("Strategy %s (%s) added, weight budget %s", name, strategy.kind, weight_budget or "shared")
+        if start:
+            self.start_instance(inst)
+        return inst
+
+    def _get(self, ref: Union[str, StrategyInstance]) -> StrategyInstance:
+        if isinstance(ref, StrategyInstance):
+            return ref
+        try:
+            return self.instances[ref]
+        except KeyError:
+            raise ValueError(f"Unknown strategy: {ref}")
+
+    def start_instance(self, ref: Union[str, StrategyInstance]) -> None:
+        inst = self._get(ref)
+        with self._cond:
+            if inst.state != "PENDING":
+                return
+            inst.state = "RUNNING"
+        self.start()
+        self._schedule(inst, self.clock())
+
+    def pause(self, ref: Union[str, StrategyInstance]) -> None:
+        """Hold back further steps (and so requests); stream events keep being recorded for resume()."""
+        inst = self._get(ref)
+        with self._cond:
+            if inst.state == "RUNNING":
+                inst.state = "PAUSED"
+                logger.info("Strategy %s paused", inst.name)
+
+    def resume(self, ref: Union[str, StrategyInstance]) -> None:
+        inst = self._get(ref)
+        with self._cond:
+            if inst.state != "PAUSED":
+                return
+            inst.state = "RUNNING"
+        logger.info("Strategy %s resumed", inst.name)
+        self._schedule(inst, self.clock())
+
+    def stop_instance(self, ref: Union[str, StrategyInstance]) -> None:
+        """Tear the instance down after any step in flight; it is not scheduled again."""
+        inst = self._get(ref)
+        with self._cond:
+            if inst.state in FINAL_STATES or inst.state == "STOPPING":
+                return
+            if not inst.ready and not inst._busy:
+                inst.state = "STOPPED"
+                inst.done.set()
+                return
+            inst.state = "STOPPING"
+        self._schedule(inst, self.clock())
+
+    def wake(self, ref: Union[str, StrategyInstance]) -> None:
+        """Run the instance's next step now (safe from any thread, e.g. stream listeners)."""
+        inst = self._get(ref)
+        if inst.state == "RUNNING":
+            self._schedule(inst, self.clock())
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every instance has finished; False if the timeout ran out first."""
+        deadline = None if timeout is None else self.clock() + timeout
+        for inst in list(self.instances.values()):
+            if not inst.done.wait(None if deadline is None else max(0.0, deadline - self.clock())):
+                return False
+        return True
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [inst.status() for inst in list(self.instances.values())]
+
+    # ----- scheduler -----
+
+    def _schedule(self, inst: StrategyInstance, at: float) -> None:
+        with self._cond:
+            if inst._busy:
+                inst._rerun = True  # picked up when the running step returns
+                return
+            if inst._token is not None and inst._due <= at:
+                return  # already due sooner
+            inst._token = next(self._seq)
+            inst._due = at
+            heapq.heappush(self._heap, (at, inst._token, inst))
+            self._cond.notify()
+
+    def start(self) -> "StrategyRuntime":
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="strategy-runtime", daemon=True)
+            self._thread.start()
+        return self
+
+    def shutdown(self, timeout: float = 30.0) -> None:
+        """Stop every instance (teardown included), then the scheduler and workers."""
+        for inst in list(self.instances.values()):
+            self.stop_instance(inst)
+        if not self.join(timeout):
+            logger.warning("Strategy runtime: some instances did not stop within %ss", timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._heap and self._heap[0][1] != self._heap[0][2]._token:
+                        heapq.heappop(self._heap)  # superseded by an earlier wake
+                        continue
+                    delay = self._heap[0][0] - self.clock() if self._heap else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if self._stopping:
+                    return
+                due, _, inst = heapq.heappop(self._heap)
+                inst._token = None
+                inst._busy = True
+            self._pool.submit(self._work, inst, due)
+
+    def _release(self, inst: StrategyInstance) -> bool:
+        with self._cond:
+            inst._busy = False
+            rerun, inst._rerun = inst._rerun, False
+        return rerun
+
+    def _finish(self, inst: StrategyInstance, state: str) -> None:
+        if inst.ready:
+            try:
+                inst.strategy.teardown()
+            except Exception as e:
+                logger.error("Strategy %s teardown failed: %s", inst.name, e)
+        inst.state = state
+        self._release(inst)
+        inst.done.set()
+        logger.info("Strategy %s %s", inst.name, state.lower())
+
+    def _work(self, inst: StrategyInstance, due: float) -> None:
+        if inst.state == "STOPPING":
+            self._finish(inst, "STOPPED")
+            return
+        if inst.state != "RUNNING":
+            self._release(inst)  # paused while queued; resume() schedules it again
+            return
+        started, cpu = self.clock(), time.thread_time()
+        try:
+            if not inst.ready:
+                inst.strategy.setup(inst.client)
+                inst.ready = True
+            delay = inst.strategy.step()
+            inst.failures = 0
+        except Exception as e:
+            inst.errors += 1
+            inst.failures += 1
+            inst.error = str(e)
+            logger.error("Strategy %s step failed: %s", inst.name, e)
+            delay = RETRY_INTERVAL
+        inst.record(started - due, self.clock() - started, time.thread_time() - cpu)
+        if not inst.ready or inst.failures >= MAX_FAILURES:
+            self._finish(inst, "FAILED")
+            return
+        if delay is None:
+            self._finish(inst, "DONE")
+            return
+        rerun = self._release(inst)
+        self._schedule(inst, self.clock() + (0.0 if rerun or inst.state == "STOPPING" else delay))
+
+
+def build_strategy(spec: Dict[str, Any]) -> Tuple[Strategy, Dict[str, Any]]:
+    """(strategy, add() options) from one config entry: {"kind": ..., "name"/"weight_budget"/"order_budget": ..., **args}."""
+    spec = dict(spec)
+    kind = spec.pop("kind", None)
+    if kind not in STRATEGIES:
+        raise ValueError(f"Strategy kind must be one of {', '.join(STRATEGIES)}, got {kind!r}")
+    options = {k: spec.pop(k) for k in ("name", "weight_budget", "order_budget") if k in spec}
+    return STRATEGIES[kind](**spec), options
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run many strategies in one process on one shared client")
+    parser.add_argument("config", help="JSON file: list of {kind: grid|twap|brackets|triggers, name, weight_budget, ...}")
+    parser.add_argument("--duration", type=float, default=0, help="Stop everything after this many seconds (0 = until done / Ctrl-C)")
+    parser.add_argument("--workers", type=int, default=8, help="Worker threads shared by all strategies")
+    parser.add_argument("--status-interval", type=float, default=60, help="Seconds between status log lines")
+    return parser
+
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
+    with open(args.config, "r", encoding="utf-8") as f:
+        specs = json.load(f)
+    strategies = [build_strategy(s) for s in specs]
+
+    client = client or BinanceFuturesClient()
+    client.start_time_resync()
+    runtime = StrategyRuntime(client, max_workers=args.workers)
+    try:
+        for strategy, options in strategies:
+            runtime.add(strategy, **options)
+        deadline = time.monotonic() + args.duration if args.duration else None
+        try:
+            while not runtime.join(timeout=args.status_interval if deadline is None
+                                   else max(0.0, min(args.status_interval, deadline - time.monotonic()))):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                logger.info("Runtime status: %s", {s["name"]: s["state"] for s in runtime.status()})
+        except KeyboardInterrupt:
+            pass
+        runtime.shutdown()
+    except Exception as e:
+        logger.error("Runtime failed: %s", e)
+        print("Runtime failed.")
+        print(f"Error: {e}")
+        runtime.shutdown()
+        return
+
+    print("Runtime summary.")
+    for s in runtime.status():
+        print(f"{s['name']} ({s['kind']}): State: {s['state']}, Steps: {s['step']['count']}, Errors: {s['errors']}, "
+              f"CPU: {s['cpu_ms']:.1f}ms, Step p99: {s['step']['p99_ms']:.1f}ms, Lag p99: {s['lag']['p99_ms']:.1f}ms")
+        print(f"  Requests: {s['requests']['count']}, Request p99: {s['requests']['p99_ms']:.1f}ms"
+              + (f", Weight used: {s['budget']['weight_total']}" if s["budget"] else "")
+              + (f", Error: {s['error']}" if s["error"] else ""))
+        print(f"  Result: {s['summary']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("runtime", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# src/signing.py
+from __future__ import annotations
+import hmac
+import hashlib
+from decimal import Decimal
+from typing import Dict, Any, Union
+from urllib.parse import quote
+
+# characters that never need percent-encoding in a query value
+_SAFE = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.-~")
+
+
+def format_param(value: Any) -> str:
+    """
+    Render a parameter the way the exchange expects: plain decimal notation, never exponent
+    form (float 1e-05 -> "0.00001"), booleans as "true"/"false".
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        text = repr(value)
+        if "e" in text or "E" in text:
+            text = format(Decimal(text), "f")
+        return text
+    if isinstance(value, Decimal):
+        return format(value, "f")
+    return str(value)
+
+
+def coerce_number(value: Any) -> Union[float, Decimal]:
+    """Keep exact Decimals (e.g. from the pre-trade filter engine); anything else becomes float."""
+    return value if isinstance(value, Decimal) else float(value)
+
+
+def encode_query(params: Dict[str, Any]) -> str:
+    """Encode params once, in insertion order; the result is what gets signed and sent."""
+    parts = []
+    for key, value in params.items():
+        text = format_param(value)
+        if not _SAFE.issuperset(text):
+            text = quote(text, safe="")
+        parts.append(f"{key}={text}")
+    return "&".join(parts)
+
+
+class RequestSigner:
+    """
+    HMAC-SHA256 signer holding the keyed state; each signature works on a copy,
+    so the key schedule is computed once per client instead of once per request.
+    """
+    __slots__ = ("_mac",)
+
+    def __init__(self, api_secret: str):
+        self._mac = hmac.new(api_secret.encode(), digestmod=hashlib.sha256)
+
+    def sign(self, query: str) -> str:
+        mac = self._mac.copy()
+        mac.update(query.encode())
+        return mac.hexdigest()
+
+    def signed_query(self, params: Dict[str, Any]) -> str:
+        """Encoded query with the signature appended; send this string as-is."""
+        query = encode_query(params)
+        return f"{query}&signature={self.sign(query)}"
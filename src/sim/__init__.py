@@ -0,0 +1,6 @@
+# src/sim/__init__.py
+"""Local fapi stand-in: an in-memory matching engine behind an HTTP server."""
+from .engine import MatchingEngine, SimError, SymbolSpec, DEFAULT_SYMBOLS
+from .server import SimConfig, start_sim_server
+
+__all__ = ["MatchingEngine", "SimError", "SymbolSpec", "DEFAULT_SYMBOLS", "SimConfig", "start_sim_server"]
@@ -0,0 +1,513 @@
+# src/sim/engine.py
+from __future__ import annotations
+import itertools
+import random
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from ..logger import get_logger
+
+logger = get_logger(__name__)
+
+OPEN_STATUSES = ("NEW", "PARTIALLY_FILLED")
+ORDER_TYPES = ("LIMIT", "MARKET", "STOP", "STOP_MARKET", "TAKE_PROFIT", "TAKE_PROFIT_MARKET")
+TRIGGER_TYPES = ("STOP", "STOP_MARKET", "TAKE_PROFIT", "TAKE_PROFIT_MARKET")
+MAX_CLOSED = 100_000  # closed orders kept queryable, like OrderStore
+
+
+def fmt(x: float) -> str:
+    """Decimal string without float noise or exponent, as the exchange sends numbers."""
+    return f"{x:.8f}".rstrip("0").rstrip(".") or "0"
+
+
+class SimError(Exception):
+    """An exchange-style rejection: the server replies {"code": code, "msg": msg} with HTTP status."""
+
+    def __init__(self, code: int, msg: str, status: int = 400):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+        self.status = status
+
+    def payload(self) -> Dict[str, Any]:
+        return {"code": self.code, "msg": self.msg}
+
+
+class SymbolSpec(NamedTuple):
+    symbol: str
+    price: float
+    tick: str
+    step: str
+    min_notional: str
+    max_qty: str = "1000"
+    market_max_qty: str = "120"
+
+    def exchange_info_entry(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol, "status": "TRADING", "contractType": "PERPETUAL",
+            "baseAsset": self.symbol[:-4], "quoteAsset": "USDT", "marginAsset": "USDT",
+            "pricePrecision": max(0, -Decimal(self.tick).normalize().as_tuple().exponent),
+            "quantityPrecision": max(0, -Decimal(self.step).normalize().as_tuple().exponent),
+            "orderTypes": list(ORDER_TYPES), "timeInForce": ["GTC", "IOC", "FOK", "GTX"],
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": self.tick, "maxPrice": "10000000", "tickSize": self.tick},
+                {"filterType": "LOT_SIZE", "minQty": self.step, "maxQty": self.max_qty, "stepSize": self.step},
+                {"filterType": "MARKET_LOT_SIZE", "minQty": self.step, "maxQty": self.market_max_qty, "stepSize": self.step},
+                {"filterType": "MAX_NUM_ORDERS", "limit": 200},
+                {"filterType": "MIN_NOTIONAL", "notional": self.min_notional},
+                {"filterType": "PERCENT_PRICE", "multiplierUp": "1.0500", "multiplierDown": "0.9500", "multiplierDecimal": "4"},
+            ],
+        }
+
+
+DEFAULT_SYMBOLS = (
+    SymbolSpec("BTCUSDT", 65000.0, "0.10", "0.001", "100"),
+    SymbolSpec("ETHUSDT", 3000.0, "0.01", "0.001", "20"),
+)
+
+
+class SimOrder:
+    __slots__ = ("order_id", "client_order_id", "symbol", "side", "order_type", "tif", "price", "stop_price",
+                 "qty", "filled", "cum_quote", "status", "reduce_only", "time", "update_time", "triggered")
+
+    def __init__(self, order_id: int, client_order_id: str, symbol: str, side: str, order_type: str, tif: str,
+                 price: float, stop_price: float, qty: float, reduce_only: bool, now: int):
+        self.order_id = order_id
+        self.client_order_id = client_order_id
+        self.symbol = symbol
+        self.side = side
+        self.order_type = order_type
+        self.tif = tif
+        self.price = price
+        self.stop_price = stop_price
+        self.qty = qty
+        self.filled = 0.0
+        self.cum_quote = 0.0
+        self.status = "NEW"
+        self.reduce_only = reduce_only
+        self.time = now
+        self.update_time = now
+        self.triggered = order_type not in TRIGGER_TYPES
+
+    @property
+    def remaining(self) -> float:
+        return self.qty - self.filled
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Same keys as the /fapi/v1/order responses."""
+        return {
+            "orderId": self.order_id, "symbol": self.symbol, "status": self.status,
+            "clientOrderId": self.client_order_id, "price": fmt(self.price),
+            "avgPrice": f"{self.cum_quote / self.filled:.8f}" if self.filled else "0",
+            "origQty": fmt(self.qty), "executedQty": fmt(self.filled), "cumQuote": f"{self.cum_quote:.8f}",
+            "timeInForce": self.tif, "type": self.order_type, "origType": self.order_type,
+            "reduceOnly": self.reduce_only, "closePosition": False, "side": self.side, "positionSide": "BOTH",
+            "stopPrice": fmt(self.stop_price), "workingType": "CONTRACT_PRICE", "priceProtect": False,
+            "time": self.time, "updateTime": self.update_time,
+        }
+
+
+class _Side:
+    """FIFO queues per price; keys are prices for asks and negated prices for bids (index 0 = best)."""
+    __slots__ = ("sign", "keys", "levels")
+
+    def __init__(self, sign: int):
+        self.sign = sign
+        self.keys: List[float] = []
+        self.levels: Dict[float, deque] = {}
+
+    def add(self, order: SimOrder) -> None:
+        key = self.sign * order.price
+        queue = self.levels.get(key)
+        if queue is None:
+            queue = self.levels[key] = deque()
+            insort(self.keys, key)
+        queue.append(order)
+
+    def remove(self, order: SimOrder) -> None:
+        key = self.sign * order.price
+        queue = self.levels.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(order)
+        except ValueError:
+            return
+        if not queue:
+            self._drop(key)
+
+    def _drop(self, key: float) -> None:
+        del self.levels[key]
+        del self.keys[bisect_left(self.keys, key)]
+
+    def depth(self, limit: int) -> List[Tuple[float, float]]:
+        return [(self.sign * k, sum(o.remaining for o in self.levels[k])) for k in self.keys[:limit]]
+
+
+class _Position:
+    __slots__ = ("amt", "entry", "update_time")
+
+    def __init__(self):
+        self.amt = 0.0
+        self.entry = 0.0
+        self.update_time = 0
+
+
+def _decimal(params: Dict[str, Any], key: str, required: bool = False) -> Optional[Decimal]:
+    value = params.get(key)
+    if value in (None, ""):
+        if required:
+            raise SimError(-1102, f"Mandatory parameter '{key}' was not sent, was empty/null, or malformed.")
+        return None
+    try:
+        d = Decimal(str(value))
+    except InvalidOperation:
+        raise SimError(-1102, f"Mandatory parameter '{key}' was not sent, was empty/null, or malformed.")
+    if d <= 0:
+        raise SimError(-1102, f"Mandatory parameter '{key}' was not sent, was empty/null, or malformed.")
+    return d
+
+
+class MatchingEngine:
+    """
+    In-memory USDT-M exchange for one account: a price-time-priority book per symbol plus an
+    exogenous reference price (set_price() or start_walk()) standing in for everyone else. The
+    reference quotes unlimited size spread_bps wide, so market orders always fill; resting orders
+    fill as maker when the reference trades through them, and STOP/TAKE_PROFIT orders trigger on it.
+    One lock guards everything, which keeps the state consistent at a few tens of microseconds per order.
+    """
+
+    def __init__(self, symbols=DEFAULT_SYMBOLS, balance: float = 10_000.0, maker_fee: float = 0.0002,
+                 taker_fee: float = 0.0004, spread_bps: float = 1.0, max_closed: int = MAX_CLOSED):
+        self.specs: Dict[str, SymbolSpec] = {s.symbol: s for s in symbols}
+        self.prices: Dict[str, float] = {s.symbol: s.price for s in symbols}
+        self.balance = balance
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.spread_bps = spread_bps
+        self.max_closed = max_closed
+        self.orders: Dict[int, SimOrder] = {}
+        self.by_client: Dict[str, int] = {}
+        self.bids = {s: _Side(-1) for s in self.specs}
+        self.asks = {s: _Side(1) for s in self.specs}
+        self.stops: Dict[str, List[SimOrder]] = {s: [] for s in self.specs}
+        self.positions = {s: _Position() for s in self.specs}
+        self.stats = {"orders": 0, "rejects": 0, "fills": 0, "cancels": 0}
+        self.update_id = 1
+        self._ids = itertools.count(1)
+        self._closed: deque = deque()
+        self._lock = threading.RLock()
+        self._walk_stop: Optional[threading.Event] = None
+
+    # ----- market -----
+
+    def exchange_info(self) -> Dict[str, Any]:
+        return {"timezone": "UTC", "serverTime": int(time.time() * 1000), "rateLimits": [], "assets": [],
+                "symbols": [s.exchange_info_entry() for s in self.specs.values()]}
+
+    def _spec(self, symbol: Optional[str]) -> SymbolSpec:
+        spec = self.specs.get(symbol or "")
+        if spec is None:
+            raise SimError(-1121, "Invalid symbol.")
+        return spec
+
+    def price(self, symbol: str) -> float:
+        self._spec(symbol)
+        return self.prices[symbol]
+
+    def quote(self, symbol: str) -> Tuple[float, float]:
+        """Reference (bid, ask), snapped to the tick."""
+        tick = float(self._spec(symbol).tick)
+        p = self.prices[symbol]
+        half = p * self.spread_bps / 20000
+        return round((p - half) / tick) * tick, round((p + half) / tick) * tick
+
+    def set_price(self, symbol: str, price: float) -> None:
+        """Move the reference price: crossed resting orders fill and stops trigger."""
+        with self._lock:
+            self._spec(symbol)
+            self.prices[symbol] = price
+            self.update_id += 1
+            now = int(time.time() * 1000)
+            # resting buys at or above the new price (and sells at or below) trade against it
+            for book, crossed in ((self.bids[symbol], lambda p: p >= price), (self.asks[symbol], lambda p: p <= price)):
+                while book.keys and crossed(book.sign * book.keys[0]):
+                    key = book.keys[0]
+                    queue = book.levels[key]
+                    order = queue[0]
+                    self._fill(order, order.remaining, order.price, maker=True, now=now)
+                    queue.popleft()
+                    if not queue:
+                        book._drop(key)
+            pending = self.stops[symbol]
+            fired = [o for o in pending if self._triggered(o, price)]
+            if fired:
+                self.stops[symbol] = [o for o in pending if not self._triggered(o, price)]
+                for order in fired:
+                    order.triggered = True
+                    order.update_time = now
+                    self._execute(order, now)
+
+    @staticmethod
+    def _triggered(order: SimOrder, price: float) -> bool:
+        # STOP*: BUY above / SELL below the stop; TAKE_PROFIT*: the opposite
+        rising = (order.side == "BUY") == order.order_type.startswith("STOP")
+        return price >= order.stop_price if rising else price <= order.stop_price
+
+    def depth(self, symbol: str, limit: int = 500) -> Dict[str, Any]:
+        """Resting orders plus the reference quote as one deep level each side."""
+        with self._lock:
+            bid, ask = self.quote(symbol)
+            bids = self.bids[symbol].depth(limit)
+            asks = self.asks[symbol].depth(limit)
+            update_id = self.update_id
+        bids = sorted([(p, q) for p, q in bids if p != bid] + [(bid, 1000.0)], reverse=True)[:limit]
+        asks = sorted([(p, q) for p, q in asks if p != ask] + [(ask, 1000.0)])[:limit]
+        return {"lastUpdateId": update_id, "E": int(time.time() * 1000), "T": int(time.time() * 1000),
+                "bids": [[fmt(p), fmt(q)] for p, q in bids], "asks": [[fmt(p), fmt(q)] for p, q in asks]}
+
+    def start_walk(self, vol_bps: float = 2.0, interval: float = 0.1, seed: Optional[int] = None) -> None:
+        """Random-walk every reference price from a background thread."""
+        if self._walk_stop is not None:
+            return
+        self._walk_stop = threading.Event()
+        stop = self._walk_stop
+        rng = random.Random(seed)
+
+        def loop():
+            while not stop.wait(interval):
+                for symbol in list(self.prices):
+                    self.set_price(symbol, self.prices[symbol] * (1 + rng.gauss(0, vol_bps / 10000)))
+
+        threading.Thread(target=loop, name="sim-walk", daemon=True).start()
+
+    def stop_walk(self) -> None:
+        if self._walk_stop is not None:
+            self._walk_stop.set()
+            self._walk_stop = None
+
+    # ----- orders -----
+
+    def place(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /fapi/v1/order with the exchange's string parameters; raises SimError on rejection."""
+        try:
+            order = self._new_order(params)
+        except SimError:
+            self.stats["rejects"] += 1
+            raise
+        with self._lock:
+            now = order.time
+            if order.client_order_id in self.by_client and self.orders[self.by_client[order.client_order_id]].status in OPEN_STATUSES:
+                self.stats["rejects"] += 1
+                raise SimError(-4116, "ClientOrderId is duplicated.")
+            if order.reduce_only:
+                self._check_reduce_only(order)
+            if not order.triggered:
+                if self._triggered(order, self.prices[order.symbol]):
+                    self.stats["rejects"] += 1
+                    raise SimError(-2021, "Order would immediately trigger.")
+            self._register(order)
+            if order.triggered:
+                self._execute(order, now)
+            else:
+                self.stops[order.symbol].append(order)
+            return order.as_dict()
+
+    def _new_order(self, params: Dict[str, Any]) -> SimOrder:
+        spec = self._spec(params.get("symbol"))
+        side = params.get("side")
+        if side not in ("BUY", "SELL"):
+            raise SimError(-1102, "Mandatory parameter 'side' was not sent, was empty/null, or malformed.")
+        order_type = params.get("type")
+        if order_type not in ORDER_TYPES:
+            raise SimError(-1116, "Invalid orderType.")
+        qty = _decimal(params, "quantity", required=True)
+        limit = order_type in ("LIMIT", "STOP", "TAKE_PROFIT")
+        price = _decimal(params, "price", required=limit)
+        stop = _decimal(params, "stopPrice", required=order_type in TRIGGER_TYPES)
+        tif = params.get("timeInForce") or "GTC"
+        if limit and tif not in ("GTC", "IOC", "FOK", "GTX"):
+            raise SimError(-1115, "Invalid timeInForce.")
+        step, tick = Decimal(spec.step), Decimal(spec.tick)
+        if qty % step:
+            raise SimError(-1111, "Precision is over the maximum defined for this asset.")
+        for p in (price, stop):
+            if p is not None and p % tick:
+                raise SimError(-4014, "Price not increased by tick size.")
+        if qty > Decimal(spec.max_qty if limit else spec.market_max_qty):
+            raise SimError(-4005, "Quantity greater than max quantity.")
+        reduce_only = str(params.get("reduceOnly", "")).lower() == "true"
+        notional = qty * (price if price is not None else Decimal(str(self.prices[spec.symbol])))
+        if not reduce_only and notional < Decimal(spec.min_notional):
+            raise SimError(-4164, f"Order's notional must be no smaller than {spec.min_notional} (unless you choose reduce only).")
+        order_id = next(self._ids)
+        return SimOrder(order_id, params.get("newClientOrderId") or f"sim_{order_id}", spec.symbol, side, order_type,
+                        tif, float(price or 0), float(stop or 0), float(qty), reduce_only, int(time.time() * 1000))
+
+    def _check_reduce_only(self, order: SimOrder) -> None:
+        amt = self.positions[order.symbol].amt
+        if amt == 0 or (amt > 0) == (order.side == "BUY"):
+            raise SimError(-2022, "ReduceOnly Order is rejected.")
+        order.qty = min(order.qty, abs(amt))
+
+    def _register(self, order: SimOrder) -> None:
+        self.orders[order.order_id] = order
+        self.by_client[order.client_order_id] = order.order_id
+        self.stats["orders"] += 1
+
+    def _execute(self, order: SimOrder, now: int) -> None:
+        """Run a (triggered) order as taker against the book, then the reference; rest or expire the rest."""
+        symbol, buy = order.symbol, order.side == "BUY"
+        market = order.order_type in ("MARKET", "STOP_MARKET", "TAKE_PROFIT_MARKET")
+        bid, ask = self.quote(symbol)
+        ref = ask if buy else bid
+        if order.tif == "GTX" and not market and (ref <= order.price if buy else ref >= order.price):
+            self._close(order, "EXPIRED", now)  # post-only would take
+            return
+        book = self.asks[symbol] if buy else self.bids[symbol]
+        if order.tif == "FOK" and not market:
+            reachable = sum(q for p, q in book.depth(len(book.keys)) if (p <= order.price if buy else p >= order.price))
+            if reachable < order.remaining and not (ref <= order.price if buy else ref >= order.price):
+                self._close(order, "EXPIRED", now)
+                return
+        # price-time priority: best price first, FIFO within a price
+        while order.remaining > 0 and book.keys:
+            key = book.keys[0]
+            best = book.sign * key
+            if not market and (best > order.price if buy else best < order.price):
+                break
+            if (best > ref if buy else best < ref):
+                break  # the reference is the better price from here on
+            queue = book.levels[key]
+            maker = queue[0]
+            qty = min(maker.remaining, order.remaining)
+            self._fill(maker, qty, maker.price, maker=True, now=now)
+            self._fill(order, qty, maker.price, maker=False, now=now)
+            if maker.remaining <= 0:
+                queue.popleft()
+                if not queue:
+                    book._drop(key)
+        if order.remaining > 0 and (market or (ref <= order.price if buy else ref >= order.price)):
+            self._fill(order, order.remaining, ref, maker=False, now=now)
+        if order.remaining <= 0:
+            return
+        if market or order.tif in ("IOC", "FOK"):
+            self._close(order, "EXPIRED", now)
+        else:
+            (self.bids if buy else self.asks)[symbol].add(order)
+
+    def _fill(self, order: SimOrder, qty: float, price: float, maker: bool, now: int) -> None:
+        order.filled += qty
+        order.cum_quote += qty * price
+        order.update_time = now
+        self.stats["fills"] += 1
+        self._apply_position(order.symbol, qty if order.side == "BUY" else -qty, price, now)
+        self.balance -= qty * price * (self.maker_fee if maker else self.taker_fee)
+        if order.remaining <= 1e-12:
+            self._close(order, "FILLED", now)
+        else:
+            order.status = "PARTIALLY_FILLED"
+
+    def _apply_position(self, symbol: str, delta: float, price: float, now: int) -> None:
+        pos = self.positions[symbol]
+        pos.update_time = now
+        if pos.amt == 0 or (pos.amt > 0) == (delta > 0):
+            total = abs(pos.amt) + abs(delta)
+            pos.entry = (pos.entry * abs(pos.amt) + price * abs(delta)) / total
+            pos.amt += delta
+            return
+        closed = min(abs(delta), abs(pos.amt))
+        self.balance += closed * (price - pos.entry) * (1 if pos.amt > 0 else -1)
+        pos.amt += delta
+        if abs(pos.amt) < 1e-12:
+            pos.amt, pos.entry = 0.0, 0.0
+        elif (pos.amt > 0) == (delta > 0):
+            pos.entry = price  # flipped: the remainder opened at this price
+
+    def _close(self, order: SimOrder, status: str, now: int) -> None:
+        order.status = status
+        order.update_time = now
+        self._closed.append(order.order_id)
+        while len(self._closed) > self.max_closed:
+            old = self.orders.pop(self._closed.popleft(), None)
+            if old is not None and self.by_client.get(old.client_order_id) == old.order_id:
+                del self.by_client[old.client_order_id]
+
+    def _find(self, symbol: Optional[str], order_id: Any = None, client_order_id: Optional[str] = None) -> Optional[SimOrder]:
+        self._spec(symbol)
+        if order_id not in (None, ""):
+            order = self.orders.get(int(order_id))
+        elif client_order_id:
+            order = self.orders.get(self.by_client.get(client_order_id, -1))
+        else:
+            raise SimError(-1102, "Param 'origClientOrderId' or 'orderId' must be sent, but both were empty/null!")
+        return order if order is not None and order.symbol == symbol else None
+
+    def query(self, symbol: Optional[str], order_id: Any = None, client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            order = self._find(symbol, order_id, client_order_id)
+            if order is None:
+                raise SimError(-2013, "Order does not exist.")
+            return order.as_dict()
+
+    def cancel(self, symbol: Optional[str], order_id: Any = None, client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            order = self._find(symbol, order_id, client_order_id)
+            if order is None or order.status not in OPEN_STATUSES:
+                raise SimError(-2011, "Unknown order sent.")
+            self._cancel(order)
+            return order.as_dict()
+
+    def _cancel(self, order: SimOrder) -> None:
+        if order.triggered:
+            (self.bids if order.side == "BUY" else self.asks)[order.symbol].remove(order)
+        else:
+            self.stops[order.symbol] = [o for o in self.stops[order.symbol] if o is not order]
+        self.stats["cancels"] += 1
+        self._close(order, "CANCELED", int(time.time() * 1000))
+
+    def cancel_all(self, symbol: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            self._spec(symbol)
+            for order in [o for o in self.orders.values() if o.symbol == symbol and o.status in OPEN_STATUSES]:
+                self._cancel(order)
+        return {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if symbol:
+                self._spec(symbol)
+            return [o.as_dict() for o in self.orders.values()
+                    if o.status in OPEN_STATUSES and (not symbol or o.symbol == symbol)]
+
+    # ----- account -----
+
+    def position_risk(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if symbol:
+                self._spec(symbol)
+            rows = []
+            for s, pos in self.positions.items():
+                if symbol and s != symbol:
+                    continue
+                mark = self.prices[s]
+                rows.append({"symbol": s, "positionAmt": fmt(pos.amt), "entryPrice": f"{pos.entry:.8f}",
+                             "markPrice": f"{mark:.8f}", "unRealizedProfit": f"{pos.amt * (mark - pos.entry):.8f}",
+                             "liquidationPrice": "0", "leverage": "20", "marginType": "cross",
+                             "positionSide": "BOTH", "notional": f"{pos.amt * mark:.8f}", "updateTime": pos.update_time})
+            return rows
+
+    def unrealized(self) -> float:
+        return sum(p.amt * (self.prices[s] - p.entry) for s, p in self.positions.items())
+
+    def balances(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            upnl = self.unrealized()
+            available = f"{self.balance + min(upnl, 0):.8f}"
+            return [{"accountAlias": "sim", "asset": "USDT", "balance": f"{self.balance:.8f}",
+                     "crossWalletBalance": f"{self.balance:.8f}", "crossUnPnl": f"{upnl:.8f}",
+                     "availableBalance": available, "maxWithdrawAmount": available, "withdrawAvailable": available,
+                     "marginAvailable": True, "updateTime": int(time.time() * 1000)}]
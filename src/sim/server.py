@@ -0,0 +1,272 @@
+# src/sim/server.py
+from __future__ import annotations
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from ..rate_limiter import ORDER_LIMIT_10S, ORDER_LIMIT_1M, WEIGHT_LIMIT_1M, order_count, request_weight
+from ..logger import get_logger
+from .engine import MatchingEngine, SimError, fmt
+
+logger = get_logger(__name__)
+
+SIGNED_PATHS = ("/fapi/v1/order", "/fapi/v1/batchOrders", "/fapi/v1/openOrders", "/fapi/v1/allOpenOrders",
+                "/fapi/v2/positionRisk", "/fapi/v2/balance")
+KEYED_PATHS = SIGNED_PATHS + ("/fapi/v1/listenKey",)
+# injected failures: both are "retry or reconcile" cases the client has to survive
+INJECTED_ERRORS = (
+    (503, {"code": -1001, "msg": "Internal error; unable to process your request. Please try again."}),
+    (503, {"code": -1007, "msg": "Timeout waiting for response from backend server. Send status unknown; execution status unknown."}),
+)
+
+
+class SimConfig(NamedTuple):
+    api_key: Optional[str] = None      # None accepts any X-MBX-APIKEY
+    api_secret: Optional[str] = None   # None skips signature checks
+    latency_ms: float = 0.0            # added before every reply
+    jitter_ms: float = 0.0             # uniform extra latency in [0, jitter_ms]
+    error_rate: float = 0.0            # fraction of requests answered with an injected error
+    enforce_limits: bool = True        # weight / order-count windows with 429s, reported in X-MBX-* headers
+    seed: Optional[int] = None
+
+
+class _Limits:
+    """The exchange's fixed windows, counted per server (one client IP in practice)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.windows = {"X-MBX-USED-WEIGHT-1M": [60, 0.0, 0, WEIGHT_LIMIT_1M],
+                        "X-MBX-ORDER-COUNT-10S": [10, 0.0, 0, ORDER_LIMIT_10S],
+                        "X-MBX-ORDER-COUNT-1M": [60, 0.0, 0, ORDER_LIMIT_1M]}
+
+    def charge(self, weight: int, orders: int) -> Tuple[bool, Dict[str, str]]:
+        now = time.time()
+        ok = True
+        with self.lock:
+            for name, w in self.windows.items():
+                start = now - now % w[0]
+                if start != w[1]:
+                    w[1], w[2] = start, 0
+                w[2] += weight if name.endswith("WEIGHT-1M") else orders
+                ok = ok and w[2] <= w[3]
+            return ok, {name: str(w[2]) for name, w in self.windows.items()}
+
+
+class SimHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    engine: MatchingEngine
+    config: SimConfig
+    limits: _Limits
+    rng: random.Random
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read(self) -> Tuple[str, str, Dict[str, str]]:
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        params.update({k: v[-1] for k, v in parse_qs(body).items()})
+        # the exchange signs the query string followed by the body
+        return parts.path, parts.query + body, params
+
+    def _authenticate(self, path: str, raw: str, params: Dict[str, str]) -> None:
+        cfg = self.config
+        if path in KEYED_PATHS and cfg.api_key is not None and self.headers.get("X-MBX-APIKEY") != cfg.api_key:
+            raise SimError(-2015, "Invalid API-key, IP, or permissions for action.", status=401)
+        if path not in SIGNED_PATHS:
+            return
+        if "timestamp" not in params:
+            raise SimError(-1102, "Mandatory parameter 'timestamp' was not sent, was empty/null, or malformed.")
+        now = time.time() * 1000
+        ts, window = int(params["timestamp"]), int(params.get("recvWindow", 5000))
+        if ts > now + 1000 or now - ts > window:
+            raise SimError(-1021, "Timestamp for this request is outside of the recvWindow.")
+        if cfg.api_secret is not None:
+            payload, _, signature = raw.rpartition("&signature=")
+            expected = hmac.new(cfg.api_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+            if not signature or not hmac.compare_digest(expected, signature):
+                raise SimError(-1022, "Signature for this request is not valid.")
+
+    def handle_one_request(self) -> None:
+        self.raw_requestline = self.rfile.readline(65537)
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if not self.parse_request():
+            return
+        if self.command not in ("GET", "POST", "PUT", "DELETE"):
+            self.send_error(501)
+            return
+        path, raw, params = self._read()
+        status, payload, headers = 200, None, {}
+        cfg = self.config
+        try:
+            if cfg.enforce_limits:
+                ok, headers = self.limits.charge(request_weight(self.command, path, params),
+                                                 order_count(self.command, path, params))
+                if not ok:
+                    headers["Retry-After"] = "10"
+                    raise SimError(-1003, "Too many requests; current limit is exceeded.", status=429)
+            self._authenticate(path, raw, params)
+            if cfg.error_rate and self.rng.random() < cfg.error_rate:
+                status, payload = self.rng.choice(INJECTED_ERRORS)
+                if payload["code"] == -1007 and self.command != "GET":
+                    self._dispatch(path, params)  # executed, but the caller is told the outcome is unknown
+            else:
+                payload = self._dispatch(path, params)
+        except SimError as e:
+            status, payload = e.status, e.payload()
+        except (KeyError, ValueError) as e:
+            status, payload = 400, {"code": -1102, "msg": f"Malformed parameter: {e}"}
+        delay = cfg.latency_ms + (self.rng.uniform(0, cfg.jitter_ms) if cfg.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        self._reply(payload, status, headers)
+        self.wfile.flush()
+
+    def _dispatch(self, path: str, params: Dict[str, str]) -> Any:
+        route = ROUTES.get((self.command, path))
+        if route is None:
+            raise SimError(-5000, f"Path {path}, Method {self.command} is invalid", status=404)
+        return route(self.engine, params)
+
+
+def _ticker_price(engine: MatchingEngine, params: Dict[str, str]) -> Any:
+    now = int(time.time() * 1000)
+    row = lambda s: {"symbol": s, "price": fmt(engine.price(s)), "time": now}
+    return row(params["symbol"]) if "symbol" in params else [row(s) for s in engine.specs]
+
+
+def _book_ticker(engine: MatchingEngine, params: Dict[str, str]) -> Any:
+    now = int(time.time() * 1000)
+
+    def row(s):
+        bid, ask = engine.quote(s)
+        return {"symbol": s, "bidPrice": fmt(bid), "bidQty": "1000", "askPrice": fmt(ask), "askQty": "1000", "time": now}
+    return row(params["symbol"]) if "symbol" in params else [row(s) for s in engine.specs]
+
+
+def _premium_index(engine: MatchingEngine, params: Dict[str, str]) -> Any:
+    now = int(time.time() * 1000)
+    row = lambda s: {"symbol": s, "markPrice": fmt(engine.price(s)), "indexPrice": fmt(engine.price(s)),
+                     "lastFundingRate": "0.00010000", "nextFundingTime": now - now % 28_800_000 + 28_800_000, "time": now}
+    return row(params["symbol"]) if "symbol" in params else [row(s) for s in engine.specs]
+
+
+def _batch_place(engine: MatchingEngine, params: Dict[str, str]) -> Any:
+    results = []
+    for o in json.loads(params.get("batchOrders", "[]")):
+        try:
+            results.append(engine.place(o))
+        except SimError as e:
+            results.append(e.payload())
+    return results
+
+
+def _batch_cancel(engine: MatchingEngine, params: Dict[str, str]) -> Any:
+    ids = json.loads(params.get("orderIdList", "[]"))
+    results = []
+    for oid in ids:
+        try:
+            results.append(engine.cancel(params.get("symbol"), order_id=oid))
+        except SimError as e:
+            results.append(e.payload())
+    return results
+
+
+def _set_price(engine: MatchingEngine, params: Dict[str, str]) -> Any:
+    engine.set_price(params["symbol"], float(params["price"]))
+    return {"symbol": params["symbol"], "price": params["price"]}
+
+
+ROUTES = {
+    ("GET", "/fapi/v1/ping"): lambda e, p: {},
+    ("GET", "/fapi/v1/time"): lambda e, p: {"serverTime": int(time.time() * 1000)},
+    ("GET", "/fapi/v1/exchangeInfo"): lambda e, p: e.exchange_info(),
+    ("GET", "/fapi/v1/ticker/price"): _ticker_price,
+    ("GET", "/fapi/v2/ticker/price"): _ticker_price,
+    ("GET", "/fapi/v1/ticker/bookTicker"): _book_ticker,
+    ("GET", "/fapi/v1/premiumIndex"): _premium_index,
+    ("GET", "/fapi/v1/depth"): lambda e, p: e.depth(p["symbol"], int(p.get("limit", 500))),
+    ("POST", "/fapi/v1/order"): lambda e, p: e.place(p),
+    ("GET", "/fapi/v1/order"): lambda e, p: e.query(p.get("symbol"), p.get("orderId"), p.get("origClientOrderId")),
+    ("DELETE", "/fapi/v1/order"): lambda e, p: e.cancel(p.get("symbol"), p.get("orderId"), p.get("origClientOrderId")),
+    ("POST", "/fapi/v1/batchOrders"): _batch_place,
+    ("DELETE", "/fapi/v1/batchOrders"): _batch_cancel,
+    ("GET", "/fapi/v1/openOrders"): lambda e, p: e.open_orders(p.get("symbol")),
+    ("DELETE", "/fapi/v1/allOpenOrders"): lambda e, p: e.cancel_all(p.get("symbol")),
+    ("GET", "/fapi/v2/positionRisk"): lambda e, p: e.position_risk(p.get("symbol")),
+    ("GET", "/fapi/v2/balance"): lambda e, p: e.balances(),
+    ("POST", "/fapi/v1/listenKey"): lambda e, p: {"listenKey": "sim-listen-key"},
+    ("PUT", "/fapi/v1/listenKey"): lambda e, p: {},
+    ("DELETE", "/fapi/v1/listenKey"): lambda e, p: {},
+    # test controls, not part of fapi
+    ("POST", "/sim/price"): _set_price,
+    ("GET", "/sim/stats"): lambda e, p: dict(e.stats, balance=e.balance, prices=e.prices),
+}
+
+
+def start_sim_server(engine: Optional[MatchingEngine] = None, config: SimConfig = SimConfig(),
+                     host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str, MatchingEngine]:
+    """Serve a MatchingEngine on a background thread; returns (server, base_url, engine)."""
+    engine = engine or MatchingEngine()
+    handler = type("BoundSimHandler", (SimHandler,), {
+        "engine": engine, "config": config, "limits": _Limits(), "rng": random.Random(config.seed)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="sim-server", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}", engine
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Local fapi stand-in with an in-memory matching engine")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--api-key", help="Require this X-MBX-APIKEY (default: accept any)")
+    parser.add_argument("--api-secret", help="Verify HMAC signatures with this secret")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failed with -1001/-1007")
+    parser.add_argument("--no-limits", action="store_true", help="Don't enforce weight / order-count limits")
+    parser.add_argument("--balance", type=float, default=10_000.0, help="Starting USDT balance")
+    parser.add_argument("--walk-bps", type=float, default=0.0, help="Random-walk prices by this stdev every 100ms")
+    parser.add_argument("--seed", type=int)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    config = SimConfig(args.api_key, args.api_secret, args.latency_ms, args.jitter_ms, args.error_rate,
+                       not args.no_limits, args.seed)
+    engine = MatchingEngine(balance=args.balance)
+    if args.walk_bps:
+        engine.start_walk(args.walk_bps, seed=args.seed)
+    server, url, _ = start_sim_server(engine, config, args.host, args.port)
+    print(f"Simulated fapi listening on {url}")
+    logger.info("Sim server started on %s with %s", url, config)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# src/snapshot.py
+from __future__ import annotations
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .client import BinanceFuturesClient
+from .logger import get_logger
+from .ctl import forward_to_daemon
+
+logger = get_logger(__name__)
+
+COLUMNS = ("price", "change_pct", "volume", "quote_volume", "high", "low", "mark_price", "funding")
+# seconds between refreshes of each source in watch mode (ticker/price is refreshed every tick)
+STATS_INTERVAL = 30.0   # /fapi/v1/ticker/24hr, weight 40
+FUNDING_INTERVAL = 10.0  # /fapi/v1/premiumIndex, weight 10
+
+
+class MarketSnapshot:
+    """
+    Whole-market state in columns: symbols[i] and index[symbol] locate a row, every other
+    column is a float64 array (NaN where a source had no entry). Use numpy directly for ranking
+    and screening, e.g. snap.symbols[np.argsort(-snap.change_pct)[:10]].
+    """
+
+    def __init__(self, symbols: List[str], columns: Dict[str, np.ndarray], fetched_at: Optional[Dict[str, float]] = None):
+        self.symbols = np.array(symbols, dtype=object)
+        self.index: Dict[str, int] = {s: i for i, s in enumerate(symbols)}
+        self.columns = columns
+        self.fetched_at = fetched_at or {}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        columns = self.__dict__.get("columns", {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def row(self, symbol: str) -> Dict[str, Any]:
+        i = self.index[symbol]
+        return {"symbol": symbol, **{c: float(col[i]) for c, col in self.columns.items()}}
+
+    def select(self, rows: np.ndarray) -> "MarketSnapshot":
+        """Sub-snapshot from a boolean mask or index array."""
+        return MarketSnapshot(list(self.symbols[rows]), {c: col[rows] for c, col in self.columns.items()}, self.fetched_at)
+
+    def top(self, column: str, n: int = 10, ascending: bool = False) -> "MarketSnapshot":
+        values = self.columns[column]
+        order = np.argsort(values if ascending else -values, kind="stable")
+        order = order[~np.isnan(values[order])]
+        return self.select(order[:n])
+
+    def changed(self, other: "MarketSnapshot", columns=("price", "change_pct", "funding")) -> np.ndarray:
+        """Row indices of self that are new or differ from other in any of columns."""
+        if len(other) == len(self) and np.array_equal(other.symbols, self.symbols):
+            mask = np.zeros(len(self), dtype=bool)
+            for c in columns:
+                a, b = self.columns[c], other.columns[c]
+                mask |= (a != b) & ~(np.isnan(a) & np.isnan(b))
+            return np.flatnonzero(mask)
+        prev = [other.index.get(s, -1) for s in self.symbols]
+        return np.array([i for i, j in enumerate(prev) if j < 0 or any(
+            self.columns[c][i] != other.columns[c][j] and not (np.isnan(self.columns[c][i]) and np.isnan(other.columns[c][j]))
+            for c in columns)], dtype=np.int64)
+
+
+def _fetch(client: BinanceFuturesClient, sources: Tuple[str, ...]) -> Dict[str, List[Dict[str, Any]]]:
+    paths = {"price": "/fapi/v1/ticker/price", "stats": "/fapi/v1/ticker/24hr", "funding": "/fapi/v1/premiumIndex"}
+    if len(sources) == 1:
+        return {sources[0]: client._request("GET", paths[sources[0]])}
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = {s: pool.submit(client._request, "GET", paths[s]) for s in sources}
+        return {s: f.result() for s, f in futures.items()}
+
+
+def _fill(index: Dict[str, int], rows: List[Dict[str, Any]], fields: Dict[str, str], columns: Dict[str, np.ndarray]) -> None:
+    for r in rows:
+        i = index.get(r.get("symbol"))
+        if i is None:
+            continue
+        for key, column in fields.items():
+            value = r.get(key)
+            if value not in (None, ""):
+                columns[column][i] = float(value)
+
+
+_PRICE_FIELDS = {"price": "price"}
+_STATS_FIELDS = {"priceChangePercent": "change_pct", "volume": "volume", "quoteVolume": "quote_volume",
+                 "highPrice": "high", "lowPrice": "low"}
+_FUNDING_FIELDS = {"markPrice": "mark_price", "lastFundingRate": "funding"}
+
+
+def fetch_snapshot(client: BinanceFuturesClient, quote: Optional[str] = "USDT",
+                   previous: Optional[MarketSnapshot] = None, sources: Tuple[str, ...] = ("price", "stats", "funding")) -> MarketSnapshot:
+    """
+    One request per source for the whole market (fetched concurrently). With previous, sources not
+    listed are carried over from it, which is how watch mode refreshes cheaply.
+    """
+    data = _fetch(client, sources)
+    now = time.time()
+    universe = data.get("price") or data.get("stats") or data.get("funding") or []
+    symbols = sorted(r["symbol"] for r in universe if quote is None or r["symbol"].endswith(quote))
+    if previous is not None and "price" not in data:
+        symbols = list(previous.symbols)
+    index = {s: i for i, s in enumerate(symbols)}
+    columns = {c: np.full(len(symbols), np.nan) for c in COLUMNS}
+    fetched_at = dict(previous.fetched_at) if previous is not None else {}
+
+    for source, fields in (("price", _PRICE_FIELDS), ("stats", _STATS_FIELDS), ("funding", _FUNDING_FIELDS)):
+        if source in data:
+            _fill(index, data[source], fields, columns)
+            fetched_at[source] = now
+        elif previous is not None:
+            rows = np.array([previous.index.get(s, -1) for s in symbols], dtype=np.int64)
+            known = rows >= 0
+            for c in fields.values():
+                columns[c][known] = previous.columns[c][rows[known]]
+    return MarketSnapshot(symbols, columns, fetched_at)
+
+
+def refresh(client: BinanceFuturesClient, snap: MarketSnapshot, quote: Optional[str] = "USDT") -> MarketSnapshot:
+    """Re-fetch prices, plus 24h stats / funding only when they are due."""
+    now = time.time()
+    sources = ["price"]
+    if now - snap.fetched_at.get("stats", 0) >= STATS_INTERVAL:
+        sources.append("stats")
+    if now - snap.fetched_at.get("funding", 0) >= FUNDING_INTERVAL:
+        sources.append("funding")
+    return fetch_snapshot(client, quote=quote, previous=snap, sources=tuple(sources))
+
+
+def _print_rows(snap: MarketSnapshot, rows) -> None:
+    for i in rows:
+        print(f"Symbol: {snap.symbols[i]}, Price: {snap.price[i]:g}, Change: {snap.change_pct[i]:+.2f}%, "
+              f"Volume: {snap.quote_volume[i]:,.0f}, Funding: {snap.funding[i] * 100:+.4f}%")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Whole-market price / 24h / funding snapshot")
+    parser.add_argument("--sort", choices=COLUMNS, default="quote_volume", help="Rank by this column")
+    parser.add_argument("--top", type=int, default=20, help="Rows to show")
+    parser.add_argument("--asc", action="store_true", help="Ascending order")
+    parser.add_argument("--min-volume", type=float, default=0.0, help="Minimum 24h quote volume")
+    parser.add_argument("--quote", default="USDT", help="Quote asset filter ('' for all)")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="Refresh every SECONDS and print changed rows")
+    parser.add_argument("--count", type=int, default=0, help="Stop watching after this many refreshes (0 = forever)")
+    return parser
+
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
+    client = client or BinanceFuturesClient()
+    quote = args.quote or None
+    try:
+        snap = fetch_snapshot(client, quote=quote)
+        screened = snap.select(np.flatnonzero(~(snap.quote_volume < args.min_volume))) if args.min_volume else snap
+        view = screened.top(args.sort, args.top, ascending=args.asc)
+        print("Market snapshot.")
+        print(f"Symbols: {len(snap)}, Showing: {len(view)} by {args.sort}")
+        _print_rows(view, range(len(view)))
+        if not args.watch:
+            return
+        watched = set(view.symbols)
+        refreshes = 0
+        while not args.count or refreshes < args.count:
+            time.sleep(args.watch)
+            new = refresh(client, snap, quote=quote)
+            rows = [i for i in new.changed(snap) if new.symbols[i] in watched]
+            refreshes += 1
+            print(f"Refresh {refreshes}: {len(rows)} changed")
+            _print_rows(new, rows)
+            snap = new
+    except Exception as e:
+        logger.error("Snapshot failed: %s", e)
+        print("Snapshot failed.")
+        print(f"Error: {e}")
+
+
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("snapshot", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,30 @@
 # src/stats.py
 from __future__ import annotations
 import argparse
+from typing import List, Optional
 from .client import BinanceFuturesClient
 from .validators import validate_symbol
+from .ctl import forward_to_daemon
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Get 24h stats for symbol")
     parser.add_argument("symbol", help="Symbol e.g., BTCUSDT")
-    args = parser.parse_args()
+    return parser
+
+def execute(args: argparse.Namespace, client: Optional[BinanceFuturesClient] = None) -> None:
     symbol = validate_symbol(args.symbol)
 
-    client = BinanceFuturesClient()
+    client = client or BinanceFuturesClient()
     try:
         resp = client._request("GET", "/fapi/v1/ticker/24hr", params={"symbol": symbol}, signed=False)
         print(resp)
     except Exception as e:
         print("Error:", e)
 
+def main(argv: Optional[List[str]] = None):
+    if forward_to_daemon("stats", argv):
+        return
+    execute(build_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
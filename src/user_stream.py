@@ -0,0 +1,347 @@
+# src/user_stream.py
+from __future__ import annotations
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+from .market_data import ws_url_for, RECONNECT_MIN, RECONNECT_MAX
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from .client import BinanceFuturesClient
+
+logger = get_logger(__name__)
+
+LISTEN_KEY_PATH = "/fapi/v1/listenKey"
+KEEPALIVE_INTERVAL = 30 * 60  # keys expire after 60 min without a PUT
+RECENT_EVENTS = 10000  # orderId -> last event, so a fill that beats watch() is not missed
+TERMINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH")
+
+
+class OrderEvent(NamedTuple):
+    """One ORDER_TRADE_UPDATE, flattened."""
+    symbol: str
+    order_id: int
+    client_order_id: str
+    side: str
+    order_type: str
+    status: str
+    exec_type: str
+    orig_qty: float
+    price: float
+    avg_price: float
+    stop_price: float
+    last_qty: float
+    last_price: float
+    filled_qty: float
+    reduce_only: bool
+    event_ms: int
+    trade_ms: int
+
+    @property
+    def is_fill(self) -> bool:
+        return self.filled_qty > 0
+
+    @property
+    def is_final(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def as_order(self) -> Dict[str, Any]:
+        """Same keys as a GET /fapi/v1/order response, for code that handles both."""
+        return {"orderId": self.order_id, "symbol": self.symbol, "clientOrderId": self.client_order_id,
+                "side": self.side, "type": self.order_type, "status": self.status,
+                "origQty": str(self.orig_qty), "executedQty": str(self.filled_qty), "price": str(self.price),
+                "avgPrice": str(self.avg_price), "stopPrice": str(self.stop_price), "updateTime": self.trade_ms}
+
+
+def parse_order_update(data: Dict[str, Any]) -> OrderEvent:
+    o = data["o"]
+    return OrderEvent(o["s"], int(o["i"]), o.get("c", ""), o.get("S", ""), o.get("o", ""), o.get("X", ""),
+                      o.get("x", ""), float(o.get("q", 0)), float(o.get("p", 0)), float(o.get("ap", 0)),
+                      float(o.get("sp", 0)), float(o.get("l", 0)), float(o.get("L", 0)), float(o.get("z", 0)),
+                      bool(o.get("R", False)), int(data.get("E", 0)), int(o.get("T", 0)))
+
+
+class OrderWatch:
+    """
+    Waits for events on a set of orderIds. stale is True when the stream was down (or reconnected)
+    at any point since the watch started, i.e. events may have been missed and a REST check is due.
+    """
+
+    def __init__(self, stream: "UserDataStream", order_ids: Iterable[int],
+                 predicate: Callable[[OrderEvent], bool]):
+        self.stream = stream
+        self.order_ids = {int(i) for i in order_ids}
+        self.predicate = predicate
+        self.generation = stream.generation
+        self.event: Optional[OrderEvent] = None
+        self._ready = threading.Event()
+
+    def _offer(self, event: OrderEvent) -> None:
+        if self.event is None and event.order_id in self.order_ids and self.predicate(event):
+            self.event = event
+            self._ready.set()
+
+    @property
+    def stale(self) -> bool:
+        return not self.stream.connected or self.stream.generation != self.generation
+
+    def mark_checked(self) -> None:
+        self.generation = self.stream.generation
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[OrderEvent]:
+        self._ready.wait(timeout)
+        return self.event
+
+    def close(self) -> None:
+        self.stream._unwatch(self)
+
+
+class UserDataStream:
+    """
+    listenKey lifecycle (create, 30-min keepalive, re-create on expiry) plus the user-data
+    WebSocket on a background asyncio loop. ORDER_TRADE_UPDATE fans out to watches and
+    listeners; ACCOUNT_UPDATE keeps balances/positions current.
+    """
+
+    def __init__(self, client: "BinanceFuturesClient", ws_url: Optional[str] = None,
+                 keepalive_interval: float = KEEPALIVE_INTERVAL):
+        self.client = client
+        self.ws_url = (ws_url or ws_url_for(client.base_url)).rstrip("/")
+        self.keepalive_interval = keepalive_interval
+        self.listen_key: Optional[str] = None
+        self.generation = 0  # bumped on every (re)connect
+        self.events = 0
+        self.balances: Dict[str, Tuple[float, float]] = {}  # asset -> (wallet, cross wallet)
+        self.positions: Dict[Tuple[str, str], Tuple[float, float, float]] = {}  # (symbol, side) -> (amt, entry, uPnL)
+        self.recent: "OrderedDict[int, OrderEvent]" = OrderedDict()
+        self._watches: List[OrderWatch] = []
+        self._listeners: List[Callable[[str, Any], None]] = []
+        self._lock = threading.Lock()
+        self._ws = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._connected_once = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    # ----- listenKey REST calls -----
+
+    def _new_key(self) -> str:
+        self.listen_key = self.client._request("POST", LISTEN_KEY_PATH)["listenKey"]
+        return self.listen_key
+
+    def _keepalive(self) -> None:
+        self.client._request("PUT", LISTEN_KEY_PATH)
+
+    def _close_key(self) -> None:
+        try:
+            self.client._request("DELETE", LISTEN_KEY_PATH)
+        except Exception as e:
+            logger.warning("listenKey close failed: %s", e)
+        self.listen_key = None
+
+    # ----- subscriptions -----
+
+    def add_listener(self, fn: Callable[[str, Any], None]) -> None:
+        """fn(event_type, payload) on the stream thread; payload is an OrderEvent for ORDER_TRADE_UPDATE."""
+        self._listeners = self._listeners + [fn]
+
+    def remove_listener(self, fn: Callable[[str, Any], None]) -> None:
+        self._listeners = [f for f in self._listeners if f is not fn]
+
+    def watch(self, order_ids: Iterable[int], predicate: Callable[[OrderEvent], bool] = lambda e: e.is_fill) -> OrderWatch:
+        """Watch orderIds for the first event matching predicate (default: any fill)."""
+        w = OrderWatch(self, order_ids, predicate)
+        with self._lock:
+            self._watches.append(w)
+            backlog = [self.recent[i] for i in w.order_ids if i in self.recent]
+        for event in backlog:
+            w._offer(event)
+        return w
+
+    def _unwatch(self, w: OrderWatch) -> None:
+        with self._lock:
+            if w in self._watches:
+                self._watches.remove(w)
+
+    # ----- lifecycle -----
+
+    def start(self, wait: float = 5.0) -> "UserDataStream":
+        """Start the stream thread (idempotent); waits up to `wait` seconds for the first connect."""
+        if not self.running:
+            self._stopping = False
+            self._connected_once.clear()
+            self._new_key()
+            self._thread = threading.Thread(target=self._run, name="user-stream", daemon=True)
+            self._thread.start()
+        if wait:
+            self._connected_once.wait(wait)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        loop, ws = self._loop, self._ws
+        if loop is not None and ws is not None:
+            asyncio.run_coroutine_threadsafe(ws.close(), loop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self._close_key()
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._connect_forever())
+        finally:
+            self._loop = None
+            loop.close()
+
+    async def _keepalive_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await loop.run_in_executor(None, self._keepalive)
+            except Exception as e:
+                logger.warning("listenKey keepalive failed: %s", e)
+
+    async def _connect_forever(self) -> None:
+        from websockets.asyncio.client import connect
+
+        loop = asyncio.get_running_loop()
+        keepalive = asyncio.ensure_future(self._keepalive_loop())
+        delay = RECONNECT_MIN
+        try:
+            while not self._stopping:
+                try:
+                    if self.listen_key is None:
+                        await loop.run_in_executor(None, self._new_key)
+                    async with connect(f"{self.ws_url}/ws/{self.listen_key}", max_queue=None, compression=None) as ws:
+                        self._ws = ws
+                        self.generation += 1
+                        self._connected_once.set()
+                        logger.info("User data stream connected (generation %d)", self.generation)
+                        delay = RECONNECT_MIN
+                        async for raw in ws:
+                            if self._on_message(raw) == "expired":
+                                break
+                except Exception as e:
+                    if self._stopping:
+                        break
+                    logger.warning("User data stream lost: %s", e)
+                finally:
+                    self._ws = None
+                if self._stopping:
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+        finally:
+            keepalive.cancel()
+
+    def _on_message(self, raw) -> Optional[str]:
+        data = json.loads(raw)
+        kind = data.get("e")
+        self.events += 1
+        if kind == "ORDER_TRADE_UPDATE":
+            event = parse_order_update(data)
+            with self._lock:
+                self.recent[event.order_id] = event
+                self.recent.move_to_end(event.order_id)
+                if len(self.recent) > RECENT_EVENTS:
+                    self.recent.popitem(last=False)
+                watches = list(self._watches)
+            for w in watches:
+                w._offer(event)
+            payload: Any = event
+        elif kind == "ACCOUNT_UPDATE":
+            account = data.get("a", {})
+            for b in account.get("B", []):
+                self.balances[b["a"]] = (float(b.get("wb", 0)), float(b.get("cw", 0)))
+            for p in account.get("P", []):
+                self.positions[(p["s"], p.get("ps", "BOTH"))] = (float(p.get("pa", 0)), float(p.get("ep", 0)),
+                                                                 float(p.get("up", 0)))
+            payload = account
+        elif kind == "listenKeyExpired":
+            logger.warning("listenKey expired; creating a new one")
+            self.listen_key = None
+            return "expired"
+        else:
+            payload = data
+        for fn in self._listeners:
+            try:
+                fn(kind, payload)
+            except Exception as e:
+                logger.error("User stream listener failed: %s", e)
+        return None
+
+
+_streams: Dict[Tuple[str, str], UserDataStream] = {}
+_streams_lock = threading.Lock()
+
+
+def get_user_stream(client: "BinanceFuturesClient") -> UserDataStream:
+    """One stream per (base_url, api_key) for the whole process (not started until start())."""
+    key = (client.base_url.rstrip("/"), client.api_key)
+    with _streams_lock:
+        stream = _streams.get(key)
+        if stream is None:
+            stream = _streams[key] = UserDataStream(client)
+            # order events keep the local order store current
+            client.order_store.attach(stream)
+        return stream
+
+
+def wait_for_fill(client: "BinanceFuturesClient", symbol: str, order_ids: List[int], timeout: float = 3600,
+                  poll_interval: float = 2.0) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """
+    Block until one of order_ids has executed quantity; returns (orderId, order dict) or None on timeout.
+    Event-driven on the user-data stream; falls back to GET /fapi/v1/order only while the stream
+    is down or right after a gap, so a fill during a reconnect is still caught.
+    """
+    try:
+        stream: Optional[UserDataStream] = client.user_stream.start()
+    except Exception as e:
+        logger.warning("User data stream unavailable, polling orders: %s", e)
+        stream = None
+    w = stream.watch(order_ids) if stream is not None else None
+    deadline = time.time() + timeout
+    checked = False
+    try:
+        while time.time() < deadline:
+            if w is not None:
+                event = w.wait(0 if not checked else min(poll_interval, max(0.0, deadline - time.time())))
+                if event is not None:
+                    return event.order_id, event.as_order()
+                if checked and not w.stale:
+                    continue
+                w.mark_checked()
+            # one REST pass: at start (fill may predate the stream), after a gap, or always without a stream
+            for oid in order_ids:
+                rec = client.order_store.get(oid)
+                if rec is not None and rec.filled_qty > 0:
+                    return oid, rec.as_order()
+                try:
+                    status = client.get_order(symbol, oid)
+                except Exception as e:
+                    logger.error("Error querying order status: %s", e)
+                    continue
+                if float(status.get("executedQty", 0)) > 0:
+                    return oid, status
+            checked = True
+            if w is None:
+                time.sleep(poll_interval)
+        return None
+    finally:
+        if w is not None:
+            w.close()
@@ -1,9 +1,14 @@
 # src/validators.py
 from __future__ import annotations
-from typing import Tuple
+from decimal import Decimal, ROUND_FLOOR, ROUND_CEILING, ROUND_HALF_UP
+from typing import Tuple, Dict, Any, List, Optional, Union, NamedTuple, TYPE_CHECKING
 import re
 
+if TYPE_CHECKING:
+    from .exchange_info import SymbolFilters
+
 VALID_SIDES = {"BUY", "SELL"}
+_ZERO = Decimal("0")
 
 def validate_symbol(symbol: str) -> str:
     if not isinstance(symbol, str) or not re.match(r"^[A-Z0-9]+$", symbol):
@@ -33,3 +38,140 @@ def validate_price(price: str) -> float:
     if p <= 0:
         raise ValueError("Price must be > 0")
     return p
+
+
+# ---------------------------------------------------------------------------
+# Pre-trade filter engine
+#
+# Applies a symbol's exchange filters (see exchange_info.SymbolFilters) locally with exact
+# Decimal arithmetic, so bad orders are snapped or rejected before any network call.
+# ---------------------------------------------------------------------------
+
+class FilterRejected(ValueError):
+    """Order can never pass the exchange filters; raised before anything is sent."""
+
+    def __init__(self, reason: str, filter_type: str = ""):
+        super().__init__(reason)
+        self.filter_type = filter_type
+
+
+class CheckedOrder(NamedTuple):
+    quantity: Decimal
+    price: Optional[Decimal]
+    stop_price: Optional[Decimal]
+
+
+def to_decimal(value: Union[str, int, float, Decimal]) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    # str() first so 0.1 becomes Decimal("0.1"), not its binary expansion
+    return Decimal(str(value))
+
+
+def _snap(value: Decimal, base: Decimal, step: Decimal, rounding: str) -> Decimal:
+    if step <= 0:
+        return value
+    steps = ((value - base) / step).to_integral_value(rounding=rounding)
+    return (base + steps * step).quantize(step)
+
+
+def snap_price(filters: "SymbolFilters", price: Union[str, float, Decimal], side: Optional[str] = None) -> Decimal:
+    """
+    Round a price onto the tick grid. BUY rounds down and SELL rounds up (never a worse
+    fill than asked); without a side it rounds to the nearest tick.
+    """
+    rounding = ROUND_FLOOR if side == "BUY" else ROUND_CEILING if side == "SELL" else ROUND_HALF_UP
+    return _snap(to_decimal(price), filters.min_price, filters.tick_size, rounding)
+
+
+def snap_quantity(filters: "SymbolFilters", quantity: Union[str, float, Decimal], market: bool = False) -> Decimal:
+    """Round a quantity down onto the lot step (MARKET_LOT_SIZE for market orders)."""
+    step = filters.market_step_size if market else filters.step_size
+    return _snap(to_decimal(quantity), _ZERO, step, ROUND_FLOOR)
+
+
+def check_order(filters: "SymbolFilters", side: str, order_type: str, quantity: Union[str, float, Decimal],
+                price: Optional[Union[str, float, Decimal]] = None, stop_price: Optional[Union[str, float, Decimal]] = None,
+                mark_price: Optional[Union[str, float, Decimal]] = None, reduce_only: bool = False,
+                snap: bool = True) -> CheckedOrder:
+    """
+    Validate one order against PRICE_FILTER, LOT_SIZE / MARKET_LOT_SIZE, MIN_NOTIONAL and
+    PERCENT_PRICE. With snap=True off-grid prices/quantities are rounded instead of rejected.
+    mark_price is needed for the percent-price bounds and for the notional of market orders.
+    Returns the Decimal values to send; raises FilterRejected otherwise.
+    """
+    market = order_type in ("MARKET", "STOP_MARKET", "TAKE_PROFIT_MARKET")
+    qty = to_decimal(quantity)
+    snapped_qty = snap_quantity(filters, qty, market=market)
+    if snapped_qty != qty and not snap:
+        raise FilterRejected(f"Quantity {qty} is not a multiple of step size", "LOT_SIZE")
+    qty = snapped_qty
+    min_qty = filters.market_min_qty if market else filters.min_qty
+    max_qty = filters.market_max_qty if market else filters.max_qty
+    if qty <= 0 or qty < min_qty:
+        raise FilterRejected(f"Quantity {qty} below minimum {min_qty}", "LOT_SIZE")
+    if max_qty > 0 and qty > max_qty:
+        raise FilterRejected(f"Quantity {qty} above maximum {max_qty}", "LOT_SIZE")
+
+    def _price(value, label: str) -> Optional[Decimal]:
+        if value is None:
+            return None
+        p = to_decimal(value)
+        snapped = snap_price(filters, p, side)
+        if snapped != p and not snap:
+            raise FilterRejected(f"{label} {p} is not a multiple of tick size {filters.tick_size}", "PRICE_FILTER")
+        if snapped <= 0 or snapped < filters.min_price:
+            raise FilterRejected(f"{label} {snapped} below minimum {filters.min_price}", "PRICE_FILTER")
+        if filters.max_price > 0 and snapped > filters.max_price:
+            raise FilterRejected(f"{label} {snapped} above maximum {filters.max_price}", "PRICE_FILTER")
+        return snapped
+
+    px = _price(price, "Price")
+    stop = _price(stop_price, "Stop price")
+    mark = to_decimal(mark_price) if mark_price is not None else None
+
+    # futures PERCENT_PRICE bounds one side each: a BUY may not bid above mark x multiplierUp (-4016),
+    # a SELL may not ask below mark x multiplierDown (-4024); deep bids / far asks are fine
+    if mark is not None and px is not None and filters.multiplier_up > 0:
+        if side == "BUY":
+            upper = mark * filters.multiplier_up
+            if px > upper:
+                raise FilterRejected(f"Price {px} above {upper} (mark {mark} x {filters.multiplier_up})", "PERCENT_PRICE")
+        else:
+            lower = mark * filters.multiplier_down
+            if px < lower:
+                raise FilterRejected(f"Price {px} below {lower} (mark {mark} x {filters.multiplier_down})", "PERCENT_PRICE")
+
+    reference = px if px is not None else mark
+    if not reduce_only and reference is not None and filters.min_notional > 0:
+        notional = qty * reference
+        if notional < filters.min_notional:
+            raise FilterRejected(f"Order's notional {notional} must be no smaller than {filters.min_notional}", "MIN_NOTIONAL")
+    return CheckedOrder(qty, px, stop)
+
+
+def validate_plan(filters: "SymbolFilters", orders: List[Dict[str, Any]],
+                  mark_price: Optional[Union[str, float, Decimal]] = None,
+                  snap: bool = True) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+    """
+    Check a whole grid/TWAP plan in one pass before the first order goes out.
+    orders: place_order keyword dicts (side, order_type, quantity, price, stop_price, reduce_only).
+    Returns (orders with snapped Decimal values, [(index, reason), ...] for every rejected order).
+    """
+    checked: List[Dict[str, Any]] = []
+    errors: List[Tuple[int, str]] = []
+    for i, o in enumerate(orders):
+        try:
+            c = check_order(filters, o["side"], o["order_type"], o["quantity"], price=o.get("price"),
+                            stop_price=o.get("stop_price"), mark_price=mark_price,
+                            reduce_only=o.get("reduce_only", False), snap=snap)
+        except FilterRejected as e:
+            errors.append((i, str(e)))
+            continue
+        out = dict(o, quantity=c.quantity)
+        if c.price is not None:
+            out["price"] = c.price
+        if c.stop_price is not None:
+            out["stop_price"] = c.stop_price
+        checked.append(out)
+    return checked, errors